@@ -4,9 +4,14 @@
 # ================================================
 # DO NOT CHANGE THIS FILE
 
+import atexit
+import hashlib
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
 import numpy as np
 from qiskit.quantum_info import SparsePauliOp, Statevector
-from qiskit_algorithms.eigensolvers import NumPyEigensolver
 import matplotlib.pyplot as plt
 
 
@@ -169,14 +174,25 @@ def get_beta_hamiltonian():
 
 ######################## AUX METHODS ###############################
 
+# Exact eigen-data is computed on first access and persisted to disk, so
+# importing this module doesn't pay for the diagonalization on every restart.
+# Override the location with the AHC25_CACHE_DIR environment variable.
+EXACT_CACHE_DIR = os.environ.get(
+    'AHC25_CACHE_DIR', os.path.join(os.path.expanduser('~'), '.cache', 'ahc25')
+)
+
+_exact_memo = {}
+
 # For reference
 def get_alpha_exact_hamiltonian(): 
-    return __exact_diagonalization(get_alpha_hamiltonian(), "ALPHA", 10)
+    return __cached_exact_diagonalization(get_alpha_hamiltonian(), "ALPHA", 10)
 
 def get_beta_exact_hamiltonian(): 
-    return __exact_diagonalization(get_beta_hamiltonian(), "BETA", 10)
+    return __cached_exact_diagonalization(get_beta_hamiltonian(), "BETA", 10)
 
 def __exact_diagonalization(hamiltonian, name, num_eigenvalues=5):
+    from qiskit_algorithms.eigensolvers import NumPyEigensolver
+
     solver = NumPyEigensolver(k=num_eigenvalues)
     result = solver.compute_eigenvalues(hamiltonian)
     
@@ -184,14 +200,365 @@ def __exact_diagonalization(hamiltonian, name, num_eigenvalues=5):
       
     return eigenvalues, result.eigenstates
 
-alpha_exact_evals, alpha_exact_states = get_alpha_exact_hamiltonian()
-beta_exact_evals, beta_exact_states = get_beta_exact_hamiltonian() 
+def _hamiltonian_key(hamiltonian, num_eigenvalues):
+    # Hash of the Pauli strings + coefficients: editing either invalidates the cache
+    digest = hashlib.sha256()
+    digest.update('|'.join(hamiltonian.paulis.to_labels()).encode())
+    digest.update(np.ascontiguousarray(hamiltonian.coeffs, dtype=complex).tobytes())
+    digest.update(str(num_eigenvalues).encode())
+    return digest.hexdigest()[:16]
+
+def __cached_exact_diagonalization(hamiltonian, name, num_eigenvalues=5):
+    key = _hamiltonian_key(hamiltonian, num_eigenvalues)
+    if key in _exact_memo:
+        return _exact_memo[key]
+
+    path = os.path.join(EXACT_CACHE_DIR, f"{name.lower()}_{key}.npz")
+    try:
+        with np.load(path) as data:
+            eigenvalues = data['eigenvalues']
+            states = data['states']
+        eigenstates = [Statevector(state) for state in states]
+    except (OSError, KeyError, ValueError):
+        eigenvalues, eigenstates = __exact_diagonalization(hamiltonian, name, num_eigenvalues)
+        states = np.array([np.asarray(state) for state in eigenstates])
+        try:
+            os.makedirs(EXACT_CACHE_DIR, exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                np.savez(f, eigenvalues=eigenvalues, states=states)
+            os.replace(tmp_path, path)
+        except OSError:
+            pass  # Read-only home: keep the in-memory copy only
+
+    _exact_memo[key] = (eigenvalues, eigenstates)
+    return _exact_memo[key]
+
+def _state_rows(states):
+    # (T, 2^n) trajectory layout; lists of Statevectors/arrays are stacked once
+    if isinstance(states, np.ndarray) and states.ndim == 2:
+        return states
+    return np.array([np.asarray(getattr(state, 'data', state)) for state in states])
+
+def fidelity_matrix(states_a, states_b, axis=0):
+    """
+    F[i, j] = |<a_i|b_j>|^2 for every pair, computed as |A^H B|^2 in one
+    matrix product. 2-D arrays hold one state per row like the rest of this
+    module ((T, 2^n), axis=0); pass axis=1 for states-in-columns layouts such
+    as the QSD/Krylov V matrices. Returns (F, best_match, best_fidelity):
+    for each a_i, the index of its best-matching b_j and that fidelity.
+    """
+    if axis not in (0, 1):
+        raise ValueError(f"axis must be 0 (states in rows) or 1 (states in columns), got {axis}")
+    A = _state_rows(states_a)
+    B = _state_rows(states_b)
+    if axis == 1:
+        A, B = A.T, B.T
+    if A.shape[1] != B.shape[1]:
+        raise ValueError(f"State dimensions differ: {A.shape[1]} vs {B.shape[1]} "
+                         f"(states_a {A.shape}, states_b {B.shape}, axis={axis})")
+    F = np.abs(A.conj() @ B.T) ** 2
+    best_match = F.argmax(axis=1)
+    return F, best_match, F[np.arange(F.shape[0]), best_match]
+
+def analyze_trajectory(states, energies=None, reference_energy=None, target_state=None,
+                       hamiltonian=None, snapshot_steps=None, snapshot_size=16):
+    """
+    One-pass analysis of an evolution trajectory given as a (T, 2^n) array.
+
+    energies are taken as given, or computed as <psi_t|H|psi_t> when a
+    hamiltonian (matrix or SparsePauliOp) is passed. Returns a dict with
+    'energies', 'energy_deltas' (|E_t - reference_energy|), 'fidelities'
+    (|<target|psi_t>|^2), 'snapshot_steps' and 'snapshots' (probabilities of
+    the first snapshot_size basis states at those steps).
+    """
+    S = _state_rows(states)
+    T = S.shape[0]
+    analysis = {}
+
+    if energies is None and hamiltonian is not None:
+        if hasattr(hamiltonian, 'to_matrix'):
+            hamiltonian = hamiltonian.to_matrix(sparse=True)
+        energies = np.real(np.einsum('ti,it->t', S.conj(), hamiltonian @ S.T))
+    analysis['energies'] = None if energies is None else np.asarray(energies, dtype=float)
+
+    if analysis['energies'] is not None and reference_energy is not None:
+        analysis['energy_deltas'] = np.abs(analysis['energies'] - reference_energy)
+    else:
+        analysis['energy_deltas'] = None
+
+    if target_state is not None:
+        target = np.asarray(getattr(target_state, 'data', target_state))
+        analysis['fidelities'] = np.abs(S @ target.conj()) ** 2
+    else:
+        analysis['fidelities'] = None
+
+    if snapshot_steps is None:
+        snapshot_steps = [0, T // 3, 2 * T // 3, -1]
+    analysis['snapshot_steps'] = list(snapshot_steps)
+    analysis['snapshots'] = np.abs(S[analysis['snapshot_steps'], :snapshot_size]) ** 2
+
+    return analysis
+
+def entanglement_entropies(states, cuts=None):
+    """
+    Von Neumann entropies (bits) of a stack of pure states for several
+    bipartitions at once, from the Schmidt coefficients of each state.
+
+    states is a (T, 2^n) array or a list of Statevectors. Each cut is either
+    an int k (subsystem = qubits 0..k-1) or an iterable of qubit indices;
+    the default is the half-chain cut n // 2. Returns a (T, len(cuts)) array.
+    """
+    S = _state_rows(states)
+    T, dim = S.shape
+    num_qubits = dim.bit_length() - 1
+    if 1 << num_qubits != dim:
+        raise ValueError(f"State dimension {dim} is not a power of two")
+
+    if cuts is None:
+        cuts = [num_qubits // 2]
+
+    # Axis 1 + (n-1-q) holds qubit q (qiskit little-endian ordering)
+    tensor = S.reshape((T,) + (2,) * num_qubits)
+    entropies = np.zeros((T, len(cuts)))
+
+    for c, cut in enumerate(cuts):
+        subsystem = list(range(cut)) if isinstance(cut, (int, np.integer)) else sorted(cut)
+        if not subsystem or len(subsystem) == num_qubits:
+            continue  # Trivial cut: entropy 0
+        rest = [q for q in range(num_qubits) if q not in subsystem]
+        axes = [0] + [1 + num_qubits - 1 - q for q in rest + subsystem]
+        matrices = tensor.transpose(axes).reshape(T, 1 << len(rest), 1 << len(subsystem))
+
+        schmidt = np.linalg.svd(matrices, compute_uv=False) ** 2
+        with np.errstate(divide='ignore', invalid='ignore'):
+            terms = np.where(schmidt > 1e-15, schmidt * np.log2(schmidt), 0.0)
+        entropies[:, c] = -terms.sum(axis=1)
+
+    return entropies
+
+class EnergyTracker:
+    """Energy history with the same .energies/.callback interface as the notebook VQETracker."""
+
+    def __init__(self):
+        self.energies = []
+        self.params = []
+        self.iteration = 0
+
+    def callback(self, eval_count, parameters, mean_energy, std_dev=0.0):
+        self.energies.append(mean_energy)
+        self.params.append(np.array(parameters, copy=True))
+        self.iteration += 1
+
+
+_matrix_memo = {}
+
+class HamiltonianEstimator:
+    """
+    <H> for batches of statevectors or ansatz parameter sets, using a matrix
+    of the Hamiltonian built once (dense up to dense_max_qubits, else sparse).
+
+    Usable directly as a scipy.optimize objective; every call made through
+    __call__ is recorded in self.tracker, which vqe_plot accepts.
+    """
+
+    def __init__(self, hamiltonian, ansatz=None, dense_max_qubits=10):
+        self.hamiltonian = hamiltonian
+        self.ansatz = ansatz
+        self.tracker = EnergyTracker()
+
+        sparse = hamiltonian.num_qubits > dense_max_qubits
+        key = (_hamiltonian_key(hamiltonian, 0), sparse)
+        if key not in _matrix_memo:
+            _matrix_memo[key] = hamiltonian.to_matrix(sparse=sparse)
+        self.matrix = _matrix_memo[key]
+
+    def energies(self, states):
+        """Energies of a (B, 2^n) stack (or list) of statevectors in one product."""
+        S = _state_rows(states)
+        return np.real(np.einsum('bi,ib->b', S.conj(), self.matrix @ S.T))
+
+    def states(self, parameter_sets):
+        if self.ansatz is None:
+            raise ValueError("An ansatz is required to evaluate parameter sets")
+        parameter_sets = np.atleast_2d(parameter_sets)
+        return np.array([Statevector(self.ansatz.assign_parameters(p)).data for p in parameter_sets])
+
+    def energies_from_parameters(self, parameter_sets):
+        return self.energies(self.states(parameter_sets))
+
+    def __call__(self, parameters):
+        energy = float(self.energies_from_parameters(parameters)[0])
+        self.tracker.callback(self.tracker.iteration + 1, parameters, energy)
+        return energy
+
+def get_alpha_estimator(ansatz=None):
+    return HamiltonianEstimator(get_alpha_hamiltonian(), ansatz)
+
+def get_beta_estimator(ansatz=None):
+    return HamiltonianEstimator(get_beta_hamiltonian(), ansatz)
+
+_spectrum_memo = {}
+
+def _full_spectrum(hamiltonian):
+    key = _hamiltonian_key(hamiltonian, 'full')
+    if key not in _spectrum_memo:
+        _spectrum_memo[key] = np.linalg.eigh(hamiltonian.to_matrix())
+    return _spectrum_memo[key]
+
+def imaginary_time_evolution(hamiltonian, initial_state, taus):
+    """
+    Exact normalized e^{-H tau}|psi> for every tau in taus, from the (cached)
+    eigendecomposition H = V diag(E) V^H. Returns (energies, states) with
+    states shaped (len(taus), 2^n).
+    """
+    evals, evecs = _full_spectrum(hamiltonian)
+    psi = np.asarray(getattr(initial_state, 'data', initial_state), dtype=complex)
+    taus = np.atleast_1d(np.asarray(taus, dtype=float))
+
+    coeffs = evecs.conj().T @ psi
+    # Shift by E_min so long times don't underflow before normalization
+    weights = np.exp(-np.outer(taus, evals - evals[0])) * coeffs[None, :]
+    norms = np.linalg.norm(weights, axis=1)
+    weights /= norms[:, None]
+
+    energies = (np.abs(weights) ** 2) @ evals
+    states = weights @ evecs.T
+    return energies, states
+
+def exact_varqite_reference(hamiltonian, initial_state, tau=0.03, steps=150):
+    """Exact counterpart of the notebook VarQITE run: tau grid 0, tau, ..., steps*tau."""
+    return imaginary_time_evolution(hamiltonian, initial_state, tau * np.arange(steps + 1))
+
+def get_perturbed_alpha_state(epsilon=0.1):
+    """Normalized alpha_1 + epsilon * alpha_0, the Task 5 starting state."""
+    _, states = get_alpha_exact_hamiltonian()
+    psi = np.asarray(states[1]) + epsilon * np.asarray(states[0])
+    return psi / np.linalg.norm(psi)
+
+_LAZY_EXACT = {
+    'alpha_exact_evals': (get_alpha_exact_hamiltonian, 0),
+    'alpha_exact_states': (get_alpha_exact_hamiltonian, 1),
+    'beta_exact_evals': (get_beta_exact_hamiltonian, 0),
+    'beta_exact_states': (get_beta_exact_hamiltonian, 1),
+}
+
+def __getattr__(name):
+    # alpha_exact_evals, alpha_exact_states, beta_exact_evals, beta_exact_states
+    if name in _LAZY_EXACT:
+        getter, index = _LAZY_EXACT[name]
+        return getter()[index]
+    # Still exported (star-import) but qiskit_algorithms is only imported when used
+    if name == 'NumPyEigensolver':
+        from qiskit_algorithms.eigensolvers import NumPyEigensolver
+        return NumPyEigensolver
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# The exact eigen-data names are resolved through __getattr__ on star-import, so
+# `from AHC25Data import *` still defines them (computed once, then read from the cache).
+__all__ = [
+    *_LAZY_EXACT,
+    'np', 'plt', 'SparsePauliOp', 'Statevector', 'NumPyEigensolver',
+    'get_alpha_hamiltonian', 'get_beta_hamiltonian',
+    'get_alpha_exact_hamiltonian', 'get_beta_exact_hamiltonian',
+    'fidelity_matrix', 'analyze_trajectory', 'entanglement_entropies',
+    'EnergyTracker', 'HamiltonianEstimator', 'get_alpha_estimator', 'get_beta_estimator',
+    'imaginary_time_evolution', 'exact_varqite_reference', 'get_perturbed_alpha_state',
+    'configure_rendering', 'wait_for_renders',
+    'vqe_plot', 'homolumo_plot', 'qsd_plot', 'varqite_plot',
+    'entanglement_entropy_plot', 'final_plot', 'test_fidelity',
+]
 
 #################################### PLOTS ##################################
 
+# Above this size qsd_plot skips the per-cell printout and annotations
+QSD_ANNOTATE_MAX = 20
+
+# How the plot helpers render their figures. Change it with configure_rendering(),
+# e.g. configure_rendering(show=False, save=False) for headless runs.
+RENDER_CONFIG = {
+    'show': True,          # plt.show() the figure
+    'save': True,          # write the figure to output_dir
+    'dpi': 300,
+    'format': 'png',
+    'output_dir': '.',
+    'background': None,    # None (save inline), 'thread' or 'process'
+}
+
+
+_render_executor = None
+_pending_renders = []
+
+
+def configure_rendering(**options):
+    unknown = set(options) - set(RENDER_CONFIG)
+    if unknown:
+        raise ValueError(f"Unknown render options: {', '.join(sorted(unknown))}")
+    if options.get('background', RENDER_CONFIG['background']) not in (None, 'thread', 'process'):
+        raise ValueError("background must be None, 'thread' or 'process'")
+
+    if 'background' in options and options['background'] != RENDER_CONFIG['background']:
+        _shutdown_renders()
+    RENDER_CONFIG.update(options)
+    return dict(RENDER_CONFIG)
+
+
+def wait_for_renders():
+    """Blocks until every background save has finished; re-raises the first error."""
+    while _pending_renders:
+        _pending_renders.pop(0).result()
+
+
+def _shutdown_renders():
+    global _render_executor
+    wait_for_renders()
+    if _render_executor is not None:
+        _render_executor.shutdown()
+        _render_executor = None
+
+
+atexit.register(_shutdown_renders)
+
+
+def _save_pickled_figure(payload, path, dpi, fmt):
+    fig = pickle.loads(payload)
+    fig.savefig(path, dpi=dpi, format=fmt, bbox_inches='tight')
+    plt.close(fig)
+
+
+def _render(fig, name):
+    global _render_executor
+    config = RENDER_CONFIG
+
+    if config['save']:
+        os.makedirs(config['output_dir'], exist_ok=True)
+        path = os.path.join(config['output_dir'], f"{name}.{config['format']}")
+
+        if config['background'] is None:
+            fig.savefig(path, dpi=config['dpi'], format=config['format'], bbox_inches='tight')
+        else:
+            if _render_executor is None:
+                executor_cls = ThreadPoolExecutor if config['background'] == 'thread' else ProcessPoolExecutor
+                _render_executor = executor_cls(max_workers=1)
+            _pending_renders[:] = [f for f in _pending_renders if not f.done() or f.exception()]
+            # Workers draw their own copy, so closing `fig` below can't race the save
+            future = _render_executor.submit(
+                _save_pickled_figure, pickle.dumps(fig), path, config['dpi'], config['format'])
+            _pending_renders.append(future)
+
+    if config['show']:
+        plt.show()
+
+    # Detach from pyplot so repeated runs don't accumulate figures
+    plt.close(fig)
+
+
 def vqe_plot(alpha_vqe_tracker, beta_vqe_tracker): 
+    alpha_exact_evals, _ = get_alpha_exact_hamiltonian()
+    beta_exact_evals, _ = get_beta_exact_hamiltonian()
+
     # Visualize VQE convergence
-    _, axes = plt.subplots(1, 2, figsize=(16, 5))
+    fig, axes = plt.subplots(1, 2, figsize=(16, 5))
 
     # Alpha convergence
     axes[0].plot(alpha_vqe_tracker.energies, 'b-', linewidth=2, label='VQE Energy')
@@ -212,8 +579,7 @@ def vqe_plot(alpha_vqe_tracker, beta_vqe_tracker):
     axes[1].grid(True, alpha=0.3)
 
     plt.tight_layout()
-    plt.savefig('vqe_convergence.png', dpi=300, bbox_inches='tight')
-    plt.show()
+    _render(fig, 'vqe_convergence')
 
 
 def homolumo_plot(alpha_gap_ev, beta_gap_ev, alpha_homo_lumo, beta_homo_lumo): 
@@ -231,6 +597,9 @@ def homolumo_plot(alpha_gap_ev, beta_gap_ev, alpha_homo_lumo, beta_homo_lumo):
     else:
         print(f"\n   ⚖️ Both have similar reactivity")
 
+    alpha_exact_evals, _ = get_alpha_exact_hamiltonian()
+    beta_exact_evals, _ = get_beta_exact_hamiltonian()
+
     fig, ax = plt.subplots(1, 1, figsize=(12, 8))
 
     # Alpha levels
@@ -260,8 +629,7 @@ def homolumo_plot(alpha_gap_ev, beta_gap_ev, alpha_homo_lumo, beta_homo_lumo):
     ax.grid(True, alpha=0.3, axis='y')
 
     plt.tight_layout()
-    plt.savefig('homo_lumo_diagram.png', dpi=300, bbox_inches='tight')
-    plt.show()
+    _render(fig, 'homo_lumo_diagram')
 
 
 def qsd_plot(n_states_to_compare, alpha_qsd_states, beta_qsd_states): 
@@ -274,21 +642,10 @@ def qsd_plot(n_states_to_compare, alpha_qsd_states, beta_qsd_states):
         # Alternative: use full exact states
         print("\n   📐 Using direct analysis of full states (no projection):")
         
-        fidelity_matrix = np.zeros((5, 5))
-        for i in range(5):
-            for j in range(5):
-                if isinstance(alpha_exact_states[i], Statevector):
-                    psi_alpha = alpha_exact_states[i].data
-                else:
-                    psi_alpha = alpha_exact_states[i]
-                
-                if isinstance(beta_exact_states[j], Statevector):
-                    psi_beta = beta_exact_states[j].data
-                else:
-                    psi_beta = beta_exact_states[j]
-                
-                fidelity = np.abs(np.vdot(psi_alpha, psi_beta))**2
-                fidelity_matrix[i, j] = fidelity
+        _, alpha_exact_states = get_alpha_exact_hamiltonian()
+        _, beta_exact_states = get_beta_exact_hamiltonian()
+
+        F, best_match, _ = fidelity_matrix(alpha_exact_states[:5], beta_exact_states[:5])
         
         print(f"   ✅ Using full states in original Hilbert space")
         
@@ -296,29 +653,25 @@ def qsd_plot(n_states_to_compare, alpha_qsd_states, beta_qsd_states):
         # Normal analysis with projected states
         print(f"\n   Comparing {n_states_to_compare} states in the subspace...")
         
-        fidelity_matrix = np.zeros((n_states_to_compare, n_states_to_compare))
-        for i in range(n_states_to_compare):
-            for j in range(n_states_to_compare):
-                psi_alpha = alpha_qsd_states[:, i]
-                psi_beta = beta_qsd_states[:, j]
-                fidelity = np.abs(np.vdot(psi_alpha, psi_beta))**2
-                fidelity_matrix[i, j] = fidelity
-
-    print(f"\n   Fidelity matrix (Alpha rows × Beta cols):")
-    print("   " + "  ".join([f"β{j}" for j in range(fidelity_matrix.shape[1])]))
-    for i in range(fidelity_matrix.shape[0]):
-        row_str = f"α{i} " + "  ".join([f"{fidelity_matrix[i,j]:.3f}" for j in range(fidelity_matrix.shape[1])])
-        print(f"   {row_str}")
+        # Krylov V matrices hold one state per column
+        F, best_match, _ = fidelity_matrix(alpha_qsd_states[:, :n_states_to_compare],
+                                           beta_qsd_states[:, :n_states_to_compare], axis=1)
+
+    # Per-cell printing/annotation only stays readable for small matrices
+    small = max(F.shape) <= QSD_ANNOTATE_MAX
+
+    if small:
+        print(f"\n   Fidelity matrix (Alpha rows × Beta cols):")
+        print("   " + "  ".join([f"β{j}" for j in range(F.shape[1])]))
+        for i in range(F.shape[0]):
+            row_str = f"α{i} " + "  ".join([f"{F[i,j]:.3f}" for j in range(F.shape[1])])
+            print(f"   {row_str}")
 
     # Find best matches
     print(f"\n   🎯 Best matches (Fidelity > 0.5):")
-    strong_matches = []
-    for i in range(fidelity_matrix.shape[0]):
-        for j in range(fidelity_matrix.shape[1]):
-            F = fidelity_matrix[i, j]
-            if F > 0.5:
-                strong_matches.append((i, j, F))
-                print(f"      α_{i} ↔ β_{j}: F = {F:.4f}")
+    strong_matches = np.argwhere(F > 0.5)
+    for i, j in strong_matches:
+        print(f"      α_{i} ↔ β_{j}: F = {F[i, j]:.4f}")
 
     if len(strong_matches) == 0:
         print(f"      No strong matches found (all F < 0.5)")
@@ -326,7 +679,7 @@ def qsd_plot(n_states_to_compare, alpha_qsd_states, beta_qsd_states):
 
     # Visualize fidelity matrix (adjusted to actual size)
     fig, ax = plt.subplots(1, 1, figsize=(10, 8))
-    im = ax.imshow(fidelity_matrix, cmap='hot', interpolation='nearest', vmin=0, vmax=1)
+    im = ax.imshow(F, cmap='hot', interpolation='nearest', vmin=0, vmax=1)
     ax.set_xlabel('Beta State Index', fontsize=12, fontweight='bold')
     ax.set_ylabel('Alpha State Index', fontsize=12, fontweight='bold')
 
@@ -337,30 +690,43 @@ def qsd_plot(n_states_to_compare, alpha_qsd_states, beta_qsd_states):
         title_text = 'QSD Fidelity Matrix: Alpha vs Beta States\n(in Krylov subspace generated from Alpha)'
 
     ax.set_title(title_text, fontsize=14, fontweight='bold')
-    ax.set_xticks(range(fidelity_matrix.shape[1]))
-    ax.set_yticks(range(fidelity_matrix.shape[0]))
-    ax.set_xticklabels([f'β{i}' for i in range(fidelity_matrix.shape[1])])
-    ax.set_yticklabels([f'α{i}' for i in range(fidelity_matrix.shape[0])])
-
-    # Annotate values
-    for i in range(fidelity_matrix.shape[0]):
-        for j in range(fidelity_matrix.shape[1]):
-            text = ax.text(j, i, f'{fidelity_matrix[i, j]:.2f}',
+
+    if small:
+        ax.set_xticks(range(F.shape[1]))
+        ax.set_yticks(range(F.shape[0]))
+        ax.set_xticklabels([f'β{i}' for i in range(F.shape[1])])
+        ax.set_yticklabels([f'α{i}' for i in range(F.shape[0])])
+
+        # Annotate values
+        for i in range(F.shape[0]):
+            for j in range(F.shape[1]):
+                ax.text(j, i, f'{F[i, j]:.2f}',
                         ha="center", va="center", 
-                        color="white" if fidelity_matrix[i, j] < 0.5 else "black",
+                        color="white" if F[i, j] < 0.5 else "black",
                         fontsize=11, fontweight='bold')
 
     plt.colorbar(im, ax=ax, label='Fidelity')
     plt.tight_layout()
-    plt.savefig('qsd_fidelity_matrix.png', dpi=300, bbox_inches='tight')
-    plt.show()
+    _render(fig, 'qsd_fidelity_matrix')
 
+    return F, best_match
+
+
+def varqite_plot(alpha_exact_evals, alpha_gs_vec, beta_exact_evals, beta_evolution_energies, beta_evolution_states,
+                 reference_energies=None):
+    analysis = analyze_trajectory(
+        beta_evolution_states,
+        energies=beta_evolution_energies,
+        reference_energy=beta_exact_evals[0],
+        target_state=alpha_gs_vec,
+    )
 
-def varqite_plot(alpha_exact_evals, alpha_gs_vec, beta_exact_evals, beta_evolution_energies, beta_evolution_states):
     fig, axes = plt.subplots(2, 2, figsize=(16, 12))
 
     # Plot 1: Energy evolution
-    axes[0, 0].plot(beta_evolution_energies, 'b-', linewidth=2, label='Beta Energy Evolution')
+    axes[0, 0].plot(analysis['energies'], 'b-', linewidth=2, label='Beta Energy Evolution')
+    if reference_energies is not None:
+        axes[0, 0].plot(reference_energies, 'k-.', linewidth=1.5, label='Exact ITE')
     axes[0, 0].axhline(y=beta_exact_evals[0], color='r', linestyle='--', linewidth=2, label='Beta Ground State')
     axes[0, 0].axhline(y=alpha_exact_evals[0], color='g', linestyle=':', linewidth=2, label='Alpha Ground State')
     axes[0, 0].set_xlabel('Time Step', fontsize=12, fontweight='bold')
@@ -370,21 +736,14 @@ def varqite_plot(alpha_exact_evals, alpha_gs_vec, beta_exact_evals, beta_evoluti
     axes[0, 0].grid(True, alpha=0.3)
 
     # Plot 2: Convergence (log scale)
-    energy_diffs = np.abs(np.array(beta_evolution_energies) - beta_exact_evals[0])
-    axes[0, 1].semilogy(energy_diffs, 'r-', linewidth=2)
+    axes[0, 1].semilogy(analysis['energy_deltas'], 'r-', linewidth=2)
     axes[0, 1].set_xlabel('Time Step', fontsize=12, fontweight='bold')
     axes[0, 1].set_ylabel('|E - E_ground| (log scale)', fontsize=12, fontweight='bold')
     axes[0, 1].set_title('Convergence to Ground State (log)', fontsize=14, fontweight='bold')
     axes[0, 1].grid(True, alpha=0.3, which='both')
 
     # Plot 3: Temporal fidelity with Alpha
-    fidelities_to_alpha = []
-    for state in beta_evolution_states:
-        state_sv = Statevector(state)
-        fid = np.abs(state_sv.inner(alpha_gs_vec))**2
-        fidelities_to_alpha.append(fid)
-
-    axes[1, 0].plot(fidelities_to_alpha, 'purple', linewidth=2)
+    axes[1, 0].plot(analysis['fidelities'], 'purple', linewidth=2)
     axes[1, 0].set_xlabel('Time Step', fontsize=12, fontweight='bold')
     axes[1, 0].set_ylabel('Fidelity with Alpha Ground State', fontsize=12, fontweight='bold')
     axes[1, 0].set_title('Beta → Alpha Convergence', fontsize=14, fontweight='bold')
@@ -392,15 +751,12 @@ def varqite_plot(alpha_exact_evals, alpha_gs_vec, beta_exact_evals, beta_evoluti
     axes[1, 0].set_ylim([0, 1])
 
     # Plot 4: Final state comparison
-    steps_to_show = [0, len(beta_evolution_states)//3, 2*len(beta_evolution_states)//3, -1]
     colors = ['red', 'orange', 'yellow', 'green']
     labels = ['Initial', 'Early', 'Mid', 'Final']
 
-    for idx, (step, color, label) in enumerate(zip(steps_to_show, colors, labels)):
-        state = beta_evolution_states[step]
-        probs = np.abs(state)**2
+    for idx, (probs, color, label) in enumerate(zip(analysis['snapshots'], colors, labels)):
         # Show first 16 elements for clarity
-        axes[1, 1].bar(np.arange(min(16, len(probs))) + idx*0.2, probs[:16], 
+        axes[1, 1].bar(np.arange(len(probs)) + idx*0.2, probs, 
                     width=0.2, alpha=0.7, color=color, label=label)
 
     axes[1, 1].set_xlabel('Basis State Index', fontsize=12, fontweight='bold')
@@ -410,13 +766,20 @@ def varqite_plot(alpha_exact_evals, alpha_gs_vec, beta_exact_evals, beta_evoluti
     axes[1, 1].grid(True, alpha=0.3, axis='y')
 
     plt.tight_layout()
-    plt.savefig('varqite_evolution.png', dpi=300, bbox_inches='tight')
-    plt.show()
+    _render(fig, 'varqite_evolution')
 
     print("\n" + "="*80)
 
+    return analysis
 
-def entanglement_entropy_plot(alpha_entropies, beta_entropies): 
+
+def entanglement_entropy_plot(alpha_entropies=None, beta_entropies=None,
+                              alpha_states=None, beta_states=None, cut=None): 
+    # Entropies can also be computed here from the states (half-chain cut by default)
+    if alpha_entropies is None:
+        alpha_entropies = entanglement_entropies(alpha_states, None if cut is None else [cut])[:, 0]
+    if beta_entropies is None:
+        beta_entropies = entanglement_entropies(beta_states, None if cut is None else [cut])[:, 0]
 
     # Visualize
     fig, ax = plt.subplots(1, 1, figsize=(12, 6))
@@ -431,17 +794,19 @@ def entanglement_entropy_plot(alpha_entropies, beta_entropies):
     ax.grid(True, alpha=0.3)
 
     plt.tight_layout()
-    plt.savefig('entanglement_entropy.png', dpi=300, bbox_inches='tight')
-    plt.show()
+    _render(fig, 'entanglement_entropy')
 
 
-def final_plot(energies_perturbed, alpha_exact_evals): 
+def final_plot(energies_perturbed, alpha_exact_evals, reference_energies=None): 
+    # reference_energies: optional exact curve, e.g. exact_varqite_reference(...)[0]
 
     # Visualize evolution
     fig, axes = plt.subplots(1, 2, figsize=(16, 6))
 
     # Energy vs time
     axes[0].plot(energies_perturbed, 'b-', linewidth=2, label='Perturbed State')
+    if reference_energies is not None:
+        axes[0].plot(reference_energies, 'k-.', linewidth=1.5, label='Exact ITE')
     axes[0].axhline(y=alpha_exact_evals[0], color='r', linestyle='--', linewidth=2, label='α₀ (target)')
     axes[0].axhline(y=alpha_exact_evals[1], color='g', linestyle=':', linewidth=2, label='α₁ (initial)')
     axes[0].set_xlabel('Time Step', fontsize=12, fontweight='bold')
@@ -459,11 +824,14 @@ def final_plot(energies_perturbed, alpha_exact_evals):
     axes[1].grid(True, alpha=0.3, which='both')
 
     plt.tight_layout()
-    plt.savefig('varqite_perturbed_test.png', dpi=300, bbox_inches='tight')
-    plt.show()
+    _render(fig, 'varqite_perturbed_test')
 
 
 def test_fidelity(fidelity_beta_to_alpha): 
+    # Also accepts the analyze_trajectory()/varqite_plot() result (final step)
+    if isinstance(fidelity_beta_to_alpha, dict):
+        fidelity_beta_to_alpha = float(fidelity_beta_to_alpha['fidelities'][-1])
+
     print(f"\n🎯 CONVERGENCE")
     print(f"   Fidelity Beta(final) → Alpha(ground): F = {fidelity_beta_to_alpha:.6f}")
 
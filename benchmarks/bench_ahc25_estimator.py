@@ -0,0 +1,74 @@
+"""
+Benchmark: AHC25Data.HamiltonianEstimator vs the qiskit Estimator primitive.
+
+Evaluates <H> for the Alpha/Beta Hamiltonians on the notebook's VQE ansatz
+(EfficientSU2, 3 reps, linear entanglement) for a batch of random parameter
+sets, the way an optimizer loop would: one primitive call per step, one
+batched primitive call, and the precompiled-matrix estimator.
+
+Run with: python benchmarks/bench_ahc25_estimator.py
+"""
+
+import argparse
+import os
+import sys
+import time
+import warnings
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import AHC25Data
+from qiskit.circuit.library import EfficientSU2
+from qiskit.primitives import StatevectorEstimator
+
+warnings.filterwarnings('ignore', category=DeprecationWarning)
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--steps', type=int, default=200, help='Parameter sets to evaluate')
+    parser.add_argument('--seed', type=int, default=1234)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    primitive = StatevectorEstimator()
+
+    print(f"{'hamiltonian':<12} {'path':<26} {'total ms':>10} {'per step µs':>12}  max|ΔE|")
+    print("-" * 76)
+
+    for name, getter in (('alpha', AHC25Data.get_alpha_hamiltonian),
+                         ('beta', AHC25Data.get_beta_hamiltonian)):
+        hamiltonian = getter()
+        ansatz = EfficientSU2(hamiltonian.num_qubits, reps=3, entanglement='linear')
+        params = rng.uniform(-np.pi, np.pi, size=(args.steps, ansatz.num_parameters))
+
+        t_loop, ref = timed(lambda: np.array([
+            primitive.run([(ansatz, hamiltonian, p)]).result()[0].data.evs for p in params
+        ]))
+        t_batch, batch = timed(lambda: primitive.run([(ansatz, hamiltonian, params)]).result()[0].data.evs)
+
+        estimator = AHC25Data.HamiltonianEstimator(hamiltonian, ansatz)
+        t_states, states = timed(lambda: estimator.states(params))
+        t_energy, ours = timed(lambda: estimator.energies(states))
+
+        rows = [
+            ('primitive, one call/step', t_loop, 0.0),
+            ('primitive, batched', t_batch, np.max(np.abs(batch - ref))),
+            ('estimator, params->E', t_states + t_energy, np.max(np.abs(ours - ref))),
+            ('estimator, states->E only', t_energy, np.max(np.abs(ours - ref))),
+        ]
+        for label, seconds, err in rows:
+            print(f"{name:<12} {label:<26} {seconds * 1e3:10.2f} {seconds / args.steps * 1e6:12.1f}  {err:.2e}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,176 @@
+"""
+Benchmark: the same server under WSGI (gunicorn) and ASGI (uvicorn with the async views).
+
+Each server is started in turn by load_workshop.start_server() on a fresh
+throwaway database seeded with `manage.py generate_event_db`. Both get the
+same --server-workers processes. Each server runs two phases:
+
+- slow uploads: --slow-clients students upload a task 361 results payload of
+  --payload-kb at --upload-kbps, like phones on a bad connection. Meanwhile a
+  probe client reads /api/leaderboard and /api/health every --probe-interval
+  seconds. A gunicorn sync worker stays pinned for the whole upload, so the
+  probe queues behind the uploads or times out. Under uvicorn the event loop
+  reads the bodies and only the evaluation goes to the evaluator pool.
+- burst: --burst-clients connections alternate /api/leaderboard and
+  /api/progress for --duration seconds (throughput and latency).
+
+The client threads share the machine with the server: compare the servers
+with each other, not with numbers taken on another box. gunicorn and uvicorn
+are not in requirements.txt and must be installed to run this.
+
+Run with: python benchmarks/bench_asgi_wsgi.py --server-workers 2 --slow-clients 16 --json asgi_wsgi.json
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import threading
+import time
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from load_workshop import Recorder, report, start_server  # noqa: E402
+from replay_trace import create_accounts  # noqa: E402
+
+SERVERS = {'wsgi': 'gunicorn', 'asgi': 'uvicorn'}
+
+
+class SlowBody:
+    """Request body that trickles out in chunks; len() lets requests send a Content-Length."""
+
+    def __init__(self, data, kbps, chunk=8192):
+        self.data = data
+        self.chunk = chunk
+        self.delay = chunk / (kbps * 1024)
+
+    def __len__(self):
+        return len(self.data)
+
+    def __iter__(self):
+        for start in range(0, len(self.data), self.chunk):
+            yield self.data[start:start + self.chunk]
+            time.sleep(self.delay)
+
+
+def payload(kb, rng):
+    # Two lists of single digits ("d, " = 3 bytes each): an accepted submission of about `kb` KB
+    hidden = [rng.randrange(10) for _ in range(kb * 1024 // 6)]
+    return json.dumps({'challenge_id': 361, 'results': {
+        'task361_predictions': hidden, 'task361_y_test_hidden': hidden,
+    }}).encode()
+
+
+def slow_uploads(args, base, sessions):
+    recorder = Recorder()
+    body = payload(args.payload_kb, random.Random(args.seed))
+    stop = threading.Event()
+
+    def uploader(session):
+        recorder.request(session, 'slow-upload', 'POST', f'{base}/api/submit-results', timeout=args.timeout,
+                         data=SlowBody(body, args.upload_kbps), headers={'Content-Type': 'application/json'})
+
+    def prober():
+        session = requests.Session()
+        while not stop.is_set():
+            recorder.request(session, 'probe-leaderboard', 'GET', f'{base}/api/leaderboard?limit=20',
+                             timeout=args.timeout)
+            recorder.request(session, 'probe-health', 'GET', f'{base}/api/health', timeout=args.timeout)
+            stop.wait(args.probe_interval)
+
+    start = time.perf_counter()
+    probe = threading.Thread(target=prober, daemon=True)
+    probe.start()
+    threads = [threading.Thread(target=uploader, args=(sessions[i % len(sessions)],), daemon=True)
+               for i in range(args.slow_clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    stop.set()
+    probe.join()
+    return recorder, time.perf_counter() - start
+
+
+def burst(args, base, sessions):
+    recorder = Recorder()
+    deadline = time.monotonic() + args.duration
+
+    def client(index):
+        session = requests.Session()
+        session.headers.update(sessions[index % len(sessions)].headers)
+        while time.monotonic() < deadline:
+            recorder.request(session, 'leaderboard', 'GET', f'{base}/api/leaderboard?limit=20', timeout=args.timeout)
+            recorder.request(session, 'progress', 'GET', f'{base}/api/progress', timeout=args.timeout)
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=client, args=(i,), daemon=True) for i in range(args.burst_clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return recorder, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--servers', nargs='+', choices=list(SERVERS), default=list(SERVERS))
+    parser.add_argument('--server-workers', type=int, default=2, help='Worker processes for both servers')
+    parser.add_argument('--port', type=int, default=8767)
+    parser.add_argument('--profile', default='production', help='DB_PROFILE for the servers')
+    parser.add_argument('--event-users', type=int, default=2000, help='generate_event_db --users')
+    parser.add_argument('--event-submissions', type=int, default=100000, help='generate_event_db --submissions')
+    parser.add_argument('--slow-clients', type=int, default=16)
+    parser.add_argument('--payload-kb', type=int, default=512, help='Size of each slow upload')
+    parser.add_argument('--upload-kbps', type=float, default=128, help='Upload speed of each slow client')
+    parser.add_argument('--probe-interval', type=float, default=0.5)
+    parser.add_argument('--burst-clients', type=int, default=100)
+    parser.add_argument('--duration', type=float, default=20, help='Seconds of the burst phase')
+    parser.add_argument('--timeout', type=float, default=60, help='Per-request timeout (s)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', help='Write the report to this file')
+    args = parser.parse_args()
+
+    setup = [['generate_event_db', '--users', str(args.event_users), '--submissions', str(args.event_submissions),
+              '--seed', str(args.seed)]]
+    results = {}
+    for name in args.servers:
+        args.serve = SERVERS[name]
+        print(f'Starting {args.serve} ({name}), {args.server_workers} workers...')
+        server, tmpdir = start_server(args, setup)
+        try:
+            base = args.base_url
+            sessions = create_accounts(base, f'bench-{name}-', max(args.slow_clients, 20), 8)
+            results[name] = {}
+            for phase, run in (('slow_uploads', slow_uploads), ('burst', burst)):
+                recorder, elapsed = run(args, base, sessions)
+                results[name][phase] = report(args, recorder, elapsed)
+                del results[name][phase]['config']
+        finally:
+            server.terminate()
+            server.wait()
+            shutil.rmtree(tmpdir, ignore_errors=True)
+
+    print(f"\n{'server':<7} {'phase':<13} {'endpoint':<18} {'reqs':>6} {'req/s':>7} {'err %':>6} "
+          f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    print('-' * 99)
+    for name, phases in results.items():
+        for phase, result in phases.items():
+            for endpoint, stats in result['endpoints'].items():
+                print(f"{name:<7} {phase:<13} {endpoint:<18} {stats['requests']:>6} {stats['rps']:>7.2f} "
+                      f"{stats['error_rate'] * 100:>6.1f} {stats['p50_ms']:>8.1f} {stats['p95_ms']:>8.1f} "
+                      f"{stats['p99_ms']:>8.1f} {stats['max_ms']:>8.1f}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'config': {key: value for key, value in vars(args).items() if key not in ('json', 'serve')},
+                       'servers': results}, f, indent=2)
+        print(f"\nReport written to {args.json}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,275 @@
+"""
+Benchmark: every CodeEvaluator.evaluate_challenge_* method, minimal to pathological payloads.
+
+Payloads are plain lists/dicts, as the views receive them from the JSON
+parser, and grow along the axis each evaluator actually walks: 361
+predictions, 362 images (50x16 up to 10k x 784), 363 rewards, the count
+dictionaries of 371/372/375 (up to 2^20 bitstrings), the 373/376 curves and
+the literal size of the code executed by challenges 35/36. Methods without a
+size axis get a single "typical" case. Every method must have a case: the
+script fails if a new evaluator is added without one.
+
+Each case reports the best wall time over --repeat calls and the peak
+traced memory of one extra call under tracemalloc (numpy allocations
+included). --save-baseline writes the numbers to a JSON file and --baseline
+compares against one, failing when a case gets slower than --threshold times
+its baseline (and --min-delta-ms slower in absolute terms). Timings only
+compare on the same machine: regenerate the baseline where the check runs.
+
+Run with: python benchmarks/bench_evaluators.py --baseline benchmarks/evaluator_baseline.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'django_server'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from grader.evaluators import CodeEvaluator  # noqa: E402
+from payloads import accepted  # noqa: E402
+
+SIZES = ('minimal', 'typical', 'large', 'pathological')
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'evaluator_baseline.json')
+
+
+def bitstrings(count, width):
+    return [format(i, f'0{width}b') for i in range(count)]
+
+
+def spread_counts(keys, rng, heavy=None):
+    """Counts over `keys`, with most of the shots on `heavy` if given."""
+    counts = {key: rng.randint(1, 3) for key in keys}
+    for key in heavy or ():
+        counts[key] = 100 * len(keys)
+    return counts
+
+
+def images(rows, cols, rng):
+    # Rows are shared: np.asarray does the same work and the input does not take GBs
+    distinct = [[round(rng.random(), 6) for _ in range(cols)] for _ in range(min(rows, 64))]
+    return [distinct[i % len(distinct)] for i in range(rows)]
+
+
+# method -> {size: payload factory(rng) -> argument}
+def build_cases():
+    results_35 = {}
+    for task_id in (351, 352, 353, 354, 355):
+        results_35.update(accepted(task_id, random.Random(0)))
+
+    def code_35(rng):
+        return '\n'.join(f'{name} = {value!r}' for name, value in accepted(352, rng).items()) + '\n' + \
+            '\n'.join(f'{name} = {value!r}' for name, value in accepted(351, rng).items())
+
+    def results_36(n361, shape362, n363):
+        def factory(rng):
+            hidden = [rng.randrange(10) for _ in range(n361)]
+            clean = images(*shape362, rng)
+            return {
+                'task361_predictions': hidden, 'task361_y_test_hidden': hidden,
+                'task362_generated_images': clean, 'task362_test_clean': clean,
+                'task362_generated_shapes': [50, 16],
+                'task363_total_rewards': [rng.gauss(5, 2) for _ in range(n363)],
+            }
+        return factory
+
+    def code_36(n361, shape362, n363):
+        def factory(rng):
+            return '\n'.join(f'{name} = {value!r}' for name, value in results_36(n361, shape362, n363)(rng).items())
+        return factory
+
+    def task361(n):
+        def factory(rng):
+            hidden = [rng.randrange(10) for _ in range(n)]
+            return {'task361_predictions': hidden, 'task361_y_test_hidden': hidden}
+        return factory
+
+    def task362(rows, cols):
+        def factory(rng):
+            clean = images(rows, cols, rng)
+            return {'task362_generated_images': clean, 'task362_test_clean': clean,
+                    'task362_generated_shapes': [50, 16]}
+        return factory
+
+    def task363(n):
+        return lambda rng: {'task363_total_rewards': [rng.gauss(5, 2) for _ in range(n)]}
+
+    def task371(n, width):
+        def factory(rng):
+            keys = bitstrings(n, width) if n > 4 else ['00', '01', '10', '11']
+            heavy = [keys[0], keys[-1]] if n > 4 else ['00', '11']
+            return {'num_qubits': 2, 'num_clbits': 2, 'ops': ['h', 'cx', 'measure', 'measure'],
+                    'counts': spread_counts(keys, rng, heavy)}
+        return factory
+
+    def task372(n, width):
+        def factory(rng):
+            keys = bitstrings(n, width) if n > 4 else ['00', '01', '10', '11']
+            return {'has_structure': True, 'counts_noisy': spread_counts(keys + ['01', '10'], rng)}
+        return factory
+
+    def task373(n):
+        def factory(rng):
+            levels = [i / n for i in range(n)]
+            return {'noise_levels': levels, 'fidelities': [1.0 - 0.9 * x for x in levels]}
+        return factory
+
+    def task375(n, width):
+        def factory(rng):
+            keys = bitstrings(n, width) if n > 4 else ['00', '01', '10', '11']
+            return {'counts_by_error': {
+                str(qubit): spread_counts(keys + [syndrome], rng, [syndrome])
+                for qubit, syndrome in ((0, '10'), (1, '11'), (2, '01'))
+            }}
+        return factory
+
+    def task376(n):
+        def factory(rng):
+            unprotected = [rng.uniform(0.5, 0.7) for _ in range(n)]
+            return {'unprotected': unprotected, 'protected': [u * 1.6 for u in unprotected]}
+        return factory
+
+    def fixed(task_id):
+        return {'typical': lambda rng: accepted(task_id, rng)}
+
+    return {
+        'evaluate_challenge_35_task1': fixed(351),
+        'evaluate_challenge_35_task2': fixed(352),
+        'evaluate_challenge_35_task3': fixed(353),
+        'evaluate_challenge_35_task4': fixed(354),
+        'evaluate_challenge_35_task5': fixed(355),
+        'evaluate_challenge_35_results': {'typical': lambda rng: dict(results_35)},
+        'evaluate_challenge_35': {'typical': code_35},
+        'evaluate_challenge_36_task1': {
+            'minimal': task361(100), 'typical': task361(10_000),
+            'large': task361(100_000), 'pathological': task361(1_000_000)},
+        'evaluate_challenge_36_task2': {
+            'minimal': task362(50, 16), 'typical': task362(500, 64),
+            'large': task362(2_000, 784), 'pathological': task362(10_000, 784)},
+        'evaluate_challenge_36_task3': {
+            'minimal': task363(5), 'typical': task363(1_000),
+            'large': task363(100_000), 'pathological': task363(1_000_000)},
+        'evaluate_challenge_36_results': {
+            'minimal': results_36(100, (50, 16), 5), 'typical': results_36(10_000, (500, 64), 1_000),
+            'large': results_36(100_000, (2_000, 784), 100_000),
+            'pathological': results_36(1_000_000, (10_000, 784), 1_000_000)},
+        'evaluate_challenge_36': {
+            'minimal': code_36(100, (50, 16), 5), 'typical': code_36(1_000, (50, 16), 100),
+            'large': code_36(10_000, (500, 64), 10_000)},
+        'evaluate_challenge_37_task371': {
+            'minimal': task371(4, 2), 'typical': task371(1_024, 10),
+            'large': task371(65_536, 16), 'pathological': task371(1 << 20, 20)},
+        'evaluate_challenge_37_task372': {
+            'minimal': task372(4, 2), 'typical': task372(1_024, 10),
+            'large': task372(65_536, 16), 'pathological': task372(1 << 20, 20)},
+        'evaluate_challenge_37_task373': {
+            'minimal': task373(5), 'typical': task373(100),
+            'large': task373(100_000), 'pathological': task373(1_000_000)},
+        'evaluate_challenge_37_task374': fixed(374),
+        'evaluate_challenge_37_task375': {
+            'minimal': task375(4, 2), 'typical': task375(1_024, 10),
+            'large': task375(65_536, 16), 'pathological': task375(1 << 20, 20)},
+        'evaluate_challenge_37_task376': {
+            'minimal': task376(5), 'typical': task376(1_000),
+            'large': task376(100_000), 'pathological': task376(1_000_000)},
+        'evaluate_challenge_37_task377': fixed(377),
+        'evaluate_challenge_37_task378': fixed(378),
+    }
+
+
+def measure(func, argument, repeat):
+    func(argument)  # Warm-up: lazy imports, allocator pools
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        verdict = func(argument)
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    func(argument)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak, verdict
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', nargs='+', choices=SIZES, default=list(SIZES))
+    parser.add_argument('--filter', default='', help='Only methods whose name contains this')
+    parser.add_argument('--repeat', type=int, default=7, help='Timed calls per case (pathological: 1)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--baseline', help='Compare against this baseline file')
+    parser.add_argument('--save-baseline', nargs='?', const=DEFAULT_BASELINE,
+                        help=f'Write results as the new baseline (default: {os.path.relpath(DEFAULT_BASELINE, ROOT)})')
+    parser.add_argument('--threshold', type=float, default=2.0,
+                        help='Slowdown ratio that counts as a regression (shared CI boxes jitter by ~1.5x)')
+    parser.add_argument('--min-delta-ms', type=float, default=0.5,
+                        help='Ignore slowdowns smaller than this in absolute terms')
+    args = parser.parse_args()
+
+    cases = build_cases()
+    methods = sorted(name for name in dir(CodeEvaluator) if name.startswith('evaluate_challenge_'))
+    uncovered = [name for name in methods if name not in cases]
+    if uncovered:
+        sys.exit(f'No benchmark cases for: {", ".join(uncovered)}')
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)['cases']
+
+    print(f"{'case':<52} {'time ms':>10} {'peak MB':>9} {'score':>6} {'passed':>7} {'vs base':>8}")
+    print('-' * 97)
+    results, regressions = {}, []
+    for method in methods:
+        if args.filter not in method:
+            continue
+        func = getattr(CodeEvaluator, method)
+        for size in SIZES:
+            if size not in args.sizes or size not in cases[method]:
+                continue
+            argument = cases[method][size](random.Random(args.seed))
+            repeat = 1 if size == 'pathological' else args.repeat
+            seconds, peak, verdict = measure(func, argument, repeat)
+            del argument
+
+            key = f'{method}[{size}]'
+            results[key] = {'time_ms': round(seconds * 1e3, 4), 'peak_mb': round(peak / 2 ** 20, 3),
+                            'score': verdict[0], 'passed': verdict[1]}
+
+            ratio = ''
+            if key in baseline:
+                before = baseline[key]['time_ms']
+                ratio = f'{seconds * 1e3 / before:.2f}x' if before else ''
+                if seconds * 1e3 > before * args.threshold and seconds * 1e3 - before > args.min_delta_ms:
+                    regressions.append(f'{key}: {before:.3f} ms -> {seconds * 1e3:.3f} ms')
+                    ratio += ' !'
+            print(f"{key:<52} {seconds * 1e3:>10.3f} {peak / 2 ** 20:>9.2f} {verdict[0]:>6} {str(verdict[1]):>7} {ratio:>8}")
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as f:
+            json.dump({
+                'machine': {'python': platform.python_version(), 'numpy': np.__version__,
+                            'platform': platform.platform(), 'processor': platform.processor()},
+                'cases': results,
+            }, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f'\nBaseline written to {args.save_baseline}')
+
+    if regressions:
+        print(f'\n{len(regressions)} regression(s) over {args.threshold}x:')
+        for line in regressions:
+            print(f'  {line}')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
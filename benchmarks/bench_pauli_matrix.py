@@ -0,0 +1,109 @@
+"""
+Benchmark: grader.pauli (numpy bitmask engine) vs qiskit NumPyEigensolver.
+
+Compares the lowest eigenvalues of the AHC25 Alpha/Beta Hamiltonians and of
+random 2-local Pauli sums from 4 to 16 qubits. qiskit is only needed for the
+comparison column and is skipped above --max-qiskit-qubits.
+
+Run with: python benchmarks/bench_pauli_matrix.py
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'django_server'))
+
+from grader.pauli import lowest_eigenpairs
+
+
+def random_local_pauli_sum(num_qubits, rng):
+    """Random fields on every qubit plus random 2-body terms on neighbouring pairs."""
+    labels, coeffs = [], []
+    for q in range(num_qubits):
+        for a in 'XYZ':
+            term = ['I'] * num_qubits
+            term[q] = a
+            labels.append(''.join(term))
+            coeffs.append(0.5 * rng.normal())
+    for q in range(num_qubits - 1):
+        for a in 'XYZ':
+            for b in 'XYZ':
+                term = ['I'] * num_qubits
+                term[q], term[q + 1] = a, b
+                labels.append(''.join(term))
+                coeffs.append(rng.normal())
+    return labels, np.array(coeffs)
+
+
+def time_call(func, repeat):
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def bench_case(name, labels, coeffs, k, repeat, max_qiskit_qubits):
+    num_qubits = len(labels[0])
+    t_numpy, (evals, _) = time_call(lambda: lowest_eigenpairs(labels, coeffs, k), repeat)
+
+    t_qiskit, max_err = None, None
+    if num_qubits <= max_qiskit_qubits:
+        try:
+            from qiskit.quantum_info import SparsePauliOp
+            from qiskit_algorithms.eigensolvers import NumPyEigensolver
+        except ImportError:
+            pass
+        else:
+            def run_qiskit():
+                result = NumPyEigensolver(k=k).compute_eigenvalues(SparsePauliOp(labels, coeffs))
+                return np.sort(np.real(result.eigenvalues))
+
+            t_qiskit, ref = time_call(run_qiskit, repeat)
+            max_err = float(np.max(np.abs(evals - ref)))
+
+    speedup = f"{t_qiskit / t_numpy:8.1f}x" if t_qiskit else f"{'-':>9}"
+    qiskit_ms = f"{t_qiskit * 1e3:10.2f}" if t_qiskit else f"{'-':>10}"
+    err = f"{max_err:.2e}" if max_err is not None else '-'
+    print(f"{name:<22} {num_qubits:>3} {len(labels):>6} {t_numpy * 1e3:10.2f} {qiskit_ms} {speedup}  {err}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--k', type=int, default=4, help='Number of eigenpairs')
+    parser.add_argument('--repeat', type=int, default=3, help='Best-of-N timing')
+    parser.add_argument('--max-qiskit-qubits', type=int, default=12)
+    parser.add_argument('--seed', type=int, default=1234)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+
+    print(f"{'case':<22} {'n':>3} {'terms':>6} {'numpy ms':>10} {'qiskit ms':>10} {'speedup':>9}  max|ΔE|")
+    print("-" * 78)
+
+    try:
+        import AHC25Data
+    except ImportError:
+        AHC25Data = None
+
+    if AHC25Data is not None:
+        for name, getter in (('AHC25 alpha', AHC25Data.get_alpha_hamiltonian),
+                             ('AHC25 beta', AHC25Data.get_beta_hamiltonian)):
+            op = getter()
+            bench_case(name, op.paulis.to_labels(), op.coeffs, args.k, args.repeat, args.max_qiskit_qubits)
+
+    for num_qubits in (4, 6, 8, 10, 12, 14, 16):
+        labels, coeffs = random_local_pauli_sum(num_qubits, rng)
+        bench_case("random 2-local", labels, coeffs, args.k, args.repeat, args.max_qiskit_qubits)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,154 @@
+"""
+Benchmark: N parallel submitters against SQLite, default vs production profile.
+
+Every worker is a separate process (like WSGI workers) that drives the real
+/api/submit-results view through Django's test client, with a mix of
+accepted and rejected Task 351 payloads, against a throwaway database file.
+Reports throughput, latency and "database is locked" errors per profile.
+The "scores" column checks every leaderboard total against its PassedTask
+rows; --same-user makes all workers race on one account.
+A "+wb" suffix (e.g. production+wb) enables SUBMISSION_WRITE_BEHIND, so
+rejected attempts are buffered and bulk-inserted instead of written per request.
+
+Run with: python benchmarks/bench_sqlite_concurrency.py --workers 8 --submits 50
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SERVER_DIR = os.path.join(ROOT, 'django_server')
+
+ACCEPTED = {'alpha_vqe_result': -12.29314089, 'beta_vqe_result': 0.00015438}
+REJECTED = {'alpha_vqe_result': -1.0, 'beta_vqe_result': 5.0}
+
+
+def setup_django(db_path, profile):
+    profile, _, options = profile.partition('+')
+    os.environ['SQLITE_PATH'] = db_path
+    os.environ['DB_PROFILE'] = profile
+    os.environ['SUBMISSION_WRITE_BEHIND'] = str(options == 'wb')
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'halloween_server.settings')
+    sys.path.insert(0, SERVER_DIR)
+
+    import django
+    django.setup()
+
+
+def prepare_database(db_path, profile, num_users):
+    setup_django(db_path, profile)
+
+    from django.contrib.auth.models import User
+    from django.core.management import call_command
+    from rest_framework.authtoken.models import Token
+    from grader.models import Challenge
+
+    call_command('migrate', run_syncdb=True, verbosity=0)
+    Challenge.objects.create(id=351, name='Task 351', description='bench', max_score=20)
+
+    tokens = []
+    for i in range(num_users):
+        user = User.objects.create_user(username=f'bench{i}', password=f'bench{i}')
+        tokens.append(Token.objects.create(user=user).key)
+    return tokens
+
+
+def worker(args):
+    db_path, profile, token, submits, accept_every = args
+    setup_django(db_path, profile)
+
+    from django.db import OperationalError
+    from django.test import Client
+
+    client = Client()
+    latencies, locked, errors = [], 0, 0
+
+    for i in range(submits):
+        payload = ACCEPTED if i % accept_every == 0 else REJECTED
+        body = json.dumps({'challenge_id': 351, 'results': payload})
+        start = time.perf_counter()
+        try:
+            response = client.post('/api/submit-results', body, content_type='application/json',
+                                   HTTP_AUTHORIZATION=f'Token {token}')
+            if response.status_code != 200:
+                errors += 1
+        except OperationalError as e:
+            if 'locked' in str(e):
+                locked += 1
+            else:
+                errors += 1
+        latencies.append(time.perf_counter() - start)
+
+    # Pool workers exit without running atexit: write what is still buffered
+    from grader.writebehind import submission_buffer
+    submission_buffer.flush()
+
+    return latencies, locked, errors
+
+
+def check_database(db_path, profile):
+    setup_django(db_path, profile)
+
+    from django.db.models import Sum
+    from grader.models import Leaderboard, PassedTask, Submission
+
+    wrong = 0
+    for entry in Leaderboard.objects.all():
+        passed = PassedTask.objects.filter(user_id=entry.user_id)
+        expected = passed.aggregate(total=Sum('challenge__max_score'))['total'] or 0
+        wrong += entry.total_score != expected or entry.challenges_completed != passed.count()
+    return Submission.objects.count(), 'ok' if wrong == 0 else f'{wrong} bad'
+
+
+def run_profile(profile, workers, submits, accept_every, same_user):
+    tmpdir = tempfile.mkdtemp(prefix='bench_sqlite_')
+    db_path = os.path.join(tmpdir, 'db.sqlite3')
+
+    # Schema/users are created in a child so the parent never imports Django settings
+    ctx = multiprocessing.get_context('spawn')
+    with ctx.Pool(1) as pool:
+        tokens = pool.apply(prepare_database, (db_path, profile, 1 if same_user else workers))
+    if same_user:
+        tokens = tokens * workers
+
+    with ctx.Pool(workers) as pool:
+        start = time.perf_counter()
+        results = pool.map(worker, [(db_path, profile, token, submits, accept_every) for token in tokens])
+        elapsed = time.perf_counter() - start
+
+    with ctx.Pool(1) as pool:
+        stored, scores = pool.apply(check_database, (db_path, profile))
+
+    latencies = sorted(l for r in results for l in r[0])
+    locked = sum(r[1] for r in results)
+    errors = sum(r[2] for r in results)
+    total = workers * submits
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+
+    print(f"{profile:<13} {total:>7} {elapsed:8.2f} {total / elapsed:9.1f} "
+          f"{statistics.median(latencies) * 1e3:8.1f} {p95 * 1e3:8.1f} {locked:>7} {errors:>7} {stored:>7} {scores:>7}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--submits', type=int, default=50, help='Submissions per worker')
+    parser.add_argument('--accept-every', type=int, default=4, help='1 accepted payload every N')
+    parser.add_argument('--same-user', action='store_true', help='All workers submit as one user')
+    parser.add_argument('--profiles', nargs='+', default=['default', 'production', 'production+wb'])
+    args = parser.parse_args()
+
+    print(f"{'profile':<13} {'submits':>7} {'secs':>8} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'locked':>7} {'errors':>7} {'stored':>7} {'scores':>7}")
+    print("-" * 88)
+    for profile in args.profiles:
+        run_profile(profile, args.workers, args.submits, args.accept_every, args.same_user)
+
+
+if __name__ == '__main__':
+    main()
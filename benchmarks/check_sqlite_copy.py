@@ -0,0 +1,211 @@
+"""
+Harness: copies a seeded db.sqlite3 with `manage.py import_sqlite` and checks
+the target row by row.
+
+Target database, in order of preference:
+  1. --target-url / TARGET_DATABASE_URL (an existing, empty Postgres database)
+  2. a throwaway Postgres cluster (initdb + pg_ctl, if they are on PATH)
+  3. a throwaway SQLite file standing in for Postgres
+
+Every stage runs in its own process, because settings read DATABASE_URL /
+SQLITE_PATH once at startup.
+
+Run with: python benchmarks/check_sqlite_copy.py --users 200 --submits 20
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SERVER_DIR = os.path.join(ROOT, 'django_server')
+
+
+def setup_django():
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'halloween_server.settings')
+    sys.path.insert(0, SERVER_DIR)
+
+    import django
+    django.setup()
+
+
+def stage_seed(users, submits, seed):
+    setup_django()
+
+    from django.contrib.auth.hashers import make_password
+    from django.contrib.auth.models import User
+    from django.core.management import call_command
+    from django.db import transaction
+    from rest_framework.authtoken.models import Token
+    from grader.models import Challenge, Leaderboard, PassedTask, Submission
+
+    call_command('migrate', run_syncdb=True, verbosity=0)
+    rng = random.Random(seed)
+    # Un solo hash: create_user() con PBKDF2 domina el tiempo de seed
+    password = make_password('seed')
+
+    with transaction.atomic():
+        challenges = [
+            Challenge.objects.create(id=cid, name=f'Task {cid}', description='seed', max_score=20)
+            for cid in (351, 352, 353, 354)
+        ]
+        for i in range(users):
+            # post_save crea UserProfile y Leaderboard
+            user = User.objects.create(username=f'user{i}', password=password,
+                                       email=f'user{i}@example.com')
+            Token.objects.create(user=user)
+            for _ in range(rng.randint(0, submits)):
+                challenge = rng.choice(challenges)
+                passed = rng.random() < 0.3
+                submission = Submission.objects.create(
+                    user=user, challenge=challenge, code='print("ñ")' * rng.randint(1, 50),
+                    score=challenge.max_score if passed else 0, passed=passed,
+                    feedback='✅' if passed else '❌', execution_time=rng.random(),
+                )
+                if passed:
+                    PassedTask.record(user, challenge, submission)
+            Leaderboard.objects.filter(user=user).update(total_score=rng.randint(0, 80))
+
+
+def stage_import(source):
+    setup_django()
+
+    from django.core.management import call_command
+
+    call_command('migrate', run_syncdb=True, verbosity=0)
+    call_command('import_sqlite', source, chunk_size=500)
+
+
+def stage_dump():
+    """Prints {table: [row, ...]} with every concrete column, ordered by PK."""
+    setup_django()
+
+    from grader.management.commands.import_sqlite import COPY_ORDER
+
+    dump = {}
+    for model in COPY_ORDER:
+        fields = [f.attname for f in model._meta.concrete_fields]
+        dump[model._meta.db_table] = [
+            [str(value) for value in row]
+            for row in model.objects.order_by('pk').values_list(*fields)
+        ]
+
+    # Las secuencias deben continuar tras la PK máxima copiada
+    from django.contrib.auth.models import User
+    probe = User.objects.create(username='__sequence_probe__')
+    dump['_next_user_id'] = probe.pk
+    probe.delete()
+
+    print(json.dumps(dump))
+
+
+def run_stage(env, *args):
+    result = subprocess.run([sys.executable, __file__, '--stage', *args], env={**os.environ, **env},
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        sys.stderr.write(result.stdout + result.stderr)
+        raise SystemExit(f"Stage {args[0]} failed")
+    return result.stdout
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_postgres(tmpdir):
+    """Starts a throwaway cluster; returns (database_url, stop) or None."""
+    if not (shutil.which('initdb') and shutil.which('pg_ctl')):
+        return None
+
+    data_dir = os.path.join(tmpdir, 'pgdata')
+    port = free_port()
+    subprocess.run(['initdb', '-D', data_dir, '-U', 'grader', '--auth=trust'],
+                   check=True, capture_output=True)
+    subprocess.run(['pg_ctl', '-D', data_dir, '-w', '-l', os.path.join(tmpdir, 'pg.log'),
+                    '-o', f'-p {port} -k {tmpdir} -c listen_addresses=127.0.0.1', 'start'],
+                   check=True, capture_output=True)
+
+    def stop():
+        subprocess.run(['pg_ctl', '-D', data_dir, '-m', 'fast', 'stop'], capture_output=True)
+
+    return f'postgres://grader@127.0.0.1:{port}/postgres', stop
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--submits', type=int, default=20, help='Max submissions per user')
+    parser.add_argument('--seed', type=int, default=1234)
+    parser.add_argument('--target-url', default=os.environ.get('TARGET_DATABASE_URL'))
+    parser.add_argument('--stage', nargs='+', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.stage:
+        name, *rest = args.stage
+        if name == 'seed':
+            stage_seed(args.users, args.submits, args.seed)
+        elif name == 'import':
+            stage_import(rest[0])
+        elif name == 'dump':
+            stage_dump()
+        return
+
+    tmpdir = tempfile.mkdtemp(prefix='check_sqlite_copy_')
+    source = os.path.join(tmpdir, 'source.sqlite3')
+    stop = None
+
+    try:
+        if args.target_url:
+            target_env, label = {'DATABASE_URL': args.target_url}, 'postgres (TARGET_DATABASE_URL)'
+        elif (pg := start_postgres(tmpdir)) is not None:
+            url, stop = pg
+            target_env, label = {'DATABASE_URL': url}, 'postgres (throwaway cluster)'
+        else:
+            target_env = {'SQLITE_PATH': os.path.join(tmpdir, 'target.sqlite3'), 'DATABASE_URL': ''}
+            label = 'sqlite stand-in (no initdb/pg_ctl on PATH)'
+        print(f"Target: {label}")
+
+        source_env = {'SQLITE_PATH': source, 'DATABASE_URL': ''}
+
+        start = time.perf_counter()
+        run_stage(source_env, 'seed', '--users', str(args.users), '--submits', str(args.submits),
+                  '--seed', str(args.seed))
+        print(f"Seeded source in {time.perf_counter() - start:.1f}s")
+
+        start = time.perf_counter()
+        print(run_stage(target_env, 'import', source).rstrip())
+        print(f"Imported in {time.perf_counter() - start:.1f}s")
+
+        expected = json.loads(run_stage(source_env, 'dump'))
+        copied = json.loads(run_stage(target_env, 'dump'))
+
+        failures = 0
+        for table, rows in expected.items():
+            ok = copied.get(table) == rows
+            failures += not ok
+            count = len(rows) if isinstance(rows, list) else rows
+            print(f"  {'OK ' if ok else 'BAD'} {table:<24} {count}")
+            if not ok:
+                first = next((a, b) for a, b in zip(rows, copied.get(table) or [None] * len(rows)) if a != b)
+                print(f"      source: {first[0]}\n      target: {first[1]}")
+
+        if failures:
+            raise SystemExit(f"{failures} table(s) differ")
+        print("All tables match")
+    finally:
+        if stop:
+            stop()
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
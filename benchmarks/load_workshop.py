@@ -0,0 +1,279 @@
+"""
+Load test: simulate a live workshop against a local runserver or gunicorn.
+
+N virtual students (threads, each with its own requests.Session) register,
+log in and work through tasks 351-378 in random order: a few rejected
+attempts, then the accepted payload (see payloads.py), with an exponential
+think time between submissions and a /api/progress check after each pass.
+Every student also reloads the leaderboard page at the template's 30 s
+cadence. Reports throughput, p50/p95/p99 per endpoint and error rates
+("database is locked", other 5xx, 4xx, timeouts), and --json writes the
+whole report so runs can be compared.
+
+With --serve runserver|gunicorn|uvicorn the script starts the server itself
+on a throwaway SQLite database (migrate + load_challenges) and stops it at
+the end; uvicorn runs asgi.py with ASYNC_VIEWS=True. Otherwise point
+--base-url at an instance that is already running.
+
+Run with: python benchmarks/load_workshop.py --serve runserver --students 30 --duration 120
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter, defaultdict
+
+import requests
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SERVER_DIR = os.path.join(ROOT, 'django_server')
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from payloads import TASK_IDS, accepted, rejected  # noqa: E402
+
+PASSWORD = 'workshop-load-test'
+SERVERS = ('runserver', 'gunicorn', 'uvicorn')
+
+
+class Recorder:
+    """Latencies and error kinds per endpoint, shared by all student threads."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(Counter)
+        self.verdicts = Counter()
+
+    def request(self, session, endpoint, method, url, **kwargs):
+        start = time.perf_counter()
+        try:
+            response = session.request(method, url, **kwargs)
+        except requests.Timeout:
+            kind, response = 'timeout', None
+        except requests.ConnectionError:
+            kind, response = 'connection', None
+        else:
+            if response.status_code >= 500:
+                kind = 'locked' if 'locked' in response.text.lower() else 'http_5xx'
+            elif response.status_code >= 400:
+                kind = 'http_4xx'
+            else:
+                kind = None
+        elapsed = time.perf_counter() - start
+
+        with self._lock:
+            self.latencies[endpoint].append(elapsed)
+            if kind:
+                self.errors[endpoint][kind] += 1
+        return response if kind is None else None
+
+    def verdict(self, passed):
+        with self._lock:
+            self.verdicts['accepted' if passed else 'rejected'] += 1
+
+
+def percentile(sorted_values, q):
+    if len(sorted_values) == 1:
+        return sorted_values[0]
+    return statistics.quantiles(sorted_values, n=100, method='inclusive')[q - 1]
+
+
+def student(index, args, recorder, deadline, rng):
+    base = args.base_url.rstrip('/')
+    session = requests.Session()
+    username = f'{args.user_prefix}{index}'
+    timeout = args.timeout
+
+    # Staggered arrival, like a class walking in
+    time.sleep(rng.uniform(0, args.ramp_up))
+
+    recorder.request(session, 'register', 'POST', f'{base}/api/register', timeout=timeout,
+                     json={'username': username, 'email': f'{username}@example.com', 'password': PASSWORD})
+    response = recorder.request(session, 'login', 'POST', f'{base}/api/login', timeout=timeout,
+                                json={'username': username, 'password': PASSWORD})
+    if response is None:
+        return
+    session.headers['Authorization'] = f"Token {response.json()['token']}"
+
+    tasks = list(args.tasks)
+    rng.shuffle(tasks)
+    next_poll = time.monotonic() + rng.uniform(0, args.poll_interval)
+
+    def wait(seconds):
+        nonlocal next_poll
+        until = min(deadline, time.monotonic() + seconds)
+        while True:
+            now = time.monotonic()
+            if now >= next_poll and now < deadline:
+                recorder.request(session, 'leaderboard', 'GET', f'{base}/api/leaderboard', timeout=timeout,
+                                 headers={'Accept': 'text/html,application/xhtml+xml,*/*;q=0.8'})
+                next_poll += args.poll_interval
+                continue
+            if now >= until:
+                return
+            time.sleep(min(until, next_poll) - now)
+
+    for task_id in tasks:
+        rejections = rng.randint(0, args.max_rejected)
+        for attempt in range(rejections + 1):
+            if time.monotonic() >= deadline:
+                return
+            wait(rng.expovariate(1 / args.think_time))
+            results = accepted(task_id, rng) if attempt == rejections else rejected(task_id, rng)
+            response = recorder.request(session, 'submit-results', 'POST', f'{base}/api/submit-results',
+                                        timeout=timeout, json={'challenge_id': task_id, 'results': results})
+            if response is not None:
+                passed = response.json().get('passed', False)
+                recorder.verdict(passed)
+                if passed:
+                    recorder.request(session, 'progress', 'GET', f'{base}/api/progress', timeout=timeout)
+                    break
+
+    # Done with every task: keep watching the leaderboard until the end
+    wait(deadline - time.monotonic())
+
+
+def start_server(args, setup=()):
+    """Start args.serve on a throwaway database; `setup` are extra manage.py commands run before it."""
+    tmpdir = tempfile.mkdtemp(prefix='load_workshop_')
+    env = dict(os.environ, SQLITE_PATH=os.path.join(tmpdir, 'db.sqlite3'), DB_PROFILE=args.profile,
+               DJANGO_SETTINGS_MODULE='halloween_server.settings')
+    manage = [sys.executable, 'manage.py']
+    subprocess.run(manage + ['migrate', '--run-syncdb', '-v0'], cwd=SERVER_DIR, env=env, check=True)
+    for command in [['load_challenges', 'challenges.json'], *setup]:
+        subprocess.run(manage + command, cwd=SERVER_DIR, env=env, check=True, stdout=subprocess.DEVNULL)
+
+    host, port = '127.0.0.1', str(args.port)
+    if args.serve == 'gunicorn':
+        command = ['gunicorn', 'halloween_server.wsgi:application', '--workers', str(args.server_workers),
+                   '--bind', f'{host}:{port}', '--log-level', 'warning']
+    elif args.serve == 'uvicorn':
+        # ASGI with the async views (grader/async_views.py)
+        env['ASYNC_VIEWS'] = 'True'
+        command = [sys.executable, '-m', 'uvicorn', 'halloween_server.asgi:application',
+                   '--workers', str(args.server_workers), '--host', host, '--port', port, '--log-level', 'warning']
+    else:
+        command = manage + ['runserver', '--noreload', f'{host}:{port}']
+    server = subprocess.Popen(command, cwd=SERVER_DIR, env=env,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    args.base_url = f'http://{host}:{port}'
+
+    # Wait until the server answers and has finished warming up
+    for _ in range(300):
+        try:
+            if requests.get(f'{args.base_url}/api/health?ready=1', timeout=1).status_code == 200:
+                return server, tmpdir
+        except requests.ConnectionError:
+            pass
+        if server.poll() is not None:
+            break
+        time.sleep(0.1)
+    server.terminate()
+    shutil.rmtree(tmpdir, ignore_errors=True)
+    sys.exit(f'{args.serve} did not become ready on {args.base_url}')
+
+
+def report(args, recorder, elapsed):
+    endpoints = {}
+    for endpoint, latencies in sorted(recorder.latencies.items()):
+        latencies = sorted(latencies)
+        errors = sum(recorder.errors[endpoint].values())
+        endpoints[endpoint] = {
+            'requests': len(latencies),
+            'rps': round(len(latencies) / elapsed, 2),
+            'error_rate': round(errors / len(latencies), 4),
+            'errors': dict(recorder.errors[endpoint]),
+            'p50_ms': round(percentile(latencies, 50) * 1e3, 1),
+            'p95_ms': round(percentile(latencies, 95) * 1e3, 1),
+            'p99_ms': round(percentile(latencies, 99) * 1e3, 1),
+            'max_ms': round(latencies[-1] * 1e3, 1),
+        }
+
+    total = sum(e['requests'] for e in endpoints.values())
+    error_kinds = Counter()
+    for counter in recorder.errors.values():
+        error_kinds.update(counter)
+
+    return {
+        'config': {key: value for key, value in vars(args).items() if key != 'json'},
+        'elapsed_s': round(elapsed, 2),
+        'requests': total,
+        'throughput_rps': round(total / elapsed, 2),
+        'verdicts': dict(recorder.verdicts),
+        'errors': dict(error_kinds),
+        'endpoints': endpoints,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--base-url', default='http://127.0.0.1:8000')
+    parser.add_argument('--serve', choices=SERVERS,
+                        help='Start a local server on a throwaway database instead of using --base-url')
+    parser.add_argument('--port', type=int, default=8765, help='Port for --serve')
+    parser.add_argument('--server-workers', type=int, default=4, help='Worker processes for gunicorn/uvicorn')
+    parser.add_argument('--profile', default='production', help='DB_PROFILE for --serve')
+    parser.add_argument('--students', type=int, default=30)
+    parser.add_argument('--duration', type=float, default=120, help='Seconds to run')
+    parser.add_argument('--ramp-up', type=float, default=10, help='Students arrive spread over N seconds')
+    parser.add_argument('--think-time', type=float, default=5, help='Mean seconds between submissions')
+    parser.add_argument('--max-rejected', type=int, default=3,
+                        help='Each task takes 0..N rejected attempts before the accepted one')
+    parser.add_argument('--poll-interval', type=float, default=30, help='Leaderboard reload period (s)')
+    parser.add_argument('--tasks', type=int, nargs='+', default=list(TASK_IDS))
+    parser.add_argument('--timeout', type=float, default=30, help='Per-request timeout (s)')
+    parser.add_argument('--user-prefix', default=f'load{int(time.time())}-')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', help='Write the report to this file')
+    args = parser.parse_args()
+
+    server = tmpdir = None
+    if args.serve:
+        server, tmpdir = start_server(args)
+
+    recorder = Recorder()
+    try:
+        start = time.perf_counter()
+        deadline = time.monotonic() + args.duration
+        threads = [
+            threading.Thread(target=student, args=(i, args, recorder, deadline, random.Random(args.seed * 100003 + i)),
+                             daemon=True)
+            for i in range(args.students)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+            shutil.rmtree(tmpdir, ignore_errors=True)
+
+    result = report(args, recorder, elapsed)
+
+    print(f"{args.students} students, {result['elapsed_s']}s, {result['requests']} requests, "
+          f"{result['throughput_rps']} req/s, verdicts {result['verdicts']}, errors {result['errors'] or 'none'}\n")
+    print(f"{'endpoint':<16} {'reqs':>6} {'req/s':>7} {'err %':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    print("-" * 74)
+    for endpoint, stats in result['endpoints'].items():
+        print(f"{endpoint:<16} {stats['requests']:>6} {stats['rps']:>7.2f} {stats['error_rate'] * 100:>6.1f} "
+              f"{stats['p50_ms']:>8.1f} {stats['p95_ms']:>8.1f} {stats['p99_ms']:>8.1f} {stats['max_ms']:>8.1f}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(result, f, indent=2)
+        print(f"\nReport written to {args.json}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+"""
+Realistic /api/submit-results payloads for tasks 351-378.
+
+accepted(task_id, rng) and rejected(task_id, rng) return a fresh `results`
+dict shaped like the ones grader_qiskit_client.py sends, with some jitter so
+consecutive submissions are not byte-identical. Rejected payloads mimic the
+usual student mistakes (wrong sign, missing gate, swapped shape, ...), not
+garbage. Shared by the load, replay and evaluator benchmarks.
+"""
+
+import random
+
+TASK_IDS = (351, 352, 353, 354, 355, 361, 362, 363, 371, 372, 373, 374, 375, 376, 377, 378)
+
+
+def _near(rng, value, rel=0.002):
+    return value * (1 + rng.uniform(-rel, rel))
+
+
+def _counts(rng, shots, weights):
+    """Split `shots` over the keys of `weights` (a dict of relative weights)."""
+    keys = list(weights)
+    draws = rng.choices(keys, weights=[weights[k] for k in keys], k=shots)
+    counts = dict.fromkeys(keys, 0)
+    for key in draws:
+        counts[key] += 1
+    return {key: value for key, value in counts.items() if value}
+
+
+def accepted(task_id, rng=random):
+    if task_id == 351:
+        return {'alpha_vqe_result': _near(rng, -12.29314089), 'beta_vqe_result': _near(rng, 0.00015438)}
+    if task_id == 352:
+        return {'alpha_gap_ev': _near(rng, 52.00319191407749), 'beta_gap_ev': _near(rng, 27.211399999999994),
+                'alpha_homo_lumo': _near(rng, 1.9110810878557327), 'beta_homo_lumo': _near(rng, 1.0)}
+    if task_id == 353:
+        return {'alpha_index': 1, 'beta_index': 0, 'fidelity': _near(rng, 0.999)}
+    if task_id == 354:
+        return {'final_energy_beta': _near(rng, 0.0006559581843628555)}
+    if task_id == 355:
+        return {'final_energy_perturbed': _near(rng, -12.294612921331247)}
+    if task_id == 361:
+        hidden = [rng.randrange(10) for _ in range(200)]
+        preds = hidden[:]
+        for i in rng.sample(range(len(hidden)), 2):  # accuracy 0.99
+            preds[i] = (preds[i] + 1) % 10
+        return {'task361_predictions': preds, 'task361_y_test_hidden': hidden}
+    if task_id == 362:
+        clean = [[round(rng.random(), 6) for _ in range(16)] for _ in range(50)]
+        generated = [[round(v + rng.gauss(0, 0.05), 6) for v in row] for row in clean]
+        return {'task362_generated_images': generated, 'task362_test_clean': clean,
+                'task362_generated_shapes': [50, 16]}
+    if task_id == 363:
+        return {'task363_total_rewards': [round(rng.gauss(5, 2), 3) for _ in range(100)]}
+    if task_id == 371:
+        return {'num_qubits': 2, 'num_clbits': 2, 'ops': ['h', 'cx', 'measure', 'measure'],
+                'counts': _counts(rng, 1024, {'00': 49, '11': 49, '01': 1, '10': 1})}
+    if task_id == 372:
+        return {'has_structure': True, 'counts_noisy': _counts(rng, 1024, {'00': 44, '11': 44, '01': 6, '10': 6})}
+    if task_id == 373:
+        return {'noise_levels': [0.0, 0.05, 0.1, 0.15, 0.2],
+                'fidelities': [1.0, _near(rng, 0.95, 0.01), _near(rng, 0.9, 0.01), _near(rng, 0.84, 0.01), 0.78]}
+    if task_id == 374:
+        return {'cx_count': 2, 'overlap': _near(rng, 0.998, 0.001)}
+    if task_id == 375:
+        return {'counts_by_error': {
+            str(qubit): _counts(rng, 1024, {syndrome: 97, '00': 3})
+            for qubit, syndrome in ((0, '10'), (1, '11'), (2, '01'))
+        }}
+    if task_id == 376:
+        unprotected = [round(rng.uniform(0.55, 0.75), 4) for _ in range(5)]
+        return {'unprotected': unprotected, 'protected': [round(min(0.999, u * 1.6), 4) for u in unprotected]}
+    if task_id == 377:
+        return {'h_count': 3, 'cx_count': 8, 'num_qubits': 9}
+    if task_id == 378:
+        return {'cx_count': 12, 'measure_count': 6}
+    raise ValueError(f'No payload for task {task_id}')
+
+
+def rejected(task_id, rng=random):
+    results = accepted(task_id, rng)
+    if task_id == 351:
+        results['alpha_vqe_result'] = -results['alpha_vqe_result']
+    elif task_id == 352:
+        results['alpha_gap_ev'] *= 27.211  # Hartree -> eV conversion applied twice
+    elif task_id == 353:
+        results['alpha_index'], results['beta_index'] = 0, 1
+    elif task_id == 354:
+        results['final_energy_beta'] *= 10
+    elif task_id == 355:
+        results['final_energy_perturbed'] = -12.29314089 * 1.05
+    elif task_id == 361:
+        results['task361_predictions'] = [(p + rng.randrange(1, 10)) % 10 if rng.random() < 0.2 else p
+                                          for p in results['task361_predictions']]
+    elif task_id == 362:
+        results['task362_generated_shapes'] = [16, 50]
+    elif task_id == 363:
+        results['task363_total_rewards'] = [-abs(r) for r in results['task363_total_rewards']]
+    elif task_id == 371:
+        results['ops'] = ['cx', 'measure', 'measure']
+        results['counts'] = _counts(rng, 1024, {'00': 25, '01': 25, '10': 25, '11': 25})
+    elif task_id == 372:
+        results['has_structure'] = False
+    elif task_id == 373:
+        results['fidelities'] = list(reversed(results['fidelities']))
+    elif task_id == 374:
+        results['cx_count'], results['overlap'] = 1, 0.5
+    elif task_id == 375:
+        results['counts_by_error'] = {key: {'00': 1024} for key in results['counts_by_error']}
+    elif task_id == 376:
+        results['protected'] = results['unprotected'][:]
+    elif task_id == 377:
+        results.update(h_count=1, cx_count=2, num_qubits=3)
+    elif task_id == 378:
+        results.update(cx_count=4, measure_count=2)
+    return results
+
@@ -0,0 +1,194 @@
+"""
+Replay a production submission trace against a local server and check the verdicts.
+
+The trace comes from `python manage.py export_submission_trace trace.jsonl`:
+every stored results submission, with its offset from the first one, its
+challenge, the results payload and the score/passed it got at the time.
+Each submission is sent to /api/submit-results at its original offset
+divided by --speed (1 = real time, 10 = ten times faster, max = as fast as
+the --concurrency senders allow). Trace users are mapped onto --users local
+accounts. Every response is compared with the stored verdict. The report
+shows verdict mismatches per challenge, latency percentiles, how far sends
+fell behind schedule, and throughput. --json writes it for comparing runs.
+
+With --serve runserver|gunicorn|uvicorn a throwaway server is started as in
+load_workshop.py; otherwise point --base-url at a running instance whose
+challenges have the same max_score as production.
+
+Run with: python benchmarks/replay_trace.py trace.jsonl --serve runserver --speed 10
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from load_workshop import PASSWORD, SERVERS, Recorder, percentile, start_server  # noqa: E402
+
+
+def load_trace(path, limit):
+    events = []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                events.append(json.loads(line))
+            if limit and len(events) >= limit:
+                break
+    return events
+
+
+def create_accounts(base_url, prefix, count, concurrency):
+    def account(i):
+        session = requests.Session()
+        username = f'{prefix}{i}'
+        session.post(f'{base_url}/api/register', timeout=60,
+                     json={'username': username, 'email': f'{username}@example.com', 'password': PASSWORD})
+        response = session.post(f'{base_url}/api/login', timeout=60,
+                                json={'username': username, 'password': PASSWORD})
+        response.raise_for_status()
+        session.headers['Authorization'] = f"Token {response.json()['token']}"
+        return session
+
+    with ThreadPoolExecutor(concurrency) as pool:
+        return list(pool.map(account, range(count)))
+
+
+def replay(events, sessions, base_url, speed, concurrency, timeout):
+    recorder = Recorder()
+    mismatches = []
+    by_challenge = defaultdict(Counter)
+    lags = []
+    lock = threading.Lock()
+    local = threading.local()
+
+    def send(event, scheduled):
+        lag = time.perf_counter() - scheduled
+        session = sessions[event['user'] % len(sessions)]
+        # requests.Session is not thread-safe: one copy of the headers per sender thread
+        if not hasattr(local, 'session'):
+            local.session = requests.Session()
+        local.session.headers.update(session.headers)
+        response = recorder.request(local.session, 'submit-results', 'POST', f'{base_url}/api/submit-results',
+                                    timeout=timeout,
+                                    json={'challenge_id': event['challenge_id'], 'results': event['results']})
+        with lock:
+            lags.append(lag)
+            counts = by_challenge[event['challenge_id']]
+            counts['replayed'] += 1
+            if response is None:
+                counts['errors'] += 1
+                return
+            body = response.json()
+            recorder.verdict(body.get('passed', False))
+            if (body.get('score'), body.get('passed')) != (event['score'], event['passed']):
+                counts['mismatches'] += 1
+                mismatches.append({'t': event['t'], 'challenge_id': event['challenge_id'],
+                                   'stored': [event['score'], event['passed']],
+                                   'replayed': [body.get('score'), body.get('passed')]})
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        for event in events:
+            scheduled = start + (event['t'] / speed if speed else 0)
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            pool.submit(send, event, scheduled if speed else time.perf_counter())
+    elapsed = time.perf_counter() - start
+
+    return recorder, mismatches, by_challenge, sorted(lags), elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('trace', help='JSONL file from manage.py export_submission_trace')
+    parser.add_argument('--speed', default='1', help="Time compression factor, or 'max' (default: 1)")
+    parser.add_argument('--base-url', default='http://127.0.0.1:8000')
+    parser.add_argument('--serve', choices=SERVERS,
+                        help='Start a local server on a throwaway database instead of using --base-url')
+    parser.add_argument('--port', type=int, default=8766, help='Port for --serve')
+    parser.add_argument('--server-workers', type=int, default=4, help='Worker processes for gunicorn/uvicorn')
+    parser.add_argument('--profile', default='production', help='DB_PROFILE for --serve')
+    parser.add_argument('--users', type=int, default=50, help='Local accounts the trace users are mapped onto')
+    parser.add_argument('--concurrency', type=int, default=32, help='Requests in flight at most')
+    parser.add_argument('--limit', type=int, help='Replay only the first N submissions')
+    parser.add_argument('--timeout', type=float, default=30, help='Per-request timeout (s)')
+    parser.add_argument('--user-prefix', default=f'replay{int(time.time())}-')
+    parser.add_argument('--show', type=int, default=10, help='Mismatches to list')
+    parser.add_argument('--json', help='Write the report to this file')
+    args = parser.parse_args()
+
+    speed = 0 if args.speed == 'max' else float(args.speed)
+    events = load_trace(args.trace, args.limit)
+    if not events:
+        sys.exit(f'{args.trace} has no submissions')
+    span = events[-1]['t'] - events[0]['t']
+    print(f"{len(events)} submissions from {len({e['user'] for e in events})} users over {span:.0f}s, "
+          f"speed {args.speed} -> ~{span / speed:.0f}s" if speed else
+          f"{len(events)} submissions, speed max")
+
+    server = tmpdir = None
+    if args.serve:
+        server, tmpdir = start_server(args)
+    try:
+        base_url = args.base_url.rstrip('/')
+        sessions = create_accounts(base_url, args.user_prefix, min(args.users, len({e['user'] for e in events})),
+                                   min(args.concurrency, 8))
+        recorder, mismatches, by_challenge, lags, elapsed = replay(
+            events, sessions, base_url, speed, args.concurrency, args.timeout)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+            shutil.rmtree(tmpdir, ignore_errors=True)
+
+    latencies = sorted(recorder.latencies['submit-results'])
+    errors = dict(recorder.errors['submit-results'])
+    result = {
+        'config': {key: value for key, value in vars(args).items() if key != 'json'},
+        'submissions': len(events),
+        'elapsed_s': round(elapsed, 2),
+        'throughput_rps': round(len(events) / elapsed, 2),
+        'errors': errors,
+        'verdicts': dict(recorder.verdicts),
+        'mismatches': len(mismatches),
+        'p50_ms': round(percentile(latencies, 50) * 1e3, 1),
+        'p95_ms': round(percentile(latencies, 95) * 1e3, 1),
+        'p99_ms': round(percentile(latencies, 99) * 1e3, 1),
+        'max_ms': round(latencies[-1] * 1e3, 1),
+        'schedule_lag_p95_ms': round(percentile(lags, 95) * 1e3, 1) if speed else None,
+        'challenges': {str(cid): dict(counts) for cid, counts in sorted(by_challenge.items())},
+        'mismatch_samples': mismatches[:args.show],
+    }
+
+    print(f"\n{result['throughput_rps']} req/s over {result['elapsed_s']}s, "
+          f"p50 {result['p50_ms']} ms, p95 {result['p95_ms']} ms, p99 {result['p99_ms']} ms, "
+          f"errors {errors or 'none'}" + (f", schedule lag p95 {result['schedule_lag_p95_ms']} ms" if speed else ''))
+    print(f"\n{'challenge':>9} {'replayed':>9} {'errors':>7} {'mismatch':>9}")
+    print('-' * 37)
+    for cid, counts in result['challenges'].items():
+        print(f"{cid:>9} {counts.get('replayed', 0):>9} {counts.get('errors', 0):>7} {counts.get('mismatches', 0):>9}")
+    for sample in mismatches[:args.show]:
+        print(f"  t={sample['t']}s challenge {sample['challenge_id']}: "
+              f"stored {sample['stored']} -> replayed {sample['replayed']}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(result, f, indent=2)
+        print(f"\nReport written to {args.json}")
+
+    if mismatches or errors:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,44 @@
 from django.contrib import admin
-from .models import Challenge, Submission, UserProfile
+from django.contrib.admin.views.main import ChangeList
+from django.core.paginator import Paginator
+from django.db import connection
+from django.db.models import F, Func, IntegerField, OuterRef, Subquery
+from django.utils.functional import cached_property
+from .models import Challenge, PassedTask, Submission, UserProfile
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator que no hace COUNT(*) sobre la tabla completa.
+
+    Sin filtros usa la estimación del motor (pg_class.reltuples en PostgreSQL,
+    MAX(rowid) en SQLite); con filtros, o si la tabla es pequeña, cuenta exacto.
+    """
+    exact_threshold = 10000
+
+    @cached_property
+    def count(self):
+        query = getattr(self.object_list, 'query', None)
+        if query is None or query.where:
+            return super().count
+
+        estimate = self._estimate(self.object_list.model)
+        if estimate is None or estimate < self.exact_threshold:
+            return super().count
+        return estimate
+
+    @staticmethod
+    def _estimate(model):
+        table = model._meta.db_table
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE relname = %s', [table])
+            elif connection.vendor == 'sqlite':
+                cursor.execute(f'SELECT MAX(rowid) FROM "{table}"')
+            else:
+                return None
+            row = cursor.fetchone()
+        return int(row[0]) if row and row[0] is not None and row[0] >= 0 else None
 
 
 @admin.register(Challenge)
@@ -23,13 +62,25 @@ class ChallengeAdmin(admin.ModelAdmin):
     )
 
 
+class SubmissionChangeList(ChangeList):
+    def get_queryset(self, request):
+        # El listado no muestra code/feedback: no cargar esos TEXT por fila
+        return super().get_queryset(request).defer('code', 'feedback', 'error_message')
+
+
 @admin.register(Submission)
 class SubmissionAdmin(admin.ModelAdmin):
     list_display = ['id', 'user', 'challenge', 'score', 'passed', 'submitted_at']
     list_filter = ['passed', 'challenge', 'submitted_at']
     search_fields = ['user__username', 'challenge__name']
     readonly_fields = ['submitted_at', 'execution_time']
-    date_hierarchy = 'submitted_at'
+
+    # Tabla más grande: sin COUNT(*) exacto ni "x de y" en el changelist.
+    # Sin date_hierarchy: su SELECT DISTINCT por mes recorre toda la tabla en
+    # cada carga (el filtro de submitted_at cubre hoy / 7 días / mes / año).
+    list_select_related = ['user', 'challenge']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
     fieldsets = (
         ('Submission Info', {
@@ -44,17 +95,49 @@ class SubmissionAdmin(admin.ModelAdmin):
         }),
     )
 
+    def get_changelist(self, request, **kwargs):
+        return SubmissionChangeList
+
+
+class UserProfileChangeList(ChangeList):
+    def get_results(self, request):
+        super().get_results(request)
+        # Tasks aprobadas y rank solo para las filas de la página, en una SELECT
+        # (antes: dos consultas por fila, una de ellas COUNT de toda la tabla).
+        # Como subconsultas de la página y no del queryset completo: ordenar por
+        # una columna sin índice no obliga a calcularlas para todos los perfiles.
+        # COUNT como Func para que Django no añada GROUP BY.
+        count = Func(F('pk'), function='COUNT')
+        completed = PassedTask.objects.filter(user=OuterRef('user')).order_by().annotate(n=count).values('n')
+        higher = UserProfile.objects.filter(total_score__gt=OuterRef('total_score')).order_by().annotate(
+            n=count
+        ).values('n')
+
+        page = {obj.pk: obj for obj in self.result_list}
+        rows = UserProfile.objects.filter(pk__in=page).annotate(
+            challenges_completed=Subquery(completed, output_field=IntegerField()),
+            rank=Subquery(higher, output_field=IntegerField()) + 1,
+        ).values_list('pk', 'challenges_completed', 'rank')
+        for pk, challenges_completed, rank in rows:
+            page[pk].challenges_completed = challenges_completed
+            page[pk].rank = rank
+
 
 @admin.register(UserProfile)
 class UserProfileAdmin(admin.ModelAdmin):
     list_display = ['user', 'total_score', 'get_challenges_completed', 'get_rank', 'created_at']
     search_fields = ['user__username', 'user__email']
     readonly_fields = ['total_score', 'created_at']
+    list_select_related = ['user']
+
+    def get_changelist(self, request, **kwargs):
+        return UserProfileChangeList
 
     def get_challenges_completed(self, obj):
-        return obj.get_challenges_completed()
+        return obj.challenges_completed
     get_challenges_completed.short_description = 'Challenges Completed'
 
     def get_rank(self, obj):
-        return obj.get_rank()
+        return obj.rank
     get_rank.short_description = 'Rank'
+    get_rank.admin_order_field = '-total_score'
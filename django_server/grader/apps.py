@@ -7,3 +7,35 @@ class GraderConfig(AppConfig):
 
     def ready(self):
         import grader.models  # Importar para que los signals funcionen
+
+        from django.db.backends.signals import connection_created
+        from .db import apply_sqlite_pragmas
+        connection_created.connect(apply_sqlite_pragmas, dispatch_uid='grader.apply_sqlite_pragmas')
+
+        # PassedTask desde las aprobadas existentes al migrar una BD anterior (ver grader/models.py)
+        from django.db.models.signals import post_migrate
+        from .models import backfill_passed_tasks
+        post_migrate.connect(backfill_passed_tasks, sender=self, dispatch_uid='grader.models.backfill_passed_tasks')
+
+        # Recuento de consultas por request (ver grader/middleware.py)
+        from .middleware import install_query_counter
+        connection_created.connect(install_query_counter, dispatch_uid='grader.middleware.install_query_counter')
+
+        # Contadores globales (ver grader/counters.py)
+        from django.contrib.auth.models import User
+        from django.db.models.signals import post_delete, post_save
+        from . import counters
+        from .models import Challenge, Submission
+        post_save.connect(counters.user_saved, sender=User, dispatch_uid='grader.counters.user_saved')
+        post_delete.connect(counters.user_deleted, sender=User, dispatch_uid='grader.counters.user_deleted')
+        post_save.connect(counters.submission_saved, sender=Submission, dispatch_uid='grader.counters.submission_saved')
+        post_delete.connect(counters.submission_deleted, sender=Submission, dispatch_uid='grader.counters.submission_deleted')
+        post_save.connect(counters.challenge_changed, sender=Challenge, dispatch_uid='grader.counters.challenge_saved')
+        post_delete.connect(counters.challenge_changed, sender=Challenge, dispatch_uid='grader.counters.challenge_deleted')
+
+        # Caché de tokens (ver grader/authentication.py)
+        from rest_framework.authtoken.models import Token
+        from .authentication import token_deleted, user_changed
+        post_delete.connect(token_deleted, sender=Token, dispatch_uid='grader.authentication.token_deleted')
+        post_save.connect(user_changed, sender=User, dispatch_uid='grader.authentication.user_saved')
+        post_delete.connect(user_changed, sender=User, dispatch_uid='grader.authentication.user_deleted')
@@ -0,0 +1,215 @@
+"""
+Vistas async (ASGI) de las rutas con más tráfico durante un evento.
+
+Con ASYNC_VIEWS=True, grader/urls.py sirve submit-results, leaderboard,
+progress y health con estas vistas en lugar de las APIView de views.py.
+Devuelven las mismas respuestas, pero el request no ocupa un hilo mientras
+espera: la subida de un payload del 36 desde un móvil lento la lee el event
+loop, las consultas usan el ORM async y la evaluación va al pool acotado de
+grader/evaluator_pool.py. Así un proceso uvicorn aguanta miles de conexiones
+abiertas con unos pocos hilos.
+
+DRF 3.14 no tiene vistas async: AsyncAPIView reproduce lo que estas rutas
+usan de APIView (autenticación, permisos, CSRF exento, parsers, respuestas
+401/403 y JSON renderizado igual).
+"""
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import AnonymousUser
+from django.db.models import Sum
+from django.http import HttpResponse
+from django.shortcuts import render
+from django.views import View
+from rest_framework import exceptions, status
+from rest_framework.authentication import get_authorization_header
+from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from . import health, leaderboard, metrics
+from .authentication import CachedTokenAuthentication, cached_credentials
+from .evaluator_pool import PoolBusy, evaluator_pool
+from .evaluators import CodeEvaluator
+from .models import Challenge
+from .serializers import SubmitResultsSerializer
+from .views import progress_payload, results_code, results_response, save_results_submission
+
+# Cuerpos más grandes se parsean en el pool para no bloquear el event loop
+INLINE_PARSE_BYTES = 64 * 1024
+
+
+def json_response(data, status=status.HTTP_200_OK, headers=None):
+    # El mismo JSONRenderer que las APIView: mismo formato de fechas y separadores
+    return HttpResponse(JSONRenderer().render(data), status=status,
+                        content_type='application/json', headers=headers)
+
+
+class AsyncAPIView(View):
+    authentication_classes = api_settings.DEFAULT_AUTHENTICATION_CLASSES
+    permission_classes = [IsAuthenticated]
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        view = super().as_view(**initkwargs)
+        # Como APIView: la autenticación es por token. csrf_exempt() de Django 4.2
+        # envuelve la vista en una función sync, así que se marca a mano
+        view.csrf_exempt = True
+        return view
+
+    async def dispatch(self, request, *args, **kwargs):
+        try:
+            request.user, request.auth = await self.authenticate(request)
+        except exceptions.AuthenticationFailed as exc:
+            return self.denied(exc)
+
+        for permission in self.permission_classes:
+            if not permission().has_permission(request, self):
+                if request.auth is None and self.authentication_classes:
+                    return self.denied(exceptions.NotAuthenticated())
+                return self.denied(exceptions.PermissionDenied())
+
+        return await super().dispatch(request, *args, **kwargs)
+
+    async def authenticate(self, request):
+        header = get_authorization_header(request).split()
+        # Sin cabecera, o con un token ya en la caché (si está activada), no hace falta salir del event loop
+        if not header:
+            return AnonymousUser(), None
+        if CachedTokenAuthentication in self.authentication_classes and len(header) == 2 \
+                and header[0].lower() == b'token':
+            cached = cached_credentials(header[1].decode('latin-1'))
+            if cached is not None:
+                return cached
+
+        for authentication_class in self.authentication_classes:
+            result = await sync_to_async(authentication_class().authenticate)(request)
+            if result is not None:
+                return result
+        return AnonymousUser(), None
+
+    def http_method_not_allowed(self, request, *args, **kwargs):
+        exc = exceptions.MethodNotAllowed(request.method)
+        response = json_response({'detail': exc.detail}, status=exc.status_code,
+                                 headers={'Allow': ', '.join(self._allowed_methods())})
+
+        async def func():
+            return response
+        return func()
+
+    def denied(self, exc):
+        headers = None
+        if isinstance(exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+            # Como DRF: 401 con WWW-Authenticate si hay autenticador, si no 403
+            if not self.authentication_classes:
+                return json_response({'detail': exc.detail}, status=status.HTTP_403_FORBIDDEN)
+            headers = {'WWW-Authenticate': self.authentication_classes[0]().authenticate_header(None)}
+        return json_response({'detail': exc.detail}, status=exc.status_code, headers=headers)
+
+
+def _evaluate(challenge_id, results, max_score):
+    """Trabajo del pool: evaluación y serialización del código a guardar."""
+    evaluation = CodeEvaluator.evaluate_results(challenge_id, results, max_score)
+    if evaluation is None:
+        return None, None
+    return evaluation, results_code(results)
+
+
+class AsyncSubmitResultsView(AsyncAPIView):
+    """Versión async de SubmitResultsView."""
+    permission_classes = [IsAuthenticated]
+
+    async def post(self, request):
+        metrics.observe('grader_submit_results_payload_bytes', int(request.META.get('CONTENT_LENGTH') or 0))
+        # Los mismos parsers que SubmitResultsView (DEFAULT_PARSER_CLASSES), con
+        # sus mismos 400/415; los cuerpos grandes se parsean en el pool
+        drf_request = Request(request, parsers=[parser() for parser in api_settings.DEFAULT_PARSER_CLASSES])
+        try:
+            if int(request.META.get('CONTENT_LENGTH') or 0) <= INLINE_PARSE_BYTES:
+                data = drf_request.data
+            else:
+                data = await evaluator_pool.run(getattr, drf_request, 'data')
+        except (exceptions.ParseError, exceptions.UnsupportedMediaType) as exc:
+            return json_response({'detail': exc.detail}, status=exc.status_code)
+        except PoolBusy:
+            return self.busy()
+
+        serializer = SubmitResultsSerializer(data=data)
+        if not await sync_to_async(serializer.is_valid)():
+            return json_response({'error': serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        challenge_id = serializer.validated_data['challenge_id']
+        results = serializer.validated_data['results']
+
+        challenge = await Challenge.objects.filter(id=challenge_id, is_active=True).afirst()
+        if challenge is None:
+            return json_response({'error': 'Challenge not found'}, status=status.HTTP_404_NOT_FOUND)
+
+        try:
+            evaluation, code = await evaluator_pool.run(_evaluate, challenge_id, results, challenge.max_score)
+        except PoolBusy:
+            return self.busy()
+        if evaluation is None:
+            return json_response({'error': 'This challenge does not support results-only submission'},
+                                 status=status.HTTP_400_BAD_REQUEST)
+
+        score, passed, feedback, execution_time = evaluation
+        metrics.observe_evaluation(challenge_id, execution_time, passed)
+
+        submission = await sync_to_async(save_results_submission)(
+            request.user, challenge, code, score, passed, feedback, execution_time
+        )
+        return json_response(results_response(submission, challenge, evaluation))
+
+    def busy(self):
+        return json_response({'error': 'Evaluator busy, retry in a few seconds'},
+                             status=status.HTTP_503_SERVICE_UNAVAILABLE, headers={'Retry-After': '2'})
+
+
+class AsyncLeaderboardView(AsyncAPIView):
+    """Versión async de LeaderboardView (pública)."""
+    permission_classes = [AllowAny]
+
+    async def get(self, request):
+        # Todas las consultas de la ventana en un solo salto al hilo del ORM
+        try:
+            page = await sync_to_async(leaderboard.window)(request.GET, request.user)
+        except ValueError as e:
+            return json_response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        if 'text/html' in request.headers.get('Accept', ''):
+            active = Challenge.objects.filter(is_active=True)
+            agg = await active.aaggregate(total=Sum('max_score'))
+            context = {
+                **page,
+                'page_query': leaderboard.page_query(request.GET),
+                'total_challenges': await active.acount(),
+                'max_points': agg.get('total') or 0,
+            }
+            return render(request, 'leaderboard.html', context)
+
+        return json_response(page)
+
+
+class AsyncProgressView(AsyncAPIView):
+    """Versión async de ProgressView."""
+    permission_classes = [IsAuthenticated]
+
+    async def get(self, request):
+        return json_response(await sync_to_async(progress_payload)(request.user))
+
+
+class AsyncHealthCheckView(AsyncAPIView):
+    """Versión async de HealthCheckView: liveness y readiness sin salir del event loop."""
+    permission_classes = [AllowAny]
+    authentication_classes = []
+
+    async def get(self, request):
+        deep = request.GET.get('deep') == '1'
+        ready = request.GET.get('ready') == '1'
+        if deep:
+            # Los probes ya corren en su propio pool y se cortan a HEALTH_PROBE_TIMEOUT
+            payload, code = await sync_to_async(health.respond, thread_sensitive=False)(deep=True)
+        else:
+            payload, code = health.respond(ready=ready)
+        return json_response(payload, status=code)
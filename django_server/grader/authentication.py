@@ -0,0 +1,77 @@
+"""
+TokenAuthentication con caché en proceso (opcional).
+
+Cada request autenticado hace un SELECT de Token + User. Con
+AUTH_TOKEN_CACHE_TTL > 0, settings.py usa esta clase en lugar de la
+TokenAuthentication de DRF y el usuario de cada token se reutiliza durante
+esos segundos. Por defecto es 0: sin caché.
+
+La caché es de cada proceso. Borrar un token o guardar/borrar un usuario
+(p.ej. is_active=False) la invalida solo en el proceso que lo hace: en el
+resto de workers el token revocado o el usuario desactivado siguen
+autenticando hasta AUTH_TOKEN_CACHE_TTL segundos. Activarla solo si ese
+margen es aceptable.
+"""
+
+import copy
+import threading
+import time
+
+from django.conf import settings
+from rest_framework.authentication import TokenAuthentication
+
+from . import metrics
+
+_lock = threading.Lock()
+_cache = {}  # key -> (user, token, expires)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    def authenticate_credentials(self, key):
+        ttl = settings.AUTH_TOKEN_CACHE_TTL
+        if ttl <= 0:
+            return super().authenticate_credentials(key)
+
+        cached = cached_credentials(key)
+        if cached is not None:
+            return cached
+
+        metrics.inc('grader_auth_cache_total', result='miss')
+        user, token = super().authenticate_credentials(key)
+        with _lock:
+            if len(_cache) > 10000:
+                _cache.clear()
+            _cache[key] = (user, token, time.monotonic() + ttl)
+        return copy.copy(user), token
+
+
+def cached_credentials(key):
+    """
+    (user, token) de la caché sin tocar la BD, o None si no está o caducó.
+    Las vistas async lo prueban antes de salir del event loop.
+    """
+    if settings.AUTH_TOKEN_CACHE_TTL <= 0:
+        return None
+    cached = _cache.get(key)
+    if cached is None or time.monotonic() >= cached[2] or not cached[0].is_active:
+        return None
+    metrics.inc('grader_auth_cache_total', result='hit')
+    # Copia: las vistas no deben compartir (ni modificar) el mismo objeto User
+    return copy.copy(cached[0]), cached[1]
+
+
+def clear_cache():
+    with _lock:
+        _cache.clear()
+
+
+def token_deleted(sender, instance, **kwargs):
+    with _lock:
+        _cache.pop(instance.key, None)
+
+
+def user_changed(sender, instance, **kwargs):
+    # Guardado (is_active, password...) o borrado: fuera sus tokens de este proceso
+    with _lock:
+        for key in [key for key, (user, _, _) in _cache.items() if user.pk == instance.pk]:
+            del _cache[key]
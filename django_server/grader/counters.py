@@ -0,0 +1,144 @@
+"""
+Contadores globales mantenidos (usuarios, challenges activos, submissions, aprobadas).
+
+HomeView, APIIndexView y StatsView leen estos valores en lugar de hacer
+COUNT(*) en cada request (en SQLite es un recorrido completo de la tabla de
+submissions). Las escrituras los actualizan dentro de su misma transacción:
+
+- signals de User, Submission y Challenge (conectados en apps.py)
+- el flush del write-behind (bulk_create no dispara post_save)
+
+Las lecturas pasan por una caché en proceso de COUNTERS_CACHE_TTL segundos.
+Lo que se escribe sin pasar por el ORM (bulk_create, SQL directo, imports) se
+corrige con `python manage.py reconcile_counters`.
+"""
+
+import threading
+import time
+
+from django.conf import settings
+from django.db.models import F
+
+COUNTER_NAMES = ('users', 'active_challenges', 'submissions', 'passes')
+# Versión del catálogo (la sube load_challenges y cualquier cambio de un
+# Challenge); se lee con los contadores y la usan las vistas de challenges
+CATALOG_VERSION = 'catalog_version'
+
+_cache_lock = threading.Lock()
+_cache = {'values': None, 'expires': 0.0}
+_stats = {'hits': 0, 'misses': 0}  # Para /api/health?deep=1 (aproximado: sin lock)
+
+
+def exact_counts():
+    """Los valores reales con COUNT(*) (caro: solo para reconciliar)."""
+    from django.contrib.auth.models import User
+    from .models import Challenge, Submission
+
+    return {
+        'users': User.objects.count(),
+        'active_challenges': Challenge.objects.filter(is_active=True).count(),
+        'submissions': Submission.objects.count(),
+        'passes': Submission.objects.filter(passed=True).count(),
+    }
+
+
+def get_counters():
+    """Dict con COUNTER_NAMES y catalog_version, como mucho COUNTERS_CACHE_TTL segundos desactualizado."""
+    now = time.monotonic()
+    values = _cache['values']
+    if values is not None and now < _cache['expires']:
+        _stats['hits'] += 1
+        return values
+    _stats['misses'] += 1
+
+    from .models import Counter
+
+    values = dict(Counter.objects.filter(name__in=COUNTER_NAMES + (CATALOG_VERSION,)).values_list('name', 'value'))
+    if any(name not in values for name in COUNTER_NAMES):
+        # Primera lectura tras crear la tabla: inicializar con los valores reales
+        values = {**values, **reconcile()[0]}
+    values.setdefault(CATALOG_VERSION, 0)
+
+    with _cache_lock:
+        _cache['values'] = values
+        _cache['expires'] = now + settings.COUNTERS_CACHE_TTL
+    return values
+
+
+def reset_cache():
+    with _cache_lock:
+        _cache['values'] = None
+
+
+def cache_stats():
+    hits, misses = _stats['hits'], _stats['misses']
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': round(hits / (hits + misses), 3) if hits + misses else None,
+    }
+
+
+def increment(**deltas):
+    """Suma a cada contador en SQL (F()); usar dentro de la transacción de la escritura."""
+    from .models import Counter
+
+    for name, delta in deltas.items():
+        if delta:
+            Counter.objects.filter(name=name).update(value=F('value') + delta)
+
+
+def refresh_active_challenges():
+    """El catálogo es pequeño: se recuenta entero tras cualquier cambio."""
+    from .models import Challenge, Counter
+
+    Counter.objects.update_or_create(
+        name='active_challenges',
+        defaults={'value': Challenge.objects.filter(is_active=True).count()},
+    )
+
+
+def reconcile(dry_run=False):
+    """
+    Compara los contadores con los COUNT(*) reales y corrige la diferencia.
+    Devuelve (valores reales, {nombre: (guardado, real)} de los que diferían).
+    """
+    from .models import Counter
+
+    actual = exact_counts()
+    stored = dict(Counter.objects.filter(name__in=COUNTER_NAMES).values_list('name', 'value'))
+    drift = {name: (stored.get(name), value) for name, value in actual.items() if stored.get(name) != value}
+
+    if not dry_run:
+        for name in drift:
+            Counter.objects.update_or_create(name=name, defaults={'value': actual[name]})
+        reset_cache()
+
+    return actual, drift
+
+
+# ==================== SIGNALS ====================
+
+def user_saved(sender, instance, created, **kwargs):
+    if created:
+        increment(users=1)
+
+
+def user_deleted(sender, instance, **kwargs):
+    increment(users=-1)
+
+
+def submission_saved(sender, instance, created, **kwargs):
+    if created:
+        increment(submissions=1, passes=1 if instance.passed else 0)
+
+
+def submission_deleted(sender, instance, **kwargs):
+    increment(submissions=-1, passes=-1 if instance.passed else 0)
+
+
+def challenge_changed(sender, instance, **kwargs):
+    from .models import Counter
+
+    refresh_active_challenges()
+    Counter.bump(CATALOG_VERSION)
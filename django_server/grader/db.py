@@ -0,0 +1,24 @@
+"""
+Ajustes de conexión a la base de datos.
+
+Con DB_PROFILE=production, settings.SQLITE_PRAGMAS se aplica a cada conexión
+SQLite nueva (WAL, synchronous=NORMAL, mmap, cache...). Con CONN_MAX_AGE las
+conexiones se reutilizan, así que los PRAGMAs solo se ejecutan una vez por
+conexión y no en cada request.
+"""
+
+from django.conf import settings
+
+
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    """Receiver de connection_created: ejecuta los PRAGMAs configurados."""
+    if connection.vendor != 'sqlite':
+        return
+
+    pragmas = getattr(settings, 'SQLITE_PRAGMAS', {})
+    if not pragmas:
+        return
+
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name}={value}')
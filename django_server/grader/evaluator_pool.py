@@ -0,0 +1,105 @@
+"""
+Pool acotado para evaluar submissions desde las vistas async.
+
+Bajo ASGI las vistas de grader/async_views.py corren en el event loop: evaluar
+ahí un payload grande del 36 (numpy sobre miles de imágenes) congelaría todas
+las conexiones del proceso. evaluator_pool.run() manda el trabajo a un
+ThreadPoolExecutor de EVALUATOR_WORKERS hilos. Como mucho EVALUATOR_QUEUE_MAX
+trabajos esperan o corren a la vez; con la cola llena run() lanza PoolBusy y
+la vista responde 503 con Retry-After, en lugar de acumular payloads en
+memoria sin límite.
+
+Hilos y no procesos: el payload ya está parseado y pasarlo a otro proceso
+obligaría a serializarlo otra vez, y numpy suelta el GIL en las operaciones
+grandes. Las vistas sync (WSGI) no lo usan: allí el propio worker es el límite.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+
+from . import metrics
+
+
+class PoolBusy(Exception):
+    """La cola del pool está llena."""
+
+
+class EvaluatorPool:
+    def __init__(self, workers=4, max_pending=64):
+        self.workers = workers
+        self.max_pending = max_pending
+
+        self._lock = threading.Lock()
+        self._pending = 0      # En cola o ejecutándose
+        self._running = 0
+        self._completed = 0
+        self._rejected = 0
+        self._executor = None
+        self._pid = None
+
+    async def run(self, func, *args):
+        """Ejecuta func(*args) en el pool y devuelve su resultado (o lanza PoolBusy)."""
+        with self._lock:
+            busy = self._pending >= self.max_pending
+            if busy:
+                self._rejected += 1
+            else:
+                self._pending += 1
+        if busy:
+            metrics.inc('grader_evaluator_pool_rejected_total')
+            raise PoolBusy(f'{self.max_pending} evaluaciones pendientes')
+
+        queued_at = time.perf_counter()
+
+        def job():
+            metrics.observe('grader_evaluator_pool_wait_seconds', time.perf_counter() - queued_at)
+            with self._lock:
+                self._running += 1
+            try:
+                return func(*args)
+            finally:
+                with self._lock:
+                    self._running -= 1
+
+        def release(_future):
+            # También si el cliente se desconecta y el trabajo se cancela antes de empezar
+            with self._lock:
+                self._pending -= 1
+                self._completed += 1
+
+        future = self._get_executor().submit(job)
+        future.add_done_callback(release)
+        return await asyncio.wrap_future(future)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'running': self._running,
+                'queued': self._pending - self._running,
+                'capacity': self.max_pending,
+                'occupancy': round(self._pending / self.max_pending, 3) if self.max_pending else None,
+                'completed': self._completed,
+                'rejected': self._rejected,
+            }
+
+    def _get_executor(self):
+        # Tras un fork (gunicorn --preload) los hilos del padre no existen en el hijo
+        if self._executor is not None and self._pid == os.getpid():
+            return self._executor
+        with self._lock:
+            if self._executor is None or self._pid != os.getpid():
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='evaluator')
+                self._pid = os.getpid()
+            return self._executor
+
+
+evaluator_pool = EvaluatorPool(
+    workers=settings.EVALUATOR_WORKERS,
+    max_pending=settings.EVALUATOR_QUEUE_MAX,
+)
@@ -736,6 +736,47 @@ class CodeEvaluator:
         except Exception as e:
             return 0, False, f"❌ Critical evaluation error: {str(e)}", 0.0
 
+    @staticmethod
+    def evaluate_results(challenge_id: int, results: dict, max_score: int):
+        """
+        Evaluate a results-only submission (/api/submit-results).
+
+        Args:
+            challenge_id: Challenge ID (a task such as 351, or 35 for the whole challenge)
+            results: Results dictionary sent by the client
+            max_score: Challenge.max_score (ignored by challenge 35)
+
+        Returns:
+            tuple: (score, passed, feedback, execution_time), or None if the
+            challenge does not support results-only submission
+        """
+        if challenge_id == 35:
+            return CodeEvaluator.evaluate_challenge_35_results(results)
+
+        evaluators = {
+            351: CodeEvaluator.evaluate_challenge_35_task1,
+            352: CodeEvaluator.evaluate_challenge_35_task2,
+            353: CodeEvaluator.evaluate_challenge_35_task3,
+            354: CodeEvaluator.evaluate_challenge_35_task4,
+            355: CodeEvaluator.evaluate_challenge_35_task5,
+            361: CodeEvaluator.evaluate_challenge_36_task1,
+            362: CodeEvaluator.evaluate_challenge_36_task2,
+            363: CodeEvaluator.evaluate_challenge_36_task3,
+            371: CodeEvaluator.evaluate_challenge_37_task371,
+            372: CodeEvaluator.evaluate_challenge_37_task372,
+            373: CodeEvaluator.evaluate_challenge_37_task373,
+            374: CodeEvaluator.evaluate_challenge_37_task374,
+            375: CodeEvaluator.evaluate_challenge_37_task375,
+            376: CodeEvaluator.evaluate_challenge_37_task376,
+            377: CodeEvaluator.evaluate_challenge_37_task377,
+            378: CodeEvaluator.evaluate_challenge_37_task378,
+        }
+
+        evaluator = evaluators.get(challenge_id)
+        if not evaluator:
+            return None
+        return evaluator(results, max_score)
+
     # -------------------- Challenge 37: server-side individual task evaluators --------------------
     @staticmethod
     def evaluate_challenge_37_task371(results: dict, max_score: int = 10) -> tuple[int, bool, str, float]:
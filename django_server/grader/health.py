@@ -0,0 +1,225 @@
+"""
+Probes de /api/health para el balanceador.
+
+- liveness (sin parámetros): no toca nada, solo confirma que el proceso responde.
+- readiness (?ready=1): 503 hasta que termina el warm-up del proceso.
+- deep (?deep=1): latencia de la BD, espera por el lock de escritura, cola del
+  write-behind, aciertos de la caché de contadores, ocupación del pool de
+  evaluación de las vistas async y uptime.
+
+Cada probe corre en un hilo aparte y se corta a los HEALTH_PROBE_TIMEOUT
+segundos: un worker atascado detrás de un SQLite bloqueado responde 503 con
+el probe en 'timeout' en lugar de dejar colgado al balanceador.
+
+El warm-up (conexión a BD, contadores inicializados, flag de backfill de
+PassedTask leído, numpy y grader.pauli importados para que la primera
+submission no pague ni la consulta ni el import) se lanza desde
+wsgi.py/asgi.py al arrancar, o con el primer probe de readiness.
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+from django.conf import settings
+from django.db import connection
+
+logger = logging.getLogger(__name__)
+
+STARTED_AT = time.time()
+_started_monotonic = time.monotonic()
+
+_warmup = {'thread': None, 'pid': None, 'done': False, 'error': None, 'seconds': None}
+_warmup_lock = threading.Lock()
+
+# Pocos hilos: un probe colgado no debe poder acumular hilos sin límite
+_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='health-probe')
+
+
+def uptime():
+    return round(time.monotonic() - _started_monotonic, 1)
+
+
+# ==================== WARM-UP ====================
+
+def _run_warmup():
+    started = time.perf_counter()
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+
+        from .counters import get_counters
+        get_counters()
+
+        from .models import PassedTask
+        PassedTask.is_backfilled()  # Si no, el primer aprobado del proceso paga una consulta más
+
+        import numpy  # noqa: F401  (los evaluadores del 36/37 lo importan en la primera llamada)
+        from . import pauli  # noqa: F401
+
+        _warmup['done'] = True
+        _warmup['error'] = None
+    except Exception as e:
+        _warmup['error'] = f'{type(e).__name__}: {e}'
+        logger.exception("Health warm-up failed")
+    finally:
+        _warmup['seconds'] = round(time.perf_counter() - started, 3)
+        connection.close()
+
+
+def start_warmup():
+    """Lanza el warm-up en segundo plano (una vez por proceso; se repite si falló)."""
+    with _warmup_lock:
+        thread = _warmup['thread']
+        if _warmup['pid'] == os.getpid() and (_warmup['done'] or (thread and thread.is_alive())):
+            return
+        if _warmup['pid'] != os.getpid():
+            # Tras un fork el hijo no hereda el hilo ni la conexión del padre
+            _warmup['done'] = False
+        _warmup['pid'] = os.getpid()
+        _warmup['thread'] = threading.Thread(target=_run_warmup, name='health-warmup', daemon=True)
+        _warmup['thread'].start()
+
+
+def is_ready():
+    return _warmup['done'] and _warmup['pid'] == os.getpid()
+
+
+def warmup_status():
+    return {
+        'ready': is_ready(),
+        'seconds': _warmup['seconds'],
+        'error': _warmup['error'],
+    }
+
+
+# ==================== PROBES ====================
+
+def _with_connection(func):
+    # Cada hilo abre su propia conexión de Django: cerrarla al acabar el probe
+    def wrapper():
+        try:
+            return func()
+        finally:
+            connection.close()
+    return wrapper
+
+
+@_with_connection
+def probe_database():
+    started = time.perf_counter()
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT 1')
+        cursor.fetchone()
+    return {'latency_ms': round((time.perf_counter() - started) * 1000, 2)}
+
+
+def probe_write_lock(timeout):
+    """
+    Tiempo hasta conseguir el lock de escritura. En SQLite se toma con
+    BEGIN IMMEDIATE en una conexión aparte y se suelta en seguida (no escribe).
+    En PostgreSQL no hay lock global: se cuentan los locks en espera.
+    """
+    database = settings.DATABASES['default']
+    if connection.vendor == 'sqlite':
+        started = time.perf_counter()
+        raw = sqlite3.connect(database['NAME'], timeout=timeout, isolation_level=None)
+        try:
+            raw.execute('BEGIN IMMEDIATE')
+            waited = time.perf_counter() - started
+            raw.execute('ROLLBACK')
+        finally:
+            raw.close()
+        return {'wait_ms': round(waited * 1000, 2)}
+
+    @_with_connection
+    def waiting_locks():
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT count(*) FROM pg_locks WHERE NOT granted')
+            return {'waiting_locks': cursor.fetchone()[0]}
+    return waiting_locks()
+
+
+def probe_write_behind():
+    from .writebehind import submission_buffer
+
+    pending = submission_buffer.pending()
+    return {
+        'enabled': settings.SUBMISSION_WRITE_BEHIND,
+        'pending': pending,
+        'capacity': submission_buffer.max_rows,
+        'occupancy': round(pending / submission_buffer.max_rows, 3) if submission_buffer.max_rows else None,
+    }
+
+
+def probe_counters_cache():
+    from .counters import cache_stats
+    return cache_stats()
+
+
+def probe_evaluator_pool():
+    from .evaluator_pool import evaluator_pool
+    return {'enabled': settings.ASYNC_VIEWS, **evaluator_pool.stats()}
+
+
+def run_probes(timeout=None):
+    """
+    Ejecuta todos los probes en paralelo, cada uno acotado a `timeout`.
+    Devuelve (todo_ok, {nombre: resultado}).
+    """
+    timeout = settings.HEALTH_PROBE_TIMEOUT if timeout is None else timeout
+    probes = {
+        'database': probe_database,
+        'write_lock': lambda: probe_write_lock(timeout),
+        'write_behind': probe_write_behind,
+        'counters_cache': probe_counters_cache,
+        'evaluator_pool': probe_evaluator_pool,
+    }
+
+    deadline = time.monotonic() + timeout
+    futures = {name: _executor.submit(probe) for name, probe in probes.items()}
+    results, healthy = {}, True
+    for name, future in futures.items():
+        try:
+            result = future.result(timeout=max(0.0, deadline - time.monotonic()))
+            results[name] = {'status': 'ok', **result}
+        except FutureTimeout:
+            healthy = False
+            results[name] = {'status': 'timeout', 'timeout_s': timeout}
+        except Exception as e:
+            healthy = False
+            results[name] = {'status': 'error', 'error': f'{type(e).__name__}: {e}'}
+
+    return healthy, results
+
+
+# ==================== RESPUESTAS ====================
+
+def respond(deep=False, ready=False):
+    """
+    Cuerpo y código HTTP de /api/health (compartido por la vista sync y la
+    async). Solo el modo deep toca la BD.
+    """
+    if deep:
+        healthy, checks = run_probes()
+        warmed_up = is_ready()
+        if not warmed_up:
+            start_warmup()
+        return {
+            'status': 'ok' if healthy and warmed_up else 'degraded',
+            'pid': os.getpid(),
+            'uptime_seconds': uptime(),
+            'warmup': warmup_status(),
+            'checks': checks,
+        }, 200 if healthy and warmed_up else 503
+
+    if ready:
+        if not is_ready():
+            start_warmup()
+            return {'status': 'warming_up', 'warmup': warmup_status()}, 503
+        return {'status': 'ready', 'uptime_seconds': uptime()}, 200
+
+    return {'status': 'ok', 'message': 'API is running', 'uptime_seconds': uptime()}, 200
@@ -0,0 +1,305 @@
+"""
+Ventanas del leaderboard: el top, alrededor de un usuario y páginas por cursor.
+
+GET /api/leaderboard acepta:
+- ?limit=N: las N primeras entradas (como mucho LEADERBOARD_PAGE_MAX).
+- ?around=me&radius=R: el usuario autenticado con R entradas por encima y R
+  por debajo (R como mucho LEADERBOARD_PAGE_MAX // 2).
+- ?cursor=...: la página siguiente o anterior a otra; cada respuesta trae
+  next_cursor y prev_cursor (null si no hay más). Con ?around, las páginas
+  siguientes son de 2R + 1 filas salvo que se pase ?limit.
+
+Las páginas son keyset: el cursor guarda la clave de orden de la fila del
+borde (total_score, challenges_completed, last_updated, user_id) y la página
+siguiente es un recorrido del índice leaderboard_rank_idx a partir de esa
+clave, sin OFFSET. El rank de cada fila sale de su posición en ese recorrido
+a partir del rank de la primera:
+- en el top es 1;
+- en una página por cursor, el rank que lleva el cursor (firmado con
+  SECRET_KEY: un cursor editado a mano se rechaza);
+- alrededor de un usuario, su posición: las entradas de los grupos
+  (total_score, challenges_completed) por delante salen de un histograma por
+  grupo cacheado en el proceso (COUNTERS_CACHE_TTL, como grader/counters.py),
+  y solo se cuentan en SQL las de su mismo grupo que van delante.
+total_users sale del mismo histograma.
+"""
+
+import threading
+import time
+
+from django.conf import settings
+from django.core import signing
+from django.db.models import Count, Q
+from django.utils.dateparse import parse_datetime
+from django.utils.http import urlencode
+
+from .models import Challenge, Leaderboard, PassedTask
+
+ORDER = ('-total_score', '-challenges_completed', 'last_updated', 'user_id')
+REVERSE_ORDER = ('total_score', 'challenges_completed', '-last_updated', '-user_id')
+CURSOR_SALT = 'grader.leaderboard.cursor'
+
+_histogram_lock = threading.Lock()
+_histogram = {'groups': None, 'expires': 0.0}
+
+
+def sort_key(entry):
+    return entry.total_score, entry.challenges_completed, entry.last_updated, entry.user_id
+
+
+def after(key):
+    """Entradas que van detrás de key en ORDER (total_score <= primero, para usar el índice)."""
+    score, completed, updated, user_id = key
+    return Q(total_score__lte=score) & (
+        Q(total_score__lt=score) | Q(challenges_completed__lte=completed) & (
+            Q(challenges_completed__lt=completed) | Q(last_updated__gte=updated) & (
+                Q(last_updated__gt=updated) | Q(user_id__gt=user_id))))
+
+
+def before(key):
+    """Entradas que van delante de key en ORDER."""
+    score, completed, updated, user_id = key
+    return Q(total_score__gte=score) & (
+        Q(total_score__gt=score) | Q(challenges_completed__gte=completed) & (
+            Q(challenges_completed__gt=completed) | Q(last_updated__lte=updated) & (
+                Q(last_updated__lt=updated) | Q(user_id__lt=user_id))))
+
+
+def score_groups():
+    """[(total_score, challenges_completed, entradas)] en ORDER, como mucho COUNTERS_CACHE_TTL desactualizado."""
+    now = time.monotonic()
+    groups = _histogram['groups']
+    if groups is not None and now < _histogram['expires']:
+        return groups
+
+    # Un recorrido agrupado del índice: hay pocos grupos distintos (cientos)
+    groups = list(Leaderboard.objects.order_by('-total_score', '-challenges_completed')
+                  .values_list('total_score', 'challenges_completed').annotate(n=Count('pk')))
+    with _histogram_lock:
+        _histogram['groups'] = groups
+        _histogram['expires'] = now + settings.COUNTERS_CACHE_TTL
+    return groups
+
+
+def reset_cache():
+    with _histogram_lock:
+        _histogram['groups'] = None
+
+
+def groups_ahead(score, completed):
+    """Entradas de los grupos (total_score, challenges_completed) que van delante de este."""
+    return sum(n for group_score, group_completed, n in score_groups()
+               if (group_score, group_completed) > (score, completed))
+
+
+def rank_of(key):
+    """Posición de key en ORDER: grupos por delante (histograma) + los de su grupo que van delante."""
+    score, completed, updated, user_id = key
+    ahead = groups_ahead(score, completed)
+    ahead += Leaderboard.objects.filter(
+        Q(last_updated__lt=updated) | Q(last_updated=updated, user_id__lt=user_id),
+        total_score=score, challenges_completed=completed,
+    ).count()
+    return ahead + 1
+
+
+def window_start_rank(rows):
+    """
+    Rank de rows[0] (filas contiguas en ORDER). La primera fila de un grupo
+    tiene rank groups_ahead() + 1: si la ventana cruza un cambio de grupo, el
+    rank sale de ahí sin consultas; si no, se cuenta dentro del grupo.
+    """
+    for offset in range(1, len(rows)):
+        group = (rows[offset].total_score, rows[offset].challenges_completed)
+        if group != (rows[offset - 1].total_score, rows[offset - 1].challenges_completed):
+            return groups_ahead(*group) + 1 - offset
+    return rank_of(sort_key(rows[0]))
+
+
+def encode_cursor(direction, rank, entry):
+    """Cursor firmado: dirección ('next' o 'prev'), rank y clave de orden de la fila."""
+    score, completed, updated, user_id = sort_key(entry)
+    return signing.Signer(salt=CURSOR_SALT).sign_object([direction, rank, score, completed, updated.isoformat(), user_id])
+
+
+def decode_cursor(cursor):
+    """(dirección, rank, clave) de un cursor; ValueError si no es válido o no está firmado por nosotros."""
+    try:
+        direction, rank, score, completed, updated, user_id = signing.Signer(salt=CURSOR_SALT).unsign_object(cursor)
+        updated = parse_datetime(updated)
+        key = (int(score), int(completed), updated, int(user_id))
+    except (signing.BadSignature, TypeError, ValueError):
+        raise ValueError('Invalid cursor')
+    if direction not in ('next', 'prev') or updated is None or not isinstance(rank, int) or rank < 1:
+        raise ValueError('Invalid cursor')
+    return direction, rank, key
+
+
+def page_query(params):
+    """Query string de la ventana actual sin el cursor, para los enlaces de página del template."""
+    return urlencode([(name, params[name]) for name in ('limit', 'around', 'radius') if params.get(name)])
+
+
+def _int_param(params, name, default, low, high):
+    value = params.get(name)
+    if value in (None, ''):
+        return default
+    try:
+        value = int(value)
+    except ValueError:
+        raise ValueError(f'{name} must be an integer')
+    # Tope duro: ?limit=1000000 no construye la tabla entera en memoria
+    return max(low, min(value, high))
+
+
+def window(params, user):
+    """
+    Entradas del leaderboard para los query params de la request.
+
+    Devuelve un dict con leaderboard (filas de leaderboard_rows),
+    challenge_roots, user_position, total_users, next_cursor y prev_cursor.
+    Lanza ValueError con un mensaje para el cliente si los parámetros no son
+    válidos. Compartido por la vista sync y la async (con sync_to_async).
+    """
+    page_max = settings.LEADERBOARD_PAGE_MAX
+    entries = Leaderboard.objects.select_related('user')
+    user_position = None
+    has_prev = has_next = False
+
+    around = params.get('around')
+    if around and around != 'me':
+        raise ValueError('around only supports "me"')
+    if around and not user.is_authenticated:
+        raise ValueError('around=me requires authentication')
+    radius = _int_param(params, 'radius', 10, 0, page_max // 2)
+
+    if params.get('cursor'):
+        direction, rank, key = decode_cursor(params['cursor'])
+        limit = _int_param(params, 'limit', 2 * radius + 1 if around else 50, 1, page_max)
+        if direction == 'next':
+            rows = list(entries.filter(after(key)).order_by(*ORDER)[:limit + 1])
+            has_next = len(rows) > limit
+            rows = rows[:limit]
+            first_rank = rank + 1
+            has_prev = True
+        else:
+            rows = list(entries.filter(before(key)).order_by(*REVERSE_ORDER)[:limit])[::-1]
+            first_rank = rank - len(rows)
+            has_prev = first_rank > 1
+            has_next = True
+
+    elif around:
+        me = entries.filter(user=user).first()
+        if me is None:
+            rows, first_rank = [], 1
+        else:
+            key = sort_key(me)
+            above = list(entries.filter(before(key)).order_by(*REVERSE_ORDER)[:radius])
+            below = list(entries.filter(after(key)).order_by(*ORDER)[:radius + 1])
+            has_next = len(below) > radius
+            rows = above[::-1] + [me] + below[:radius]
+            # Con menos de R por encima, el recorrido hacia arriba llegó al primero
+            first_rank = 1 if len(above) < radius else window_start_rank(rows)
+            has_prev = first_rank > 1
+
+    else:
+        limit = _int_param(params, 'limit', 50, 1, page_max)
+        rows = list(entries.order_by(*ORDER)[:limit + 1])
+        has_next = len(rows) > limit
+        rows = rows[:limit]
+        first_rank = 1
+
+    if user.is_authenticated:
+        # Si el usuario está en la ventana su posición sale de ella
+        for offset, entry in enumerate(rows):
+            if entry.user_id == user.id:
+                user_position = first_rank + offset
+                break
+        else:
+            me = Leaderboard.objects.filter(user=user).first()
+            if me is not None:
+                user_position = rank_of(sort_key(me))
+
+    active_challenge_ids = list(Challenge.objects.filter(is_active=True).values_list('id', flat=True))
+
+    # Tasks aprobadas de todos los usuarios de la ventana en una sola consulta
+    passed_by_user = {}
+    for user_id, challenge_id in PassedTask.objects.filter(
+        user_id__in=[entry.user_id for entry in rows]
+    ).values_list('user_id', 'challenge_id'):
+        passed_by_user.setdefault(user_id, set()).add(challenge_id)
+
+    leaderboard_data, challenge_roots = leaderboard_rows(rows, active_challenge_ids, passed_by_user, first_rank)
+
+    return {
+        'leaderboard': leaderboard_data,
+        'user_position': user_position,
+        'total_users': sum(n for _, _, n in score_groups()),
+        'challenge_roots': challenge_roots,
+        'next_cursor': encode_cursor('next', first_rank + len(rows) - 1, rows[-1]) if rows and has_next else None,
+        'prev_cursor': encode_cursor('prev', first_rank, rows[0]) if rows and has_prev else None,
+    }
+
+
+def leaderboard_rows(leaderboard_entries, active_challenge_ids, passed_by_user, first_rank=1):
+    """
+    Filas del leaderboard (JSON y template) a partir de las entradas ya
+    ordenadas, los ids de los challenges activos y las tasks aprobadas por
+    usuario. Sin consultas. first_rank es la posición de la primera entrada:
+    la ventana es contigua, así que el resto sale del propio orden.
+    """
+    # Compute challenge roots (e.g., 351 -> 35) from active challenges to build columns
+    challenge_roots_set = set()
+    for cid in active_challenge_ids:
+        try:
+            challenge_roots_set.add(int(cid) // 10)
+        except Exception:
+            continue
+    challenge_roots = sorted(challenge_roots_set)
+
+    # Build mapping root -> ordered list of task ids for that root (used to render dots)
+    task_ids_per_root = {}
+    for root in challenge_roots:
+        ids = sorted([int(cid) for cid in active_challenge_ids if int(cid) // 10 == root])
+        task_ids_per_root[root] = ids
+
+    leaderboard_data = []
+    for idx, entry in enumerate(leaderboard_entries, start=first_rank):
+        # Gather passed tasks for this user grouped by challenge root (e.g., 351->35)
+        passed_task_ids = passed_by_user.get(entry.user_id, set())
+
+        passed_by_challenge = {}
+        for cid in passed_task_ids:
+            try:
+                root = int(cid) // 10
+            except Exception:
+                root = cid
+            passed_by_challenge.setdefault(root, []).append(int(cid))
+
+        # Sort the lists for consistency
+        for k in passed_by_challenge:
+            passed_by_challenge[k].sort()
+
+        # Create entry dict and also expose per-root lists for template convenience
+        entry_dict = {
+            'rank': idx,
+            'username': entry.user.username,
+            'total_score': entry.total_score,
+            'challenges_completed': entry.challenges_completed,
+            'last_updated': entry.last_updated,
+            'passed_tasks_by_challenge': passed_by_challenge,
+        }
+
+        for root in challenge_roots:
+            entry_dict[f'passed_root_{root}'] = passed_by_challenge.get(root, [])
+            # completed flags aligned with task_ids_per_root[root]
+            flags = [tid in passed_task_ids for tid in task_ids_per_root.get(root, [])]
+            entry_dict[f'completed_flags_{root}'] = flags
+
+        # Also expose an ordered list of (root, tasks) and (root, flags) pairs to simplify template rendering
+        entry_dict['passed_roots_pairs'] = [(root, passed_by_challenge.get(root, [])) for root in challenge_roots]
+        entry_dict['completed_roots_pairs'] = [(root, entry_dict.get(f'completed_flags_{root}', [])) for root in challenge_roots]
+
+        leaderboard_data.append(entry_dict)
+
+    return leaderboard_data, challenge_roots
@@ -0,0 +1,185 @@
+"""
+Comprueba que cada ruta de grader/urls.py respeta su presupuesto de consultas SQL.
+
+Uso:
+    SQLITE_PATH=/tmp/seeded.sqlite3 python manage.py check_query_budgets
+    python manage.py check_query_budgets --route leaderboard --route challenges
+
+Pensado para correr contra una copia de la BD de producción o una BD
+sintética de tamaño realista (generate_event_db): los N+1 solo se ven con
+muchas filas. Dentro de una transacción que se deshace al final se crea un
+usuario de prueba con submissions en cada challenge activo, y se hace cada
+request con el Client de Django contando consultas igual que
+QueryBudgetMiddleware. Las cachés en proceso (contadores, tokens) se vacían
+antes de cada request: se mide el peor caso. Falla si alguna ruta supera
+QUERY_BUDGETS o si hay rutas sin request definido aquí (al añadir una ruta
+hay que añadir su caso).
+"""
+
+import json
+
+from django.contrib.auth.models import AnonymousUser, User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import override_settings
+from rest_framework.authtoken.models import Token
+
+from grader import authentication, counters, leaderboard, urls
+from grader.middleware import QueryStats, budget_for
+from grader.models import Challenge, PassedTask, Submission
+
+PROBE_USERNAME = 'query-budget-probe'
+PROBE_PASSWORD = 'query-budget-probe-pass'
+
+# Task con resultados aceptados conocidos (Task 4 del 35): se envía dos veces,
+# primer aprobado (suma puntos) y reenvío de una task ya aprobada
+ACCEPTED_PROBE_TASK = 354
+ACCEPTED_PROBE_RESULTS = {'final_energy_beta': 0.0006559581843628555}
+
+
+class Command(BaseCommand):
+    help = 'Verifica el presupuesto de consultas SQL de cada ruta de la API'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--route', action='append', default=[],
+                            help='Comprobar solo esta ruta (url name); se puede repetir')
+        parser.add_argument('--submissions-per-task', type=int, default=3,
+                            help='Submissions del usuario de prueba en cada challenge (default: 3)')
+
+    def handle(self, *args, **options):
+        route_names = [pattern.name for pattern in urls.urlpatterns]
+        selected = options['route'] or route_names
+        unknown = set(selected) - set(route_names)
+        if unknown:
+            raise CommandError(f"Rutas desconocidas: {sorted(unknown)}")
+
+        self.stdout.write(f"🔍 BD: {User.objects.count()} usuarios, {Submission.objects.count()} submissions, "
+                          f"{Challenge.objects.filter(is_active=True).count()} challenges activos\n")
+
+        # /metrics abierto durante la comprobación para medir el render real
+        with override_settings(SUBMISSION_WRITE_BEHIND=False, METRICS_TOKEN='', METRICS_PUBLIC=True), \
+                transaction.atomic():
+            fixtures = self._create_probe_user(options['submissions_per_task'])
+            cases = self._cases(fixtures)
+
+            missing = [name for name in route_names if name not in cases]
+            results = []
+            for name in selected:
+                for label, method, path, data, auth, extra in cases.get(name, []):
+                    results.append((name, label, *self._measure(method, path, data, auth, extra, fixtures)))
+
+            transaction.set_rollback(True)
+
+        failed = []
+        self.stdout.write(f"  {'ruta':<20} {'request':<38} {'estado':>6} {'queries':>8} {'budget':>7} {'BD ms':>8}")
+        for name, label, status_code, queries, seconds in results:
+            budget = budget_for(name)
+            ok = queries <= budget and status_code < 500
+            if not ok:
+                failed.append(f"{name} ({label}): {queries} queries / budget {budget}, HTTP {status_code}")
+            self.stdout.write(f"{'✅' if ok else '❌'} {name:<20} {label:<38} {status_code:>6} {queries:>8} "
+                              f"{budget:>7} {seconds * 1000:>8.1f}")
+
+        if missing and not options['route']:
+            failed.append(f"rutas sin caso en check_query_budgets: {missing}")
+        if failed:
+            raise CommandError("Presupuesto de consultas superado:\n  " + "\n  ".join(failed))
+        self.stdout.write(self.style.SUCCESS(f"\n✨ {len(results)} requests dentro de presupuesto"))
+
+    def _create_probe_user(self, per_task):
+        user = User.objects.create_user(PROBE_USERNAME, f'{PROBE_USERNAME}@example.com', PROBE_PASSWORD)
+        token = Token.objects.create(user=user)
+        challenges = list(Challenge.objects.filter(is_active=True).order_by('id'))
+        if not challenges:
+            raise CommandError("No hay challenges activos: cargar el catálogo antes (manage.py load_challenges)")
+
+        # Aprobadas las de índice par, salvo la task del envío aceptado
+        passed = {challenge.id for i, challenge in enumerate(challenges)
+                  if i % 2 == 0 and challenge.id != ACCEPTED_PROBE_TASK}
+        Submission.objects.bulk_create([
+            Submission(user=user, challenge=challenge, code='# budget probe',
+                       score=challenge.max_score if attempt == 0 and challenge.id in passed else 0,
+                       passed=attempt == 0 and challenge.id in passed, feedback='', execution_time=0.01)
+            for challenge in challenges
+            for attempt in range(per_task)
+        ])
+        for challenge in challenges:
+            if challenge.id in passed:
+                PassedTask.record(user, challenge)
+
+        # Como tras el warm-up de health.start_warmup(): el flag ya está en memoria
+        PassedTask.is_backfilled()
+
+        return {
+            'user': user,
+            'token': token.key,
+            'challenge': challenges[0],
+            'task': challenges[-1],
+            'accepted_task': next((c for c in challenges if c.id == ACCEPTED_PROBE_TASK), None),
+            'submission': Submission.objects.filter(user=user).order_by('-id').values_list('id', flat=True).first(),
+            'cursor': leaderboard.window({'limit': '50'}, AnonymousUser())['next_cursor'] or '',
+        }
+
+    def _cases(self, fixtures):
+        """url name -> [(etiqueta, método, path, datos, autenticado, cabeceras extra)]"""
+        html = {'HTTP_ACCEPT': 'text/html,application/xhtml+xml,*/*;q=0.8'}  # Como un navegador
+        submit_results = [('POST /api/submit-results (rechazada)', 'post', '/api/submit-results',
+                           {'challenge_id': fixtures['task'].id, 'results': {'probe': 0}}, True, {})]
+        if fixtures['accepted_task']:
+            # En orden: el primero es el primer aprobado, el segundo un reenvío ya aprobado
+            accepted = {'challenge_id': ACCEPTED_PROBE_TASK, 'results': ACCEPTED_PROBE_RESULTS}
+            submit_results += [
+                ('POST /api/submit-results (1er aprobado)', 'post', '/api/submit-results', accepted, True, {}),
+                ('POST /api/submit-results (reenvío)', 'post', '/api/submit-results', accepted, True, {}),
+            ]
+        return {
+            'home': [('GET /', 'get', '/', None, False, html)],
+            'api-index': [('GET /api/ (JSON)', 'get', '/api/', None, False, {}),
+                          ('GET /api/ (HTML)', 'get', '/api/', None, False, html)],
+            'register': [('POST /api/register', 'post', '/api/register',
+                          {'username': f'{PROBE_USERNAME}-2', 'email': f'{PROBE_USERNAME}-2@example.com',
+                           'password': PROBE_PASSWORD}, False, {})],
+            'login': [('POST /api/login', 'post', '/api/login',
+                       {'username': PROBE_USERNAME, 'password': PROBE_PASSWORD}, False, {})],
+            'profile': [('GET /api/profile', 'get', '/api/profile', None, True, {})],
+            'challenges': [('GET /api/challenges', 'get', '/api/challenges', None, True, {})],
+            'challenge-detail': [('GET /api/challenges/<id>', 'get',
+                                  f"/api/challenges/{fixtures['challenge'].id}", None, True, {})],
+            'submit': [('POST /api/submit', 'post', '/api/submit',
+                        {'challenge_id': fixtures['task'].id, 'code': "print('query budget probe')"}, True, {})],
+            'submit-results': submit_results,
+            'submissions': [('GET /api/submissions', 'get', '/api/submissions', None, True, {})],
+            'submission-detail': [('GET /api/submissions/<id>', 'get',
+                                   f"/api/submissions/{fixtures['submission']}", None, True, {})],
+            'leaderboard': [('GET /api/leaderboard (JSON)', 'get', '/api/leaderboard?limit=50', None, True, {}),
+                            ('GET /api/leaderboard (HTML)', 'get', '/api/leaderboard?limit=50', None, True, html),
+                            ('GET /api/leaderboard?around=me', 'get', '/api/leaderboard?around=me&radius=25',
+                             None, True, {}),
+                            ('GET /api/leaderboard?cursor=', 'get',
+                             f"/api/leaderboard?cursor={fixtures['cursor']}&limit=50", None, True, {})],
+            'progress': [('GET /api/progress', 'get', '/api/progress', None, True, {})],
+            'stats': [('GET /api/stats', 'get', '/api/stats', None, True, {})],
+            'download-client': [('GET /api/download-client', 'get', '/api/download-client', None, False, {})],
+            'health': [('GET /api/health', 'get', '/api/health', None, False, {})],
+            'metrics': [('GET /metrics', 'get', '/metrics', None, False, {})],
+        }
+
+    def _measure(self, method, path, data, auth, extra, fixtures):
+        # Peor caso: sin contadores ni tokens cacheados en el proceso
+        counters.reset_cache()
+        leaderboard.reset_cache()
+        authentication.clear_cache()
+
+        client = Client(HTTP_HOST='localhost')
+        headers = dict(extra)
+        if auth:
+            headers['HTTP_AUTHORIZATION'] = f"Token {fixtures['token']}"
+
+        stats = QueryStats()
+        with connection.execute_wrapper(stats):
+            if method == 'post':
+                response = client.post(path, json.dumps(data), content_type='application/json', **headers)
+            else:
+                response = client.get(path, **headers)
+        return response.status_code, stats.queries, stats.seconds
@@ -0,0 +1,81 @@
+"""
+Exporta las submissions de resultados como traza para benchmarks/replay_trace.py.
+
+Uso:
+    python manage.py export_submission_trace trace.jsonl
+    python manage.py export_submission_trace trace.jsonl --since 2025-10-31T18:00 --until 2025-10-31T21:00
+    python manage.py export_submission_trace trace.jsonl --challenge 351 --challenge 362 --limit 5000
+
+SubmitResultsView guarda los resultados en Submission.code como
+"# Results submission\\n<json>". Cada línea del fichero es un JSON con el
+instante relativo a la primera submission ('t', en segundos), el challenge,
+los resultados y el veredicto guardado (score/passed). Los usuarios se
+anonimizan: 'user' es un índice por orden de aparición. Las submissions de
+código (/api/submit) se omiten.
+"""
+
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from grader.models import Submission
+
+RESULTS_PREFIX = '# Results submission\n'
+
+
+class Command(BaseCommand):
+    help = 'Exporta las submissions de resultados (con sus tiempos y veredictos) a un fichero JSONL'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Fichero .jsonl de salida')
+        parser.add_argument('--since', help='Desde este instante (ISO 8601)')
+        parser.add_argument('--until', help='Hasta este instante (ISO 8601)')
+        parser.add_argument('--challenge', type=int, action='append', default=[],
+                            help='Solo este challenge; se puede repetir')
+        parser.add_argument('--limit', type=int, help='Como mucho N submissions')
+
+    def handle(self, *args, **options):
+        queryset = Submission.objects.filter(code__startswith=RESULTS_PREFIX).order_by('submitted_at', 'id')
+        for option, lookup in (('since', 'submitted_at__gte'), ('until', 'submitted_at__lt')):
+            if options[option]:
+                moment = parse_datetime(options[option])
+                if moment is None:
+                    raise CommandError(f"--{option}: fecha no válida: {options[option]}")
+                if timezone.is_naive(moment):
+                    moment = timezone.make_aware(moment)
+                queryset = queryset.filter(**{lookup: moment})
+        if options['challenge']:
+            queryset = queryset.filter(challenge_id__in=options['challenge'])
+        if options['limit']:
+            queryset = queryset[:options['limit']]
+
+        users, first, last, written, skipped = {}, None, None, 0, 0
+        rows = queryset.values_list('user_id', 'challenge_id', 'code', 'score', 'passed', 'submitted_at')
+        with open(options['path'], 'w', encoding='utf-8') as f:
+            for user_id, challenge_id, code, score, passed, submitted_at in rows.iterator(chunk_size=2000):
+                try:
+                    results = json.loads(code[len(RESULTS_PREFIX):])
+                except ValueError:
+                    skipped += 1
+                    continue
+                if first is None:
+                    first = submitted_at
+                last = submitted_at
+                f.write(json.dumps({
+                    't': round((submitted_at - first).total_seconds(), 3),
+                    'user': users.setdefault(user_id, len(users)),
+                    'challenge_id': challenge_id,
+                    'results': results,
+                    'score': score,
+                    'passed': passed,
+                }) + '\n')
+                written += 1
+
+        if skipped:
+            self.stdout.write(f"  ⚠️ {skipped} submissions con JSON ilegible omitidas")
+        span = f", {(last - first).total_seconds():.0f}s de traza" if written else ''
+        self.stdout.write(self.style.SUCCESS(
+            f"✨ {written} submissions de {len(users)} usuarios exportadas a {options['path']}{span}"
+        ))
@@ -0,0 +1,290 @@
+"""
+Llena la BD con un evento sintético de tamaño realista para pruebas de rendimiento.
+
+Uso:
+    SQLITE_PATH=/tmp/event.sqlite3 python manage.py migrate --run-syncdb
+    SQLITE_PATH=/tmp/event.sqlite3 python manage.py load_challenges challenges.json
+    SQLITE_PATH=/tmp/event.sqlite3 python manage.py generate_event_db --users 50000 --submissions 5000000
+    python manage.py generate_event_db --users 2000 --submissions 100000 --seed 7 --zipf 1.3
+
+Los intentos por usuario siguen una Zipf-Mandelbrot: el usuario de rango r
+recibe un peso 1/(r + offset)^s (--zipf es s; el offset por defecto es
+usuarios/100, para que el más activo no acapare el evento) y las
+--submissions se reparten con una multinomial, así que el total es exacto.
+Una fracción --idle de usuarios se registra y no envía nada. Cada usuario
+recorre los challenges activos en orden: falla con una probabilidad según la
+dificultad (las tasks del 37 dan puntos parciales), abandona una task tras
+unos cuantos fallos y, si le sobran intentos, reenvía tasks ya vistas con la
+misma probabilidad de fallo. Las fechas se reparten en una ventana de
+--hours horas desde --start.
+
+Users, PassedTask, UserProfile y Leaderboard se insertan con bulk_create por
+lotes y las submissions con executemany (ninguno dispara signals: no debe
+haber tráfico contra la BD mientras tanto). Todo se calcula en memoria, así
+que quedan coherentes entre sí: rebuild_leaderboard --dry-run no debe ver
+diferencias. Al final se recalculan los contadores. Con la misma --seed y el
+mismo catálogo el resultado es el mismo. Todos los usuarios comparten la
+contraseña --password (un solo hash). El código guardado empieza por
+"# Synthetic submission": export_submission_trace no lo exporta.
+"""
+
+import time
+from datetime import timedelta
+
+import numpy as np
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from grader import counters
+from grader.management.commands.import_sqlite import Command as ImportSqlite
+from grader.models import Challenge, Leaderboard, PassedTask, Submission, UserProfile
+
+# Probabilidad de aprobar cada intento según la dificultad del challenge
+PASS_RATE = {'easy': 0.6, 'medium': 0.4, 'hard': 0.25}
+CODE_PREFIX = '# Synthetic submission (generate_event_db)\n'
+
+
+class Command(BaseCommand):
+    help = 'Genera usuarios y submissions sintéticos (evento grande) con leaderboard y perfiles coherentes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=50000, help='Usuarios a crear (default: 50000)')
+        parser.add_argument('--submissions', type=int, default=5000000,
+                            help='Submissions a repartir entre los usuarios (default: 5000000)')
+        parser.add_argument('--zipf', type=float, default=1.1,
+                            help='Exponente s de la Zipf de intentos por usuario (default: 1.1)')
+        parser.add_argument('--zipf-offset', type=float,
+                            help='Offset de la Zipf-Mandelbrot (default: usuarios/100)')
+        parser.add_argument('--idle', type=float, default=0.05,
+                            help='Fracción de usuarios sin ninguna submission (default: 0.05)')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--start', help='Inicio del evento, ISO 8601 (default: ahora - --hours)')
+        parser.add_argument('--hours', type=float, default=3, help='Duración del evento (default: 3)')
+        parser.add_argument('--prefix', default='student', help="Prefijo de los usernames (default: 'student')")
+        parser.add_argument('--password', default='synthetic-event', help='Contraseña de todos los usuarios')
+        parser.add_argument('--code-size', type=int, default=512,
+                            help='Bytes de Submission.code por fila (default: 512)')
+        parser.add_argument('--batch-size', type=int, default=5000,
+                            help='Filas por bulk_create (default: 5000)')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        n_users, n_submissions = options['users'], options['submissions']
+        if n_users < 1 or n_submissions < 0:
+            raise CommandError('--users debe ser >= 1 y --submissions >= 0')
+        if not 0 <= options['idle'] < 1:
+            raise CommandError('--idle debe estar en [0, 1)')
+
+        challenges = list(Challenge.objects.filter(is_active=True).order_by('id')
+                          .values('id', 'max_score', 'difficulty'))
+        if not challenges:
+            raise CommandError('No hay challenges activos: ejecuta antes load_challenges challenges.json')
+        if User.objects.filter(username__startswith=options['prefix']).exists():
+            raise CommandError(f"Ya hay usuarios con el prefijo '{options['prefix']}': usa otro --prefix")
+
+        window = options['hours'] * 3600
+        if options['start']:
+            start = parse_datetime(options['start'])
+            if start is None:
+                raise CommandError(f"--start: fecha no válida: {options['start']}")
+            if timezone.is_naive(start):
+                start = timezone.make_aware(start)
+        else:
+            start = timezone.now() - timedelta(seconds=window)
+
+        rng = np.random.default_rng(options['seed'])
+        self.stdout.write(f"🔧 {n_users} usuarios, {n_submissions} submissions, "
+                          f"{len(challenges)} challenges activos, seed {options['seed']}")
+
+        attempts = self._attempts_per_user(rng, n_users, n_submissions, options)
+        arrival = rng.uniform(0, 0.3 * window, n_users)
+        plan = self._simulate(rng, challenges, attempts, arrival, window)
+        self.stdout.write(f"  ✅ Evento simulado: máx. {attempts.max()} intentos por usuario, "
+                          f"mediana {int(np.median(attempts))}, {len(plan['first_passes'])} tasks aprobadas")
+
+        user_ids = self._create_users(options, start, arrival)
+        submission_ids = self._create_submissions(options, start, challenges, plan, user_ids)
+        self._create_aggregates(options, start, challenges, plan, arrival, user_ids, submission_ids)
+
+        actual, _ = counters.reconcile()
+        self.stdout.write(self.style.SUCCESS(
+            f"\n✨ Evento generado en {time.perf_counter() - started:.0f}s: "
+            f"{actual['users']} usuarios, {actual['submissions']} submissions, {actual['passes']} aprobadas en total"
+        ))
+
+    def _attempts_per_user(self, rng, n_users, n_submissions, options):
+        offset = options['zipf_offset'] if options['zipf_offset'] is not None else n_users / 100
+        weights = 1.0 / (np.arange(1, n_users + 1) + offset) ** options['zipf']
+        weights[n_users - int(n_users * options['idle']):] = 0
+        if not weights.any():
+            weights[0] = 1
+        # Los rangos se barajan para que la actividad no dependa del orden de alta
+        weights = rng.permutation(weights)
+        return rng.multinomial(n_submissions, weights / weights.sum())
+
+    def _simulate(self, rng, challenges, attempts, arrival, window):
+        """
+        Decide challenge, score y veredicto de cada intento. Devuelve arrays por
+        submission (ordenados por usuario y fecha) y los primeros aprobados.
+        """
+        n = int(attempts.sum())
+        owner = np.repeat(np.arange(len(attempts)), attempts)
+        # Fechas uniformes entre la llegada del usuario y el final, ordenadas por usuario
+        moment = arrival[owner] + rng.random(n) * (window - arrival[owner])
+        moment = moment[np.lexsort((moment, owner))]
+
+        ids = [c['id'] for c in challenges]
+        max_scores = [c['max_score'] for c in challenges]
+        pass_rates = [PASS_RATE.get(c['difficulty'], 0.4) for c in challenges]
+        partial = [c['id'] // 10 == 37 for c in challenges]
+        tasks = len(challenges)
+
+        challenge = np.empty(n, dtype=np.int32)
+        score = np.zeros(n, dtype=np.int32)
+        passed = np.zeros(n, dtype=bool)
+        draws = rng.random(n).tolist()
+        picks = rng.integers(0, tasks, n).tolist()
+        partials = rng.random(n).tolist()
+        patience = rng.integers(3, 11, len(attempts)).tolist()
+
+        first_passes = []  # (índice de usuario, índice de challenge, índice de submission)
+        best_totals = np.zeros(len(attempts), dtype=np.int64)
+        i = 0
+        for user, count in enumerate(attempts.tolist()):
+            current, failures = 0, 0
+            best = [0] * tasks
+            done = [False] * tasks
+            for _ in range(count):
+                if current < tasks:
+                    task = current
+                else:
+                    # Sin tasks nuevas: reenvía una ya vista
+                    task = picks[i]
+                ok = draws[i] < pass_rates[task]
+                if ok:
+                    points = max_scores[task]
+                    if not done[task]:
+                        done[task] = True
+                        first_passes.append((user, task, i))
+                elif partial[task]:
+                    points = int(partials[i] * (max_scores[task] // 2 + 1))
+                else:
+                    points = 0
+                challenge[i], score[i], passed[i] = ids[task], points, ok
+                best[task] = max(best[task], points)
+
+                if current < tasks:
+                    failures = 0 if ok else failures + 1
+                    if ok or failures >= patience[user]:
+                        current, failures = current + 1, 0
+                i += 1
+            best_totals[user] = sum(best)
+
+        return {'owner': owner, 'moment': moment, 'challenge': challenge, 'score': score, 'passed': passed,
+                'first_passes': first_passes, 'best_totals': best_totals}
+
+    def _create_users(self, options, start, arrival):
+        password = make_password(options['password'])
+        prefix, batch_size = options['prefix'], options['batch_size']
+        width = len(str(len(arrival) - 1))
+        user_ids = np.empty(len(arrival), dtype=np.int64)
+        for offset in range(0, len(arrival), batch_size):
+            batch = [
+                User(username=f'{prefix}{i:0{width}d}', email=f'{prefix}{i:0{width}d}@example.com',
+                     password=password, date_joined=start + timedelta(seconds=float(arrival[i])))
+                for i in range(offset, min(offset + batch_size, len(arrival)))
+            ]
+            User.objects.bulk_create(batch)
+            user_ids[offset:offset + len(batch)] = [user.pk for user in batch]
+        self.stdout.write(f"  ✅ {len(arrival)} usuarios creados")
+        return user_ids
+
+    def _create_submissions(self, options, start, challenges, plan, user_ids):
+        owner, moment = plan['owner'], plan['moment']
+        challenge, score, passed = plan['challenge'], plan['score'], plan['passed']
+        n, batch_size = len(owner), options['batch_size']
+        code = CODE_PREFIX + '#' * max(0, options['code_size'] - len(CODE_PREFIX))
+        feedback = {
+            (c['id'], ok): f"{'✅' if ok else '❌'} Task {c['id']} {'ACCEPTED' if ok else 'REJECTED'}"
+            for c in challenges for ok in (True, False)
+        }
+        rng = np.random.default_rng(options['seed'] + 1)
+        execution_time = rng.lognormal(np.log(0.002), 0.8, n)
+
+        # Con millones de filas bulk_create se va en preparar cada valor: INSERT
+        # directo con executemany y PK asignadas aquí, en orden cronológico como
+        # llegarían en producción (no debe haber tráfico escribiendo a la vez)
+        meta = Submission._meta
+        columns = ['id', 'user_id', 'challenge_id', 'code', 'score', 'passed', 'feedback',
+                   'submitted_at', 'execution_time', 'error_message']
+        sql = (f"INSERT INTO {meta.db_table} ({', '.join(columns)}) "
+               f"VALUES ({', '.join(['%s'] * len(columns))})")
+        first_id = (Submission.objects.aggregate(last=Max('id'))['last'] or 0) + 1
+        adapt = connection.ops.adapt_datetimefield_value
+
+        order = np.argsort(moment, kind='stable')
+        submission_ids = np.empty(n, dtype=np.int64)
+        submission_ids[order] = np.arange(first_id, first_id + n)
+
+        tick = time.perf_counter()
+        for offset in range(0, n, batch_size):
+            rows = order[offset:offset + batch_size]
+            batch = zip(submission_ids[rows].tolist(), user_ids[owner[rows]].tolist(), challenge[rows].tolist(),
+                        score[rows].tolist(), passed[rows].tolist(), moment[rows].tolist(),
+                        execution_time[rows].tolist())
+            values = [
+                (pk, user_id, challenge_id, code, points, ok, feedback[(challenge_id, ok)],
+                 adapt(start + timedelta(seconds=seconds)), elapsed, '')
+                for pk, user_id, challenge_id, points, ok, seconds, elapsed in batch
+            ]
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.executemany(sql, values)
+
+            done = offset + len(rows)
+            if done % (batch_size * 50) < batch_size or done == n:
+                self.stdout.write(f"  🔄 {done}/{n} submissions ({done / (time.perf_counter() - tick):.0f}/s)")
+
+        statements = connection.ops.sequence_reset_sql(no_style(), [Submission])
+        with connection.cursor() as cursor:
+            for statement in statements:
+                cursor.execute(statement)
+        return submission_ids
+
+    def _create_aggregates(self, options, start, challenges, plan, arrival, user_ids, submission_ids):
+        batch_size, moment = options['batch_size'], plan['moment']
+        n_users = len(user_ids)
+        totals = np.zeros(n_users, dtype=np.int64)
+        completed = np.zeros(n_users, dtype=np.int64)
+        # Sin aprobados, el desempate del leaderboard es la llegada del usuario
+        last_pass = arrival.copy()
+
+        passed_tasks = []
+        for user, task, i in plan['first_passes']:
+            totals[user] += challenges[task]['max_score']
+            completed[user] += 1
+            last_pass[user] = max(last_pass[user], moment[i])
+            passed_tasks.append(PassedTask(user_id=int(user_ids[user]), challenge_id=challenges[task]['id'],
+                                           submission_id=int(submission_ids[i]),
+                                           passed_at=start + timedelta(seconds=float(moment[i]))))
+
+        with transaction.atomic():
+            PassedTask.objects.bulk_create(passed_tasks, batch_size=batch_size)
+            with ImportSqlite._keep_timestamps(UserProfile), ImportSqlite._keep_timestamps(Leaderboard):
+                UserProfile.objects.bulk_create([
+                    UserProfile(user_id=int(user_ids[user]), total_score=int(plan['best_totals'][user]),
+                                created_at=start + timedelta(seconds=float(arrival[user])))
+                    for user in range(n_users)
+                ], batch_size=batch_size)
+                Leaderboard.objects.bulk_create([
+                    Leaderboard(user_id=int(user_ids[user]), total_score=int(totals[user]),
+                                challenges_completed=int(completed[user]),
+                                last_updated=start + timedelta(seconds=float(last_pass[user])))
+                    for user in range(n_users)
+                ], batch_size=batch_size)
+        self.stdout.write(f"  ✅ {len(passed_tasks)} PassedTask, {n_users} perfiles y entradas de leaderboard")
@@ -0,0 +1,150 @@
+"""
+Copia un db.sqlite3 existente a la base de datos configurada (p. ej. PostgreSQL).
+
+Uso:
+    DATABASE_URL=postgres://... python manage.py migrate --run-syncdb
+    DATABASE_URL=postgres://... python manage.py import_sqlite db.sqlite3
+
+Lee la base SQLite directamente con sqlite3 (sin registrar otro alias en
+settings) y escribe por bloques con bulk_create, conservando las claves
+primarias. bulk_create no dispara post_save, así que no se duplican los
+UserProfile/Leaderboard que crean los signals.
+"""
+
+import sqlite3
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone as dt_timezone
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, models, transaction
+from rest_framework.authtoken.models import Token
+
+from grader.counters import reconcile
+from grader.models import Challenge, PassedTask, Submission, UserProfile, Leaderboard
+
+# Orden de copia (respeta las claves foráneas)
+COPY_ORDER = [User, Token, Challenge, UserProfile, Leaderboard, Submission, PassedTask]
+
+
+class Command(BaseCommand):
+    help = 'Copia usuarios, tokens, challenges, submissions, leaderboard y perfiles desde un db.sqlite3'
+
+    def add_arguments(self, parser):
+        parser.add_argument('source', help='Ruta al db.sqlite3 de origen')
+        parser.add_argument('--chunk-size', type=int, default=5000,
+                            help='Filas leídas e insertadas por bloque (default: 5000)')
+        parser.add_argument('--truncate', action='store_true',
+                            help='Borra las filas existentes en el destino antes de copiar')
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+
+        try:
+            source = sqlite3.connect(f"file:{options['source']}?mode=ro", uri=True)
+        except sqlite3.OperationalError as e:
+            raise CommandError(f"No se puede abrir {options['source']}: {e}")
+
+        try:
+            self._check_target(options['truncate'])
+
+            started = time.perf_counter()
+            source_tables = {row[0] for row in source.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+            for model in COPY_ORDER:
+                if model._meta.db_table not in source_tables:
+                    # db.sqlite3 anterior a este modelo (p. ej. sin PassedTask)
+                    self.stdout.write(self.style.WARNING(f"  ⚠️  {model._meta.label:<24} no existe en el origen"))
+                    continue
+                copied = self._copy_table(source, model, chunk_size)
+                self.stdout.write(f"  ✅ {model._meta.label:<24} {copied:>10} filas")
+
+            self._reset_sequences()
+            # Origen sin PassedTask (o incompleto): rellenarlo desde las aprobadas
+            backfilled = PassedTask.backfill()
+            PassedTask.mark_backfilled()
+            if backfilled:
+                self.stdout.write(f"  ✅ {'PassedTask (backfill)':<24} {backfilled:>10} filas")
+            # bulk_create no dispara signals: recalcular los contadores globales
+            reconcile()
+        finally:
+            source.close()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"\n✨ Copia completada en {time.perf_counter() - started:.1f}s "
+            f"({connection.vendor}: {connection.settings_dict['NAME']})"
+        ))
+
+    def _check_target(self, truncate):
+        non_empty = [m for m in COPY_ORDER if m.objects.exists()]
+        if not non_empty:
+            return
+        if not truncate:
+            labels = ', '.join(m._meta.label for m in non_empty)
+            raise CommandError(f"El destino ya tiene datos ({labels}). Usa --truncate para reemplazarlos.")
+
+        # TRUNCATE en PostgreSQL, DELETE en SQLite
+        tables = [m._meta.db_table for m in COPY_ORDER]
+        connection.ops.execute_sql_flush(connection.ops.sql_flush(no_style(), tables))
+
+    def _copy_table(self, source, model, chunk_size):
+        fields = model._meta.concrete_fields
+        columns = ', '.join(f'"{f.column}"' for f in fields)
+        pk_column = model._meta.pk.column
+
+        cursor = source.execute(
+            f'SELECT {columns} FROM "{model._meta.db_table}" ORDER BY "{pk_column}"'
+        )
+
+        copied = 0
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+
+            objs = [
+                model(**{f.attname: self._to_python(f, value) for f, value in zip(fields, row)})
+                for row in rows
+            ]
+            with transaction.atomic(), self._keep_timestamps(model):
+                model.objects.bulk_create(objs, batch_size=chunk_size)
+            copied += len(objs)
+
+        return copied
+
+    @staticmethod
+    @contextmanager
+    def _keep_timestamps(model):
+        # bulk_create llama a pre_save(): sin esto auto_now/auto_now_add
+        # sobrescribirían las fechas originales con la hora de la copia
+        fields = [f for f in model._meta.concrete_fields
+                  if getattr(f, 'auto_now', False) or getattr(f, 'auto_now_add', False)]
+        saved = [(f, f.auto_now, f.auto_now_add) for f in fields]
+        for f in fields:
+            f.auto_now = f.auto_now_add = False
+        try:
+            yield
+        finally:
+            for f, auto_now, auto_now_add in saved:
+                f.auto_now, f.auto_now_add = auto_now, auto_now_add
+
+    @staticmethod
+    def _to_python(field, value):
+        if value is None:
+            return None
+        if isinstance(field, models.DateTimeField):
+            # SQLite guarda datetimes en UTC sin zona horaria
+            parsed = value if isinstance(value, datetime) else field.to_python(value)
+            return parsed.replace(tzinfo=dt_timezone.utc) if parsed.tzinfo is None else parsed
+        if isinstance(field, models.BooleanField):
+            return bool(value)
+        return value
+
+    def _reset_sequences(self):
+        # Las PK se copiaron tal cual: mover las secuencias de PostgreSQL al máximo actual
+        statements = connection.ops.sequence_reset_sql(no_style(), COPY_ORDER)
+        if statements:
+            with connection.cursor() as cursor:
+                for sql in statements:
+                    cursor.execute(sql)
@@ -0,0 +1,184 @@
+"""
+Carga el catálogo de challenges desde un fichero JSON o YAML.
+
+Uso:
+    python manage.py load_challenges challenges.json
+    python manage.py load_challenges catalog.yaml --deactivate-missing
+    python manage.py load_challenges challenges.json --dry-run
+
+El fichero es una lista de challenges, o un objeto con la clave "challenges":
+
+    {"challenges": [{"id": 351, "name": "...", "max_score": 20, ...}]}
+
+Se valida el catálogo completo antes de escribir nada. Después se hace un
+único bulk_create(update_conflicts=True) en una transacción, solo con los
+challenges nuevos o modificados, así que volver a cargar el mismo fichero no
+cambia nada. Si hubo cambios se incrementa Counter 'catalog_version': las
+vistas de challenges recargan con ella su caché del catálogo y la devuelven
+(campo catalog_version y cabecera X-Catalog-Version) para que los clientes
+noten el cambio.
+"""
+
+import json
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from grader.counters import refresh_active_challenges
+from grader.models import Challenge, Counter
+
+DIFFICULTIES = {value for value, _ in Challenge._meta.get_field('difficulty').choices}
+
+# campo -> (tipo, obligatorio, valor por defecto)
+SCHEMA = {
+    'id': (int, True, None),
+    'name': (str, True, None),
+    'description': (str, False, ''),
+    'max_score': (int, False, 100),
+    'difficulty': (str, False, 'medium'),
+    'is_active': (bool, False, True),
+    'evaluation_code': (str, False, ''),
+}
+UPDATE_FIELDS = [name for name in SCHEMA if name != 'id']
+
+# Campo opcional ausente: valor por defecto si el challenge es nuevo, y el
+# valor actual si ya existe (no pisar p. ej. evaluation_code editado en el admin)
+MISSING = object()
+
+
+class Command(BaseCommand):
+    help = 'Valida y carga (upsert) el catálogo de challenges desde un fichero JSON o YAML'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Fichero .json, .yaml o .yml con el catálogo')
+        parser.add_argument('--deactivate-missing', action='store_true',
+                            help='Desactiva los challenges activos que no estén en el fichero')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Valida y muestra el diff sin escribir nada')
+
+    def handle(self, *args, **options):
+        catalog = self._validate(self._read(options['path']))
+
+        existing = {c.id: c for c in Challenge.objects.all()}
+        created, updated = [], []
+        for entry in catalog:
+            current = existing.get(entry['id'])
+            for name, (_, _, default) in SCHEMA.items():
+                if entry[name] is MISSING:
+                    entry[name] = default if current is None else getattr(current, name)
+            if current is None:
+                created.append(entry)
+                continue
+            changed = [f for f in UPDATE_FIELDS if getattr(current, f) != entry[f]]
+            if changed:
+                updated.append((entry, changed))
+
+        ids = {entry['id'] for entry in catalog}
+        deactivated = []
+        if options['deactivate_missing']:
+            deactivated = sorted(cid for cid, c in existing.items() if cid not in ids and c.is_active)
+
+        for entry in created:
+            self.stdout.write(f"  ✅ {entry['id']} nuevo: {entry['name']}")
+        for entry, changed in updated:
+            details = ', '.join(f"{f}: {getattr(existing[entry['id']], f)!r} → {entry[f]!r}"
+                                for f in changed if f != 'evaluation_code')
+            if 'evaluation_code' in changed:
+                details = ', '.join(filter(None, [details, 'evaluation_code']))
+            self.stdout.write(f"  🔄 {entry['id']} {details}")
+        for cid in deactivated:
+            self.stdout.write(f"  💤 {cid} desactivado: {existing[cid].name}")
+
+        has_changes = bool(created or updated or deactivated)
+        if options['dry_run'] or not has_changes:
+            version = Counter.value_of('catalog_version')
+        else:
+            with transaction.atomic():
+                rows = [Challenge(**entry) for entry in created] + [Challenge(**entry) for entry, _ in updated]
+                Challenge.objects.bulk_create(
+                    rows,
+                    update_conflicts=True,
+                    unique_fields=['id'],
+                    update_fields=UPDATE_FIELDS + ['updated_at'],
+                )
+                if deactivated:
+                    Challenge.objects.filter(id__in=deactivated).update(is_active=False, updated_at=timezone.now())
+                refresh_active_challenges()
+                version = Counter.bump('catalog_version')
+
+        unchanged = len(catalog) - len(created) - len(updated)
+        prefix = '🔍 Dry run: ' if options['dry_run'] else '✨ '
+        self.stdout.write(self.style.SUCCESS(
+            f"\n{prefix}{len(created)} nuevos, {len(updated)} actualizados, "
+            f"{unchanged} sin cambios, {len(deactivated)} desactivados "
+            f"(catalog_version={version})"
+        ))
+
+    def _read(self, path):
+        try:
+            with open(path, encoding='utf-8') as f:
+                if os.path.splitext(path)[1].lower() in ('.yaml', '.yml'):
+                    try:
+                        import yaml
+                    except ImportError:
+                        raise CommandError("Para leer YAML hace falta PyYAML (pip install pyyaml)")
+                    data = yaml.safe_load(f)
+                else:
+                    data = json.load(f)
+        except OSError as e:
+            raise CommandError(f"No se puede leer {path}: {e}")
+        except ValueError as e:
+            raise CommandError(f"{path} no es un catálogo válido: {e}")
+
+        if isinstance(data, dict):
+            data = data.get('challenges')
+        if not isinstance(data, list):
+            raise CommandError(f"{path}: se esperaba una lista de challenges o {{'challenges': [...]}}")
+        return data
+
+    def _validate(self, data):
+        errors, catalog, seen = [], [], set()
+
+        for position, raw in enumerate(data):
+            where = f"challenge #{position}"
+            if not isinstance(raw, dict):
+                errors.append(f"{where}: debe ser un objeto")
+                continue
+            if isinstance(raw.get('id'), int):
+                where = f"challenge {raw['id']}"
+
+            unknown = set(raw) - set(SCHEMA)
+            if unknown:
+                errors.append(f"{where}: campos desconocidos {sorted(unknown)}")
+
+            entry = {}
+            for name, (kind, required, default) in SCHEMA.items():
+                if name not in raw:
+                    if required:
+                        errors.append(f"{where}: falta '{name}'")
+                    entry[name] = MISSING
+                    continue
+                value = raw[name]
+                # bool es subclase de int: no aceptar true como id o max_score
+                if not isinstance(value, kind) or (kind is int and isinstance(value, bool)):
+                    errors.append(f"{where}: '{name}' debe ser {kind.__name__}")
+                entry[name] = value
+
+            if isinstance(entry['id'], int):
+                if entry['id'] in seen:
+                    errors.append(f"{where}: id duplicado")
+                seen.add(entry['id'])
+            if isinstance(entry['name'], str) and not 0 < len(entry['name']) <= 200:
+                errors.append(f"{where}: 'name' debe tener entre 1 y 200 caracteres")
+            if isinstance(entry['max_score'], int) and entry['max_score'] < 0:
+                errors.append(f"{where}: 'max_score' no puede ser negativo")
+            if isinstance(entry['difficulty'], str) and entry['difficulty'] not in DIFFICULTIES:
+                errors.append(f"{where}: 'difficulty' debe ser uno de {sorted(DIFFICULTIES)}")
+
+            catalog.append(entry)
+
+        if errors:
+            raise CommandError("Catálogo inválido, no se ha escrito nada:\n  " + "\n  ".join(errors))
+        return catalog
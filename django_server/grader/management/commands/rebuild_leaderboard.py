@@ -0,0 +1,147 @@
+"""
+Recalcula Leaderboard, UserProfile.total_score y PassedTask desde las submissions.
+
+Uso:
+    python manage.py rebuild_leaderboard
+    python manage.py rebuild_leaderboard --dry-run
+
+Todo sale de tres consultas agregadas (primer aprobado por usuario y task,
+mejor score por usuario y task, y max_score de cada challenge); las
+diferencias se escriben con bulk_create/bulk_update por lotes. Los puntos de
+cada task son su Challenge.max_score (las tasks del 37 valen de 5 a 20).
+"""
+
+import time
+from collections import defaultdict
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Max, Min
+
+from grader.models import Challenge, Leaderboard, PassedTask, Submission, UserProfile
+
+
+class Command(BaseCommand):
+    help = 'Recalcula el leaderboard, los perfiles y las tasks aprobadas con consultas agregadas'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Muestra las diferencias sin escribir nada')
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Filas por lote en bulk_create/bulk_update (default: 1000)')
+        parser.add_argument('--show', type=int, default=20,
+                            help='Diferencias de leaderboard a listar (default: 20)')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        dry_run = options['dry_run']
+        batch_size = options['batch_size']
+
+        max_scores = dict(Challenge.objects.values_list('id', 'max_score'))
+
+        # Primer aprobado de cada (usuario, task)
+        first_passes = {
+            (row['user_id'], row['challenge_id']): row
+            for row in Submission.objects.filter(passed=True).order_by()
+            .values('user_id', 'challenge_id')
+            .annotate(first_id=Min('id'), first_at=Min('submitted_at'))
+        }
+
+        # Mejor score de cada (usuario, task), aprobada o no (UserProfile.total_score)
+        best_scores = defaultdict(int)
+        for row in (Submission.objects.order_by().values('user_id', 'challenge_id')
+                    .annotate(best=Max('score'))):
+            best_scores[row['user_id']] += row['best'] or 0
+
+        expected = defaultdict(lambda: [0, 0])  # user_id -> [total_score, challenges_completed]
+        for user_id, challenge_id in first_passes:
+            expected[user_id][0] += max_scores.get(challenge_id, 0)
+            expected[user_id][1] += 1
+
+        with transaction.atomic():
+            passed_added, passed_removed = self._sync_passed_tasks(first_passes, dry_run, batch_size)
+            created, changes = self._sync_leaderboard(expected, dry_run, batch_size)
+            profiles = self._sync_profiles(best_scores, dry_run, batch_size)
+            if not dry_run:
+                PassedTask.mark_backfilled()
+
+        for username, old, new in sorted(changes, key=lambda c: -abs(c[2][0] - c[1][0]))[:options['show']]:
+            self.stdout.write(f"  📊 {username:<24} {old[0]:>5} → {new[0]:<5} pts   "
+                              f"{old[1]:>3} → {new[1]:<3} tasks")
+        if len(changes) > options['show']:
+            self.stdout.write(f"  ... y {len(changes) - options['show']} más")
+
+        verb = 'cambiarían' if dry_run else 'actualizadas'
+        self.stdout.write(self.style.SUCCESS(
+            f"\n{'🔍 Dry run' if dry_run else '✨ Leaderboard reconstruido'} en "
+            f"{time.perf_counter() - started:.2f}s\n"
+            f"  Leaderboard: {len(changes)} entradas {verb}, {created} nuevas\n"
+            f"  PassedTask:  +{passed_added} / -{passed_removed}\n"
+            f"  UserProfile: {profiles} perfiles con score distinto"
+        ))
+
+    def _sync_passed_tasks(self, first_passes, dry_run, batch_size):
+        existing = {
+            (user_id, challenge_id): pk
+            for pk, user_id, challenge_id in PassedTask.objects.values_list('id', 'user_id', 'challenge_id')
+        }
+        missing = [key for key in first_passes if key not in existing]
+        stale = [pk for key, pk in existing.items() if key not in first_passes]
+
+        if not dry_run:
+            PassedTask.objects.bulk_create([
+                PassedTask(user_id=user_id, challenge_id=challenge_id,
+                           submission_id=first_passes[(user_id, challenge_id)]['first_id'],
+                           passed_at=first_passes[(user_id, challenge_id)]['first_at'])
+                for user_id, challenge_id in missing
+            ], batch_size=batch_size, ignore_conflicts=True)
+            for start in range(0, len(stale), batch_size):
+                PassedTask.objects.filter(id__in=stale[start:start + batch_size]).delete()
+
+        return len(missing), len(stale)
+
+    def _sync_leaderboard(self, expected, dry_run, batch_size):
+        def load_entries():
+            return {e.user_id: e for e in Leaderboard.objects.only('user_id', 'total_score', 'challenges_completed')}
+
+        usernames = dict(User.objects.values_list('id', 'username'))
+        entries = load_entries()
+
+        missing = [user_id for user_id in usernames if user_id not in entries]
+        if missing and not dry_run:
+            Leaderboard.objects.bulk_create([Leaderboard(user_id=user_id) for user_id in missing],
+                                            batch_size=batch_size, ignore_conflicts=True)
+            entries = load_entries()
+
+        changes, changed = [], []
+        for user_id, username in usernames.items():
+            new = tuple(expected.get(user_id, (0, 0)))
+            entry = entries.get(user_id)
+            old = (entry.total_score, entry.challenges_completed) if entry else (0, 0)
+            if old == new:
+                continue
+            changes.append((username, old, new))
+            if entry is not None:
+                entry.total_score, entry.challenges_completed = new
+                changed.append(entry)
+
+        if not dry_run:
+            # bulk_update no toca last_updated: se conserva el desempate original
+            Leaderboard.objects.bulk_update(changed, ['total_score', 'challenges_completed'],
+                                            batch_size=batch_size)
+
+        return len(missing), changes
+
+    def _sync_profiles(self, best_scores, dry_run, batch_size):
+        changed = []
+        for profile in UserProfile.objects.only('id', 'user_id', 'total_score'):
+            total = best_scores.get(profile.user_id, 0)
+            if profile.total_score != total:
+                profile.total_score = total
+                changed.append(profile)
+
+        if not dry_run:
+            UserProfile.objects.bulk_update(changed, ['total_score'], batch_size=batch_size)
+
+        return len(changed)
@@ -0,0 +1,40 @@
+"""
+Corrige la deriva de los contadores globales (ver grader/counters.py).
+
+Uso:
+    python manage.py reconcile_counters
+    python manage.py reconcile_counters --dry-run
+
+Necesario tras escrituras que no pasan por los signals: bulk_create, SQL
+directo, import_sqlite o cambios de passed desde el admin.
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from grader.counters import reconcile
+
+
+class Command(BaseCommand):
+    help = 'Recalcula usuarios, challenges activos, submissions y aprobadas con COUNT(*)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Muestra la deriva sin corregirla')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        actual, drift = reconcile(dry_run=options['dry_run'])
+
+        for name, value in actual.items():
+            if name in drift:
+                stored = drift[name][0]
+                self.stdout.write(f"  🔧 {name:<18} {'-' if stored is None else stored:>10} → {value}")
+            else:
+                self.stdout.write(f"  ✅ {name:<18} {value:>10}")
+
+        action = 'detectados' if options['dry_run'] else 'corregidos'
+        self.stdout.write(self.style.SUCCESS(
+            f"\n✨ {len(drift)} contadores {action} en {time.perf_counter() - started:.2f}s"
+        ))
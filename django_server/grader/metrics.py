@@ -0,0 +1,208 @@
+"""
+Métricas en formato de texto de Prometheus para /metrics (sin dependencias).
+
+Cada proceso acumula contadores e histogramas en memoria: registrar una
+observación es una actualización de dict bajo un lock que no hace I/O.
+
+Con varios workers (gunicorn, uWSGI) cada uno tiene sus propios valores y el
+scrape cae en uno cualquiera. Con METRICS_DIR configurado, un hilo de cada
+proceso vuelca su estado a METRICS_DIR/<pid>-<arranque>.json cada
+METRICS_FLUSH_INTERVAL segundos (escritura atómica con os.replace), y /metrics
+suma los ficheros de todos los procesos. Los ficheros de procesos muertos se
+siguen sumando para que los contadores no retrocedan: vaciar el directorio en
+cada despliegue, antes de arrancar los workers.
+"""
+
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+# nombre -> (tipo, ayuda, buckets)
+METRICS = {
+    'grader_http_request_duration_seconds': (
+        'histogram', 'Latencia de cada vista (url name), método y código de estado', LATENCY_BUCKETS),
+    'grader_http_request_db_queries': (
+        'histogram', 'Consultas SQL por request, por vista', QUERY_BUCKETS),
+    'grader_evaluator_duration_seconds': (
+        'histogram', 'execution_time devuelto por CodeEvaluator, por challenge_id', LATENCY_BUCKETS),
+    'grader_submissions_total': (
+        'counter', 'Submissions evaluadas por challenge_id y resultado (passed/rejected)', None),
+    'grader_submit_results_payload_bytes': (
+        'histogram', 'Tamaño del cuerpo de POST /api/submit-results', SIZE_BUCKETS),
+    'grader_auth_cache_total': (
+        'counter', 'Búsquedas de token en la caché de autenticación (hit/miss)', None),
+    'grader_evaluator_pool_wait_seconds': (
+        'histogram', 'Espera en cola del pool de evaluación de las vistas async', LATENCY_BUCKETS),
+    'grader_evaluator_pool_rejected_total': (
+        'counter', 'Submissions rechazadas con 503 por tener la cola del pool llena', None),
+}
+
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._values = {}  # (nombre, labels) -> float (counter) o [cuentas por bucket..., +Inf, sum]
+
+    def inc(self, name, labels=(), value=1):
+        key = (name, labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + value
+
+    def observe(self, name, value, labels=()):
+        buckets = METRICS[name][2]
+        key = (name, labels)
+        # Índice del primer bucket que contiene el valor (no acumulado; se acumula al exportar)
+        index = next((i for i, bound in enumerate(buckets) if value <= bound), len(buckets))
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                series = self._values[key] = [0] * (len(buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def snapshot(self):
+        with self._lock:
+            return [[name, list(labels), value if isinstance(value, (int, float)) else list(value)]
+                    for (name, labels), value in self._values.items()]
+
+
+registry = Registry()
+
+
+def inc(name, value=1, **labels):
+    registry.inc(name, tuple(sorted(labels.items())), value)
+
+
+def observe(name, value, **labels):
+    registry.observe(name, value, tuple(sorted(labels.items())))
+
+
+def observe_evaluation(challenge_id, execution_time, passed):
+    observe('grader_evaluator_duration_seconds', execution_time, challenge_id=challenge_id)
+    inc('grader_submissions_total', challenge_id=challenge_id, result='passed' if passed else 'rejected')
+
+
+# ==================== MULTIPROCESO ====================
+
+class _DirectoryWriter:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pid = None
+        self._path = None
+
+    def path(self):
+        return self._path if self._pid == os.getpid() else None
+
+    def ensure_started(self):
+        directory = settings.METRICS_DIR
+        if not directory or self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            os.makedirs(directory, exist_ok=True)
+            self._pid = os.getpid()
+            self._path = os.path.join(directory, f'{self._pid}-{int(time.time() * 1000)}.json')
+            threading.Thread(target=self._run, name='metrics-writer', daemon=True).start()
+
+    def write(self):
+        if self.path() is None:
+            return
+        tmp = f'{self._path}.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(registry.snapshot(), f)
+        os.replace(tmp, self._path)
+
+    def _run(self):
+        while True:
+            time.sleep(settings.METRICS_FLUSH_INTERVAL)
+            try:
+                self.write()
+            except OSError:
+                logger.exception("Could not write metrics to %s", settings.METRICS_DIR)
+
+
+writer = _DirectoryWriter()
+atexit.register(writer.write)
+
+
+def _collect():
+    """Series de este proceso más las de los demás procesos de METRICS_DIR."""
+    snapshots = [registry.snapshot()]
+    directory = settings.METRICS_DIR
+    if directory and os.path.isdir(directory):
+        own = writer.path()
+        for filename in os.listdir(directory):
+            path = os.path.join(directory, filename)
+            if not filename.endswith('.json') or path == own:
+                continue
+            try:
+                with open(path) as f:
+                    snapshots.append(json.load(f))
+            except (OSError, ValueError):
+                continue  # Fichero a medio escribir o borrado durante el scrape
+
+    merged = {}
+    for snapshot in snapshots:
+        for name, labels, value in snapshot:
+            if name not in METRICS:
+                continue
+            key = (name, tuple(tuple(pair) for pair in labels))
+            if isinstance(value, list):
+                current = merged.setdefault(key, [0] * len(value))
+                merged[key] = [a + b for a, b in zip(current, value)]
+            else:
+                merged[key] = merged.get(key, 0) + value
+    return merged
+
+
+# ==================== EXPOSICIÓN ====================
+
+def _escape(value):
+    return str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+
+
+def _labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in pairs) + '}'
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render():
+    """Texto en el formato de exposición 0.0.4 de Prometheus."""
+    by_name = {}
+    for (name, labels), value in sorted(_collect().items()):
+        by_name.setdefault(name, []).append((labels, value))
+
+    lines = []
+    for name, (kind, help_text, buckets) in METRICS.items():
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {kind}')
+        for labels, value in by_name.get(name, []):
+            if kind == 'counter':
+                lines.append(f'{name}{_labels(labels)} {_number(value)}')
+                continue
+            cumulative = 0
+            for bound, count in zip(list(buckets) + ['+Inf'], value[:-1]):
+                cumulative += count
+                le = bound if bound == '+Inf' else _number(bound)
+                lines.append(f'{name}_bucket{_labels(labels, [("le", le)])} {cumulative}')
+            lines.append(f'{name}_sum{_labels(labels)} {_number(value[-1])}')
+            lines.append(f'{name}_count{_labels(labels)} {cumulative}')
+    return '\n'.join(lines) + '\n'
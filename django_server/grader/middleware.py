@@ -0,0 +1,182 @@
+"""
+Middlewares de observabilidad.
+
+- QueryBudgetMiddleware: cuenta las consultas SQL y el tiempo de BD de cada
+  request, los devuelve en las cabeceras X-DB-Queries / X-DB-Time (ms) y avisa
+  en el log si la ruta supera su presupuesto (QUERY_BUDGETS). Con DEBUG el
+  aviso incluye las consultas más repetidas y de dónde salen.
+- MetricsMiddleware: latencia y consultas por vista para /metrics (ver
+  grader/metrics.py).
+
+Orden en MIDDLEWARE: MetricsMiddleware primero y QueryBudgetMiddleware justo
+después, para que el recuento incluya las consultas del resto de middlewares.
+Los dos sirven tanto a WSGI como a ASGI: con las vistas async (ASYNC_VIEWS)
+Django no tiene que pasar el request por un hilo para llamarlos.
+"""
+
+import logging
+import os
+import time
+import traceback
+from collections import Counter
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+PROJECT_DIR = str(settings.BASE_DIR)
+
+
+def route_name(request):
+    """url name de la ruta resuelta (o view_name si no tiene nombre)."""
+    match = getattr(request, 'resolver_match', None)
+    return (match.url_name or match.view_name) if match else 'unmatched'
+
+
+def budget_for(route):
+    return settings.QUERY_BUDGETS.get(route, settings.QUERY_BUDGET_DEFAULT)
+
+
+def _stack_sample():
+    # Solo los frames del proyecto (sin Django/DRF ni este middleware)
+    frames = [
+        frame for frame in traceback.extract_stack()[:-2]
+        if frame.filename.startswith(PROJECT_DIR) and 'site-packages' not in frame.filename
+        and not frame.filename.endswith(os.path.join('grader', 'middleware.py'))
+    ]
+    return ''.join(traceback.format_list(frames[-4:]))
+
+
+class QueryStats:
+    """execute_wrapper que cuenta consultas y tiempo (y con DEBUG guarda de dónde salen)."""
+
+    def __init__(self, sample_stacks=False):
+        self.queries = 0
+        self.seconds = 0.0
+        self.sample_stacks = sample_stacks
+        self.by_sql = Counter()
+        self.stacks = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - started
+            self.queries += 1
+            if self.sample_stacks:
+                self.by_sql[sql] += 1
+                if sql not in self.stacks:
+                    self.stacks[sql] = _stack_sample()
+
+    def report(self, top=3):
+        lines = []
+        for sql, count in self.by_sql.most_common(top):
+            lines.append(f'  {count}x {sql[:200]}\n{self.stacks.get(sql, "")}')
+        return '\n'.join(lines)
+
+
+_request_stats = ContextVar('grader_request_query_stats', default=None)
+
+
+def count_queries(execute, sql, params, many, context):
+    """execute_wrapper fijo de cada conexión: suma en el QueryStats del request en curso."""
+    stats = _request_stats.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    return stats(execute, sql, params, many, context)
+
+
+def install_query_counter(sender, connection, **kwargs):
+    # Signal connection_created (ver apps.py). El request en curso se busca en un
+    # ContextVar, que sync_to_async copia al hilo donde corre el ORM bajo ASGI:
+    # así no hace falta tocar execute_wrappers en cada request
+    if count_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.append(count_queries)
+
+
+class QueryBudgetMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+
+        stats = QueryStats(sample_stacks=settings.DEBUG)
+        token = _request_stats.set(stats)
+        try:
+            response = self.get_response(request)
+        finally:
+            _request_stats.reset(token)
+        return self._finish(request, response, stats)
+
+    async def __acall__(self, request):
+        stats = QueryStats(sample_stacks=settings.DEBUG)
+        token = _request_stats.set(stats)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _request_stats.reset(token)
+        return self._finish(request, response, stats)
+
+    def _finish(self, request, response, stats):
+        request.db_queries = stats.queries
+        response['X-DB-Queries'] = str(stats.queries)
+        response['X-DB-Time'] = f'{stats.seconds * 1000:.2f}'
+
+        route = route_name(request)
+        budget = budget_for(route)
+        if stats.queries > budget:
+            if settings.DEBUG:
+                logger.warning("%s %s: %d queries (budget %d for '%s'), %.1f ms in DB. Most repeated:\n%s",
+                               request.method, request.path, stats.queries, budget, route,
+                               stats.seconds * 1000, stats.report())
+            else:
+                logger.warning("%s %s: %d queries (budget %d for '%s')",
+                               request.method, request.path, stats.queries, budget, route)
+        return response
+
+
+class MetricsMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+
+        metrics.writer.ensure_started()
+        started = time.perf_counter()
+        response = self.get_response(request)
+        return self._finish(request, response, time.perf_counter() - started)
+
+    async def __acall__(self, request):
+        metrics.writer.ensure_started()
+        started = time.perf_counter()
+        response = await self.get_response(request)
+        return self._finish(request, response, time.perf_counter() - started)
+
+    def _finish(self, request, response, elapsed):
+        view = route_name(request)
+        metrics.observe('grader_http_request_duration_seconds', elapsed,
+                        view=view, method=request.method, status=response.status_code)
+        # Lo cuenta QueryBudgetMiddleware
+        if hasattr(request, 'db_queries'):
+            metrics.observe('grader_http_request_db_queries', request.db_queries, view=view)
+        return response
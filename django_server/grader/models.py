@@ -165,9 +165,14 @@ class Leaderboard(models.Model):
     last_updated = models.DateTimeField(auto_now=True)
 
     class Meta:
-        ordering = ['-total_score', '-challenges_completed', 'last_updated']
+        ordering = ['-total_score', '-challenges_completed', 'last_updated', 'user']
         verbose_name = 'Leaderboard Entry'
         verbose_name_plural = 'Leaderboard'
+        indexes = [
+            # El orden del ranking, con user como desempate: páginas keyset (ver grader/leaderboard.py)
+            models.Index(fields=['-total_score', '-challenges_completed', 'last_updated', 'user'],
+                         name='leaderboard_rank_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user.username}: {self.total_score} points, {self.challenges_completed} completed"
@@ -185,3 +190,146 @@ class Leaderboard(models.Model):
 def create_user_leaderboard(sender, instance, created, **kwargs):
     if created:
         Leaderboard.objects.get_or_create(user=instance)
+
+
+class PassedTask(models.Model):
+    """
+    Una fila por cada (usuario, challenge) aprobado.
+
+    La restricción UNIQUE decide cuál es la primera submission aceptada: con
+    INSERT ... ON CONFLICT DO NOTHING solo una de varias aceptadas en paralelo
+    inserta la fila, y solo esa suma puntos al leaderboard.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='passed_tasks')
+    challenge = models.ForeignKey(Challenge, on_delete=models.CASCADE, related_name='passed_tasks')
+    submission = models.ForeignKey(
+        Submission, on_delete=models.SET_NULL, null=True, blank=True, related_name='+'
+    )
+    passed_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        verbose_name = 'Passed Task'
+        verbose_name_plural = 'Passed Tasks'
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'challenge'], name='unique_passed_task'),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username} passed Challenge {self.challenge_id}"
+
+    # Counter que marca que PassedTask ya se rellenó desde las submissions
+    # aprobadas anteriores a este modelo (ver backfill() y apps.py)
+    BACKFILL_COUNTER = 'passed_task_backfill'
+    _backfilled = False  # Caché por proceso: una vez hecho, no se vuelve a mirar
+
+    @classmethod
+    def record(cls, user, challenge, submission=None):
+        """
+        Registra el aprobado sin locks. Devuelve True solo si es el primero
+        para este (usuario, challenge).
+
+        Mientras el backfill no conste como hecho (BD existente que aún no
+        pasó por migrate), antes se rellena este (usuario, challenge) con
+        sus aprobadas anteriores: si no, un reenvío de una task ya aprobada
+        sumaría sus puntos otra vez.
+        """
+        from django.db import connection
+
+        lazy = submission is not None and not cls.is_backfilled()
+        if lazy:
+            cls.backfill(user_id=user.pk, challenge_id=challenge.pk, before=submission.pk)
+
+        meta = cls._meta
+        sql = (
+            f'INSERT INTO {meta.db_table} (user_id, challenge_id, submission_id, passed_at) '
+            f'VALUES (%s, %s, %s, %s) '
+            f'ON CONFLICT (user_id, challenge_id) DO NOTHING'
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [user.pk, challenge.pk, submission.pk if submission else None, timezone.now()])
+            if cursor.rowcount == 1:
+                return True
+        # El backfill de un request paralelo puede haber insertado la fila de
+        # esta misma submission: sigue siendo la primera
+        return lazy and cls.objects.filter(user=user, challenge=challenge, submission=submission).exists()
+
+    @classmethod
+    def backfill(cls, user_id=None, challenge_id=None, before=None):
+        """
+        INSERT ... SELECT de la primera aprobada de cada (usuario, challenge)
+        sin fila, opcionalmente solo para un usuario/challenge y submissions
+        con id < before. Idempotente; devuelve las filas insertadas.
+        """
+        from django.db import connection
+
+        where, params = ['passed = %s'], [True]
+        for column, value in (('user_id', user_id), ('challenge_id', challenge_id)):
+            if value is not None:
+                where.append(f'{column} = %s')
+                params.append(value)
+        if before is not None:
+            where.append('id < %s')
+            params.append(before)
+
+        sql = (
+            f'INSERT INTO {cls._meta.db_table} (user_id, challenge_id, submission_id, passed_at) '
+            f'SELECT user_id, challenge_id, MIN(id), MIN(submitted_at) FROM {Submission._meta.db_table} '
+            f'WHERE {" AND ".join(where)} GROUP BY user_id, challenge_id '
+            f'ON CONFLICT (user_id, challenge_id) DO NOTHING'
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return max(cursor.rowcount, 0)
+
+    @classmethod
+    def is_backfilled(cls):
+        if not cls._backfilled:
+            cls._backfilled = Counter.value_of(cls.BACKFILL_COUNTER) > 0
+        return cls._backfilled
+
+    @classmethod
+    def mark_backfilled(cls):
+        Counter.objects.update_or_create(name=cls.BACKFILL_COUNTER, defaults={'value': 1})
+        cls._backfilled = True
+
+
+def backfill_passed_tasks(sender, using='default', **kwargs):
+    """post_migrate: rellena PassedTask una sola vez en BDs de antes del modelo."""
+    if using != 'default' or PassedTask.is_backfilled():
+        return
+    from django.db import transaction
+
+    with transaction.atomic():
+        PassedTask.backfill()
+        PassedTask.mark_backfilled()
+
+
+class Counter(models.Model):
+    """
+    Contadores globales con nombre (p. ej. 'catalog_version').
+    Se incrementan en SQL con F() para que varios procesos no pisen el valor.
+    """
+    name = models.CharField(max_length=50, primary_key=True)
+    value = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Counter'
+        verbose_name_plural = 'Counters'
+
+    def __str__(self):
+        return f"{self.name} = {self.value}"
+
+    @classmethod
+    def value_of(cls, name, default=0):
+        value = cls.objects.filter(name=name).values_list('value', flat=True).first()
+        return default if value is None else value
+
+    @classmethod
+    def bump(cls, name, delta=1):
+        """Suma delta al contador (creándolo si no existe) y devuelve el nuevo valor."""
+        increment = {'value': models.F('value') + delta, 'updated_at': timezone.now()}
+        if not cls.objects.filter(name=name).update(**increment):
+            cls.objects.bulk_create([cls(name=name)], ignore_conflicts=True)
+            cls.objects.filter(name=name).update(**increment)
+        return cls.value_of(name)
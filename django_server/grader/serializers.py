@@ -64,7 +64,12 @@ class ChallengeSerializer(serializers.ModelSerializer):
             'best_score', 'completed', 'is_active', 'completion_rate'
         ]
 
+    # Las vistas pueden pasar en el contexto los datos ya agregados
+    # (ver ChallengeStatsMixin); si no, se consulta por challenge.
     def get_best_score(self, obj):
+        user_stats = self.context.get('user_stats')
+        if user_stats is not None:
+            return user_stats.get(obj.id, (0, False))[0]
         user = self.context.get('request').user
         if user and user.is_authenticated:
             best = Submission.objects.filter(
@@ -75,6 +80,9 @@ class ChallengeSerializer(serializers.ModelSerializer):
         return 0
 
     def get_completed(self, obj):
+        user_stats = self.context.get('user_stats')
+        if user_stats is not None:
+            return user_stats.get(obj.id, (0, False))[1]
         user = self.context.get('request').user
         if user and user.is_authenticated:
             return Submission.objects.filter(
@@ -85,6 +93,10 @@ class ChallengeSerializer(serializers.ModelSerializer):
         return False
 
     def get_completion_rate(self, obj):
+        passers = self.context.get('passers')
+        if passers is not None:
+            total_users = self.context['total_users']
+            return round(passers.get(obj.id, 0) / total_users * 100, 2) if total_users else 0
         return round(obj.get_completion_rate(), 2)
 
 
@@ -103,6 +115,9 @@ class SubmissionSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'submitted_at', 'username', 'challenge_name']
 
     def get_is_best_score(self, obj):
+        best_scores = self.context.get('best_scores')
+        if best_scores is not None:
+            return obj.score == best_scores.get(obj.challenge_id)
         return obj.is_best_score()
 
 
@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.urls import path
 from .views import (
     HomeView, APIIndexView,
@@ -6,9 +7,18 @@ from .views import (
     SubmitCodeView, SubmitResultsView, SubmissionListView, SubmissionDetailView,
     LeaderboardView, ProgressView, StatsView,
     DownloadClientView,
-    HealthCheckView
+    HealthCheckView, metrics_view
 )
 
+# Con ASYNC_VIEWS (servidor ASGI) estas rutas usan las vistas de grader/async_views.py
+if settings.ASYNC_VIEWS:
+    from .async_views import (
+        AsyncSubmitResultsView as SubmitResultsView,
+        AsyncLeaderboardView as LeaderboardView,
+        AsyncProgressView as ProgressView,
+        AsyncHealthCheckView as HealthCheckView,
+    )
+
 urlpatterns = [
     # Home (raíz del sitio)
     path('', HomeView.as_view(), name='home'),
@@ -41,4 +51,7 @@ urlpatterns = [
 
     # Health check
     path('api/health', HealthCheckView.as_view(), name='health'),
+
+    # Métricas para Prometheus
+    path('metrics', metrics_view, name='metrics'),
 ]
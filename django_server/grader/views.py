@@ -1,18 +1,27 @@
+import json
+
 from rest_framework import status, generics, views
 from rest_framework.response import Response
 from rest_framework.authtoken.models import Token
 from rest_framework.permissions import IsAuthenticated, AllowAny
+from django.conf import settings
 from django.contrib.auth import authenticate
 from django.contrib.auth.models import User
-from django.db.models import Max, Count, Q, Sum
+from django.db import transaction
+from django.http import Http404, HttpResponse
+from django.db.models import F, Max, Count, Q, Sum
 from django.shortcuts import render
-from .models import Challenge, Submission, UserProfile
+from django.utils import timezone
+from .models import Challenge, PassedTask, Submission, UserProfile
 from .serializers import (
     UserSerializer, RegisterSerializer, LoginSerializer,
     ChallengeSerializer, SubmissionSerializer, SubmitCodeSerializer,
     SubmitResultsSerializer, LeaderboardSerializer, ProgressSerializer
 )
+from . import health, leaderboard, metrics
+from .counters import get_counters
 from .evaluators import CodeEvaluator
+from .writebehind import submission_buffer
 
 
 # ==================== HOME / INDEX ====================
@@ -22,9 +31,10 @@ class HomeView(views.APIView):
     permission_classes = [AllowAny]
 
     def get(self, request):
-        total_users = User.objects.count()
-        total_challenges = Challenge.objects.filter(is_active=True).count()
-        total_submissions = Submission.objects.count()
+        counters = get_counters()
+        total_users = counters['users']
+        total_challenges = counters['active_challenges']
+        total_submissions = counters['submissions']
 
         context = {
             'stats': {
@@ -42,9 +52,10 @@ class APIIndexView(views.APIView):
 
     def get(self, request):
         """Main API view"""
-        total_users = User.objects.count()
-        total_challenges = Challenge.objects.filter(is_active=True).count()
-        total_submissions = Submission.objects.count()
+        counters = get_counters()
+        total_users = counters['users']
+        total_challenges = counters['active_challenges']
+        total_submissions = counters['submissions']
 
         # If HTML is requested (browser), render template
         if 'text/html' in request.headers.get('Accept', ''):
@@ -175,7 +186,46 @@ class ProfileView(views.APIView):
 
 # ==================== CHALLENGES ====================
 
-class ChallengeListView(generics.ListAPIView):
+class ChallengeStatsMixin:
+    """
+    Precalcula lo que ChallengeSerializer consultaba por cada challenge
+    (mejor score, completado y % de usuarios que lo aprobaron): dos consultas
+    agrupadas en total en lugar de cuatro por challenge.
+    """
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        user = self.request.user
+        user_stats = {}
+        if user.is_authenticated:
+            rows = (Submission.objects.filter(user=user).order_by().values('challenge_id')
+                    .annotate(best=Max('score'), passes=Count('id', filter=Q(passed=True))))
+            user_stats = {row['challenge_id']: (row['best'] or 0, row['passes'] > 0) for row in rows}
+        context['user_stats'] = user_stats
+        context['passers'] = dict(PassedTask.objects.order_by().values('challenge_id')
+                                  .annotate(n=Count('id')).values_list('challenge_id', 'n'))
+        context['total_users'] = get_counters()['users']
+        return context
+
+
+_catalog = (None, {})  # (catalog_version, {id: Challenge activo})
+
+
+def active_challenges(version):
+    """
+    Challenges activos por id, reutilizados en el proceso mientras no cambie
+    catalog_version (load_challenges o cualquier guardado de un Challenge la
+    suben; get_counters() la lee con como mucho COUNTERS_CACHE_TTL de retraso).
+    """
+    global _catalog
+    cached_version, challenges = _catalog
+    if cached_version != version:
+        challenges = {challenge.id: challenge for challenge in Challenge.objects.filter(is_active=True)}
+        _catalog = (version, challenges)
+    return challenges
+
+
+class ChallengeListView(ChallengeStatsMixin, generics.ListAPIView):
     permission_classes = [IsAuthenticated]
     serializer_class = ChallengeSerializer
 
@@ -183,20 +233,26 @@ class ChallengeListView(generics.ListAPIView):
         return Challenge.objects.filter(is_active=True)
 
     def list(self, request, *args, **kwargs):
-        queryset = self.get_queryset()
-        serializer = self.get_serializer(queryset, many=True)
-        return Response({'challenges': serializer.data})
+        version = get_counters()['catalog_version']
+        challenges = list(active_challenges(version).values())  # Challenge.Meta.ordering: por id
+        serializer = self.get_serializer(challenges, many=True)
+        # Los clientes detectan un catálogo nuevo comparando la versión
+        return Response({'catalog_version': version, 'challenges': serializer.data},
+                        headers={'X-Catalog-Version': str(version)})
 
 
-class ChallengeDetailView(generics.RetrieveAPIView):
+class ChallengeDetailView(ChallengeStatsMixin, generics.RetrieveAPIView):
     permission_classes = [IsAuthenticated]
     serializer_class = ChallengeSerializer
     queryset = Challenge.objects.filter(is_active=True)
 
     def retrieve(self, request, *args, **kwargs):
-        instance = self.get_object()
+        version = get_counters()['catalog_version']
+        instance = active_challenges(version).get(kwargs[self.lookup_field])
+        if instance is None:
+            raise Http404
         serializer = self.get_serializer(instance)
-        return Response({'challenge': serializer.data})
+        return Response({'challenge': serializer.data}, headers={'X-Catalog-Version': str(version)})
 
 
 # ==================== SUBMISSIONS ====================
@@ -223,17 +279,19 @@ class SubmitCodeView(views.APIView):
 
         # Evaluar el código
         score, passed, feedback, execution_time = CodeEvaluator.evaluate(challenge_id, code)
+        metrics.observe_evaluation(challenge_id, execution_time, passed)
 
-        # Guardar la submission
-        submission = Submission.objects.create(
-            user=request.user,
-            challenge=challenge,
-            code=code,
-            score=score,
-            passed=passed,
-            feedback=feedback,
-            execution_time=execution_time
-        )
+        # Guardar la submission (INSERT + actualización del perfil en una transacción)
+        with transaction.atomic():
+            submission = Submission.objects.create(
+                user=request.user,
+                challenge=challenge,
+                code=code,
+                score=score,
+                passed=passed,
+                feedback=feedback,
+                execution_time=execution_time
+            )
 
         return Response({
             'submission_id': submission.id,
@@ -253,6 +311,7 @@ class SubmitResultsView(views.APIView):
     permission_classes = [IsAuthenticated]
 
     def post(self, request):
+        metrics.observe('grader_submit_results_payload_bytes', int(request.META.get('CONTENT_LENGTH') or 0))
         serializer = SubmitResultsSerializer(data=request.data)
 
         if not serializer.is_valid():
@@ -269,88 +328,90 @@ class SubmitResultsView(views.APIView):
                 status=status.HTTP_404_NOT_FOUND
             )
 
-        # Evaluar los resultados (sin ejecutar código)
-        # Challenge 351-355 son tasks individuales de Challenge 35
-        # Pasar max_score dinámicamente desde el challenge
-        if challenge_id == 351:
-            score, passed, feedback, execution_time = CodeEvaluator.evaluate_challenge_35_task1(results, challenge.max_score)
-        elif challenge_id == 352:
-            score, passed, feedback, execution_time = CodeEvaluator.evaluate_challenge_35_task2(results, challenge.max_score)
-        elif challenge_id == 353:
-            score, passed, feedback, execution_time = CodeEvaluator.evaluate_challenge_35_task3(results, challenge.max_score)
-        elif challenge_id == 354:
-            score, passed, feedback, execution_time = CodeEvaluator.evaluate_challenge_35_task4(results, challenge.max_score)
-        elif challenge_id == 355:
-            score, passed, feedback, execution_time = CodeEvaluator.evaluate_challenge_35_task5(results, challenge.max_score)
-        elif challenge_id == 361:
-            score, passed, feedback, execution_time = CodeEvaluator.evaluate_challenge_36_task1(results, challenge.max_score)
-        elif challenge_id == 362:
-            score, passed, feedback, execution_time = CodeEvaluator.evaluate_challenge_36_task2(results, challenge.max_score)
-        elif challenge_id == 363:
-            score, passed, feedback, execution_time = CodeEvaluator.evaluate_challenge_36_task3(results, challenge.max_score)
-        # --- Challenge 37 individual tasks (lightweight results submissions) ---
-        elif challenge_id == 371:
-            score, passed, feedback, execution_time = CodeEvaluator.evaluate_challenge_37_task371(results, challenge.max_score)
-        elif challenge_id == 372:
-            score, passed, feedback, execution_time = CodeEvaluator.evaluate_challenge_37_task372(results, challenge.max_score)
-        elif challenge_id == 373:
-            score, passed, feedback, execution_time = CodeEvaluator.evaluate_challenge_37_task373(results, challenge.max_score)
-        elif challenge_id == 374:
-            score, passed, feedback, execution_time = CodeEvaluator.evaluate_challenge_37_task374(results, challenge.max_score)
-        elif challenge_id == 375:
-            score, passed, feedback, execution_time = CodeEvaluator.evaluate_challenge_37_task375(results, challenge.max_score)
-        elif challenge_id == 376:
-            score, passed, feedback, execution_time = CodeEvaluator.evaluate_challenge_37_task376(results, challenge.max_score)
-        elif challenge_id == 377:
-            score, passed, feedback, execution_time = CodeEvaluator.evaluate_challenge_37_task377(results, challenge.max_score)
-        elif challenge_id == 378:
-            score, passed, feedback, execution_time = CodeEvaluator.evaluate_challenge_37_task378(results, challenge.max_score)
-        elif challenge_id == 35:
-            score, passed, feedback, execution_time = CodeEvaluator.evaluate_challenge_35_results(results)
-        else:
+        # Evaluar los resultados (sin ejecutar código). Las tasks 351-378 reciben
+        # el max_score del challenge; el 35 completo usa su propio baremo
+        evaluation = CodeEvaluator.evaluate_results(challenge_id, results, challenge.max_score)
+        if evaluation is None:
             return Response(
                 {'error': 'This challenge does not support results-only submission'},
                 status=status.HTTP_400_BAD_REQUEST
             )
+        score, passed, feedback, execution_time = evaluation
+
+        metrics.observe_evaluation(challenge_id, execution_time, passed)
+
+        submission = save_results_submission(
+            request.user, challenge, results_code(results), score, passed, feedback, execution_time
+        )
+        return Response(results_response(submission, challenge, evaluation), status=status.HTTP_200_OK)
 
-        # Guardar la submission (con código vacío o JSON de resultados)
-        import json
+
+def results_code(results):
+    """Lo que se guarda en Submission.code para una submission de resultados."""
+    return f"# Results submission\n{json.dumps(results, indent=2)}"
+
+
+def save_results_submission(user, challenge, code, score, passed, feedback, execution_time):
+    """
+    Guarda una submission de resultados ya evaluada y, si es el primer aprobado
+    de la task, suma sus puntos al leaderboard. Devuelve la Submission, o None
+    si quedó en el write-behind. Compartido con la vista async.
+    """
+    # Intento rechazado sin puntos: solo historial, se guarda en diferido
+    if settings.SUBMISSION_WRITE_BEHIND and not passed and score == 0:
+        submission_buffer.add(Submission(
+            user=user,
+            challenge=challenge,
+            code=code,
+            score=score,
+            passed=passed,
+            feedback=feedback,
+            execution_time=execution_time
+        ))
+        return None
+
+    # Escrituras en una sola transacción corta (la evaluación ya se hizo fuera).
+    # El INSERT va primero para que SQLite tome el lock de escritura al
+    # principio y respete el busy timeout en lugar de fallar al promocionar.
+    with transaction.atomic():
         submission = Submission.objects.create(
-            user=request.user,
+            user=user,
             challenge=challenge,
-            code=f"# Results submission\n{json.dumps(results, indent=2)}",
+            code=code,
             score=score,
             passed=passed,
             feedback=feedback,
             execution_time=execution_time
         )
 
-        # Actualizar leaderboard si la task fue aceptada
-        if passed:
+        # Actualizar leaderboard si la task fue aceptada por primera vez.
+        # PassedTask.record() es un INSERT ... ON CONFLICT DO NOTHING sobre
+        # (user, challenge): con N aceptadas en paralelo solo una lo inserta,
+        # y la suma se hace en SQL con F() (sin leer-modificar-escribir).
+        if passed and PassedTask.record(user, challenge, submission):
             from .models import Leaderboard
-            leaderboard, created = Leaderboard.objects.get_or_create(user=request.user)
+            increment = {
+                'total_score': F('total_score') + challenge.max_score,  # Siempre 20 puntos por task
+                'challenges_completed': F('challenges_completed') + 1,
+                'last_updated': timezone.now(),
+            }
+            if not Leaderboard.objects.filter(user=user).update(**increment):
+                Leaderboard.objects.get_or_create(user=user)
+                Leaderboard.objects.filter(user=user).update(**increment)
 
-            # Verificar si es la primera vez que completa este challenge
-            previous_passed = Submission.objects.filter(
-                user=request.user,
-                challenge=challenge,
-                passed=True
-            ).exclude(id=submission.id).exists()
+    return submission
 
-            # Si es la primera vez que pasa este challenge, sumar puntos y contar el challenge
-            if not previous_passed:
-                leaderboard.total_score += challenge.max_score  # Siempre 20 puntos por task
-                leaderboard.challenges_completed += 1
-                leaderboard.save()
 
-        return Response({
-            'submission_id': submission.id,
-            'score': score,
-            'max_score': challenge.max_score,
-            'passed': passed,
-            'feedback': feedback,
-            'execution_time': round(execution_time, 3)
-        }, status=status.HTTP_200_OK)
+def results_response(submission, challenge, evaluation):
+    score, passed, feedback, execution_time = evaluation
+    return {
+        'submission_id': submission.id if submission else None,
+        'score': score,
+        'max_score': challenge.max_score,
+        'passed': passed,
+        'feedback': feedback,
+        'execution_time': round(execution_time, 3)
+    }
 
 
 class SubmissionListView(generics.ListAPIView):
@@ -358,7 +419,7 @@ class SubmissionListView(generics.ListAPIView):
     serializer_class = SubmissionSerializer
 
     def get_queryset(self):
-        queryset = Submission.objects.filter(user=self.request.user)
+        queryset = Submission.objects.filter(user=self.request.user).select_related('user', 'challenge')
 
         challenge_id = self.request.query_params.get('challenge_id')
         if challenge_id:
@@ -366,6 +427,15 @@ class SubmissionListView(generics.ListAPIView):
 
         return queryset
 
+    def get_serializer_context(self):
+        # Mejor score por challenge en una consulta (is_best_score hacía una por fila)
+        context = super().get_serializer_context()
+        context['best_scores'] = dict(
+            Submission.objects.filter(user=self.request.user).order_by()
+            .values('challenge_id').annotate(best=Max('score')).values_list('challenge_id', 'best')
+        )
+        return context
+
     def list(self, request, *args, **kwargs):
         queryset = self.get_queryset()
         serializer = self.get_serializer(queryset, many=True)
@@ -395,138 +465,66 @@ class LeaderboardView(views.APIView):
     permission_classes = [AllowAny]
 
     def get(self, request):
-        from .models import Leaderboard
-
-        limit = int(request.query_params.get('limit', 50))
-
-        # Obtener leaderboard ordenado
-        leaderboard_entries = Leaderboard.objects.select_related('user').order_by(
-            '-total_score', '-challenges_completed', 'last_updated'
-        )[:limit]
-
-        # Compute challenge roots (e.g., 351 -> 35) from active challenges to build columns
-        active_challenge_ids = list(Challenge.objects.filter(is_active=True).values_list('id', flat=True))
-        challenge_roots_set = set()
-        for cid in active_challenge_ids:
-            try:
-                challenge_roots_set.add(int(cid) // 10)
-            except Exception:
-                continue
-        challenge_roots = sorted(challenge_roots_set)
-
-        # Build mapping root -> ordered list of task ids for that root (used to render dots)
-        task_ids_per_root = {}
-        for root in challenge_roots:
-            ids = sorted([int(cid) for cid in active_challenge_ids if int(cid) // 10 == root])
-            task_ids_per_root[root] = ids
-
-        leaderboard_data = []
-        for idx, entry in enumerate(leaderboard_entries, start=1):
-            # Gather passed tasks for this user grouped by challenge root (e.g., 351->35)
-            passed_task_ids_qs = Submission.objects.filter(user=entry.user, passed=True).values_list('challenge_id', flat=True).distinct()
-            passed_task_ids = set(int(x) for x in passed_task_ids_qs)
-
-            passed_by_challenge = {}
-            for cid in passed_task_ids:
-                try:
-                    root = int(cid) // 10
-                except Exception:
-                    root = cid
-                passed_by_challenge.setdefault(root, []).append(int(cid))
-
-            # Sort the lists for consistency
-            for k in passed_by_challenge:
-                passed_by_challenge[k].sort()
-
-            # Create entry dict and also expose per-root lists for template convenience
-            entry_dict = {
-                'rank': idx,
-                'username': entry.user.username,
-                'total_score': entry.total_score,
-                'challenges_completed': entry.challenges_completed,
-                'last_updated': entry.last_updated,
-                'passed_tasks_by_challenge': passed_by_challenge,
-            }
-
-            for root in challenge_roots:
-                entry_dict[f'passed_root_{root}'] = passed_by_challenge.get(root, [])
-                # completed flags aligned with task_ids_per_root[root]
-                flags = [tid in passed_task_ids for tid in task_ids_per_root.get(root, [])]
-                entry_dict[f'completed_flags_{root}'] = flags
-
-            # Also expose an ordered list of (root, tasks) and (root, flags) pairs to simplify template rendering
-            entry_dict['passed_roots_pairs'] = [(root, passed_by_challenge.get(root, [])) for root in challenge_roots]
-            entry_dict['completed_roots_pairs'] = [(root, entry_dict.get(f'completed_flags_{root}', [])) for root in challenge_roots]
-
-            leaderboard_data.append(entry_dict)
-
-        # Si el usuario está autenticado, buscar su posición
-        user_position = None
-        if request.user.is_authenticated:
-            try:
-                user_entry = Leaderboard.objects.get(user=request.user)
-                user_position = user_entry.get_rank()
-            except Leaderboard.DoesNotExist:
-                user_position = None
+        # ?limit=N (top), ?around=me&radius=R o ?cursor=... (ver grader/leaderboard.py)
+        try:
+            page = leaderboard.window(request.query_params, request.user)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
         # Si se solicita HTML (navegador), renderizar template
         if 'text/html' in request.headers.get('Accept', ''):
             # Compute some page-level stats
-            total_participants = Leaderboard.objects.count()
             total_challenges = Challenge.objects.filter(is_active=True).count()
             agg = Challenge.objects.filter(is_active=True).aggregate(total=Sum('max_score'))
             max_points = agg.get('total') or 0
 
             context = {
-                'leaderboard': leaderboard_data,
-                'user_position': user_position,
-                'total_users': total_participants,
-                'challenge_roots': challenge_roots,
+                **page,
+                'page_query': leaderboard.page_query(request.query_params),
                 'total_challenges': total_challenges,
                 'max_points': max_points,
             }
             return render(request, 'leaderboard.html', context)
 
         # Si se solicita JSON (API), retornar JSON
-        return Response({
-            'leaderboard': leaderboard_data,
-            'user_position': user_position,
-            'total_users': Leaderboard.objects.count(),
-            'challenge_roots': challenge_roots,
-        })
+        return Response(page)
 
 
 class ProgressView(views.APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        from .models import Leaderboard
+        return Response(progress_payload(request.user))
 
-        user = request.user
 
-        # Obtener o crear entrada de leaderboard
-        leaderboard, created = Leaderboard.objects.get_or_create(user=user)
+def progress_payload(user):
+    """Respuesta de /api/progress; compartida con la vista async."""
+    from .models import Leaderboard
 
-        total_challenges = Challenge.objects.filter(is_active=True).count()
-        total_submissions = Submission.objects.filter(user=user).count()
-        rank = leaderboard.get_rank()
+    # Obtener o crear entrada de leaderboard
+    leaderboard, created = Leaderboard.objects.get_or_create(user=user)
 
-        return Response({
-            'total_score': leaderboard.total_score,
-            'challenges_completed': leaderboard.challenges_completed,
-            'total_challenges': total_challenges,
-            'total_submissions': total_submissions,
-            'rank': rank
-        })
+    total_challenges = Challenge.objects.filter(is_active=True).count()
+    total_submissions = Submission.objects.filter(user=user).count()
+    rank = leaderboard.get_rank()
+
+    return {
+        'total_score': leaderboard.total_score,
+        'challenges_completed': leaderboard.challenges_completed,
+        'total_challenges': total_challenges,
+        'total_submissions': total_submissions,
+        'rank': rank
+    }
 
 
 class StatsView(views.APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        total_users = User.objects.count()
-        total_challenges = Challenge.objects.filter(is_active=True).count()
-        total_submissions = Submission.objects.count()
+        counters = get_counters()
+        total_users = counters['users']
+        total_challenges = counters['active_challenges']
+        total_submissions = counters['submissions']
 
         return Response({
             'total_users': total_users,
@@ -586,10 +584,26 @@ class DownloadClientView(views.APIView):
 # ==================== HEALTH CHECK ====================
 
 class HealthCheckView(views.APIView):
+    """
+    GET /api/health          -> liveness: no toca la BD
+    GET /api/health?ready=1  -> readiness: 503 hasta completar el warm-up
+    GET /api/health?deep=1   -> latencias de BD, lock de escritura, colas y cachés
+    """
     permission_classes = [AllowAny]
+    authentication_classes = []  # Sin lookup de token: los probes no deben tocar la BD
 
     def get(self, request):
-        return Response({
-            'status': 'ok',
-            'message': 'API is running'
-        }, status=status.HTTP_200_OK)
+        payload, code = health.respond(deep=request.query_params.get('deep') == '1',
+                                       ready=request.query_params.get('ready') == '1')
+        return Response(payload, status=code)
+
+
+def metrics_view(request):
+    """GET /metrics: formato de texto de Prometheus (ver grader/metrics.py)."""
+    if settings.METRICS_TOKEN:
+        if request.headers.get('Authorization') != f'Bearer {settings.METRICS_TOKEN}':
+            return HttpResponse(status=401)
+    elif not settings.METRICS_PUBLIC:
+        # Sin token configurado, abierto solo si se pide explícitamente
+        return HttpResponse(status=403)
+    return HttpResponse(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,125 @@
+"""
+Write-behind de las submissions rechazadas.
+
+Con SUBMISSION_WRITE_BEHIND=True, SubmitResultsView no inserta en el request
+las submissions rechazadas con score 0 (solo son historial: no cambian el
+leaderboard ni el mejor score del perfil). Se acumulan en memoria y un hilo
+las inserta con un único bulk_create cada SUBMISSION_FLUSH_INTERVAL_MS, o
+antes si hay SUBMISSION_FLUSH_ROWS pendientes. Así una tormenta de intentos
+fallidos toma el lock de escritura una vez por lote y no una vez por request.
+
+El buffer está acotado a SUBMISSION_BUFFER_MAX_ROWS: si se llena, el request
+que lo encuentra lleno vacía el buffer él mismo (backpressure). Al salir del
+proceso se vacía lo pendiente (atexit). Un kill -9 pierde como mucho un
+intervalo de intentos rechazados.
+"""
+
+import atexit
+import logging
+import os
+import threading
+
+from django.conf import settings
+from django.db import transaction
+
+from .counters import increment
+
+logger = logging.getLogger(__name__)
+
+
+class SubmissionBuffer:
+    def __init__(self, flush_interval_ms=250, flush_rows=200, max_rows=5000):
+        self.flush_interval = flush_interval_ms / 1000
+        self.flush_rows = flush_rows
+        self.max_rows = max_rows
+
+        self._rows = []
+        self._lock = threading.Lock()          # Protege _rows
+        self._flush_lock = threading.Lock()    # Un solo bulk_create a la vez
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+        self._pid = None
+
+    def add(self, submission):
+        """Encola una Submission sin guardar (sus campos ya rellenos)."""
+        self._ensure_thread()
+
+        with self._lock:
+            self._rows.append(submission)
+            pending = len(self._rows)
+
+        if pending >= self.max_rows:
+            self.flush()
+        elif pending >= self.flush_rows:
+            self._wakeup.set()
+
+    def flush(self):
+        """Inserta todo lo pendiente. Devuelve el número de filas escritas."""
+        from .models import Submission
+
+        with self._flush_lock:
+            with self._lock:
+                rows, self._rows = self._rows, []
+            if not rows:
+                return 0
+
+            try:
+                with transaction.atomic():
+                    Submission.objects.bulk_create(rows, batch_size=500)
+                    increment(submissions=len(rows))
+            except Exception:
+                # Devolver las filas al buffer (sin pasar del límite) y reintentar en el siguiente ciclo
+                with self._lock:
+                    retry = rows + self._rows
+                    dropped = len(retry) - self.max_rows
+                    self._rows = retry[-self.max_rows:]
+                logger.exception("Write-behind flush of %d submissions failed", len(rows))
+                if dropped > 0:
+                    logger.error("Write-behind buffer full, dropped %d rejected submissions", dropped)
+                return 0
+
+            return len(rows)
+
+    def pending(self):
+        with self._lock:
+            return len(self._rows)
+
+    def close(self):
+        self._stopped.set()
+        self._wakeup.set()
+        if self._thread is not None and self._pid == os.getpid():
+            self._thread.join(timeout=5)
+        self.flush()
+
+    def _ensure_thread(self):
+        # Tras un fork (gunicorn --preload) el hilo del padre no existe en el hijo
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._stopped.clear()
+            self._thread = threading.Thread(target=self._run, name='submission-write-behind', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        from django.db import connection
+
+        try:
+            while not self._stopped.is_set():
+                self._wakeup.wait(self.flush_interval)
+                self._wakeup.clear()
+                self.flush()
+        finally:
+            connection.close()
+
+
+submission_buffer = SubmissionBuffer(
+    flush_interval_ms=settings.SUBMISSION_FLUSH_INTERVAL_MS,
+    flush_rows=settings.SUBMISSION_FLUSH_ROWS,
+    max_rows=settings.SUBMISSION_BUFFER_MAX_ROWS,
+)
+
+atexit.register(submission_buffer.close)
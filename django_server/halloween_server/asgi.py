@@ -9,3 +9,7 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'halloween_server.settings')
 
 application = get_asgi_application()
+
+# Warm-up en segundo plano: /api/health?ready=1 responde 503 hasta que termine
+from grader.health import start_warmup
+start_warmup()
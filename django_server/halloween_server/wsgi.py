@@ -15,3 +15,7 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'halloween_server.settings')
 
 from django.core.wsgi import get_wsgi_application
 application = get_wsgi_application()
+
+# Warm-up en segundo plano: /api/health?ready=1 responde 503 hasta que termine
+from grader.health import start_warmup
+start_warmup()
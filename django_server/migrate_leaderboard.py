@@ -1,79 +1,49 @@
 """
-Script para migrar datos al nuevo modelo Leaderboard y actualizar puntuaciones.
+Script para reconstruir el Leaderboard a partir de las submissions.
 
-Este script:
-1. Crea entradas de Leaderboard para todos los usuarios existentes
-2. Recalcula las puntuaciones basándose en las submissions pasadas
-3. Actualiza los puntajes de challenges a 20 puntos cada uno
+Equivale a `python manage.py rebuild_leaderboard` (ver
+grader/management/commands/rebuild_leaderboard.py), que:
+1. Crea entradas de Leaderboard para los usuarios que no la tengan
+2. Recalcula puntuaciones con el max_score real de cada task aprobada
+3. Rellena PassedTask (primer aprobado por usuario y challenge)
 
-Ejecutar con: python migrate_leaderboard.py
+y después muestra el ranking actual.
+
+Ejecutar con: python migrate_leaderboard.py [--dry-run]
 """
 
 import os
+import sys
 import django
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'halloween_server.settings')
 django.setup()
 
-from django.contrib.auth.models import User
-from grader.models import Challenge, Submission, Leaderboard
+from django.core.management import call_command
+from django.db.models import Sum
+from grader.models import Challenge, Leaderboard
 
-def migrate_leaderboard():
+def migrate_leaderboard(dry_run=False):
     print("🎃 Iniciando migración del Leaderboard...\n")
 
-    # Paso 1: Crear entradas de Leaderboard para todos los usuarios
-    print("Paso 1: Creando entradas de Leaderboard...")
-    users = User.objects.all()
-    for user in users:
-        leaderboard, created = Leaderboard.objects.get_or_create(user=user)
-        if created:
-            print(f"  ✅ Creada entrada para {user.username}")
-        else:
-            print(f"  ℹ️  Entrada ya existente para {user.username}")
-
-    print(f"\nTotal usuarios procesados: {users.count()}\n")
-
-    # Paso 2: Recalcular puntuaciones basándose en submissions pasadas
-    print("Paso 2: Recalculando puntuaciones...")
-    for user in users:
-        leaderboard = Leaderboard.objects.get(user=user)
-
-        # Obtener todos los challenges que el usuario ha pasado
-        passed_challenges = Submission.objects.filter(
-            user=user,
-            passed=True
-        ).values('challenge').distinct()
-
-        # Contar challenges completados
-        challenges_completed = passed_challenges.count()
+    call_command('rebuild_leaderboard', dry_run=dry_run)
 
-        # Calcular score total (20 puntos por challenge pasado)
-        total_score = challenges_completed * 20
-
-        # Actualizar leaderboard
-        leaderboard.total_score = total_score
-        leaderboard.challenges_completed = challenges_completed
-        leaderboard.save()
-
-        if challenges_completed > 0:
-            print(f"  📊 {user.username}: {total_score} puntos, {challenges_completed} tasks completadas")
-
-    print("\n✨ Migración completada!")
-
-    # Paso 3: Mostrar ranking
+    # Mostrar ranking
     print("\n🏆 RANKING ACTUAL:")
     print("-" * 60)
-    leaderboard_entries = Leaderboard.objects.all().order_by(
+    leaderboard_entries = Leaderboard.objects.select_related('user').order_by(
         '-total_score', '-challenges_completed', 'last_updated'
     )[:10]
 
     for idx, entry in enumerate(leaderboard_entries, start=1):
         print(f"  {idx}. {entry.user.username:20s} | {entry.total_score:3d} puntos | {entry.challenges_completed} tasks")
 
+    max_points = Challenge.objects.filter(is_active=True).aggregate(total=Sum('max_score'))['total'] or 0
+
     print("-" * 60)
     print(f"\nTotal participantes: {Leaderboard.objects.count()}")
     print(f"Usuarios con al menos 1 task: {Leaderboard.objects.filter(challenges_completed__gt=0).count()}")
-    print(f"Usuarios con todas las tasks (100 pts): {Leaderboard.objects.filter(total_score=100).count()}")
+    print(f"Usuarios con todas las tasks ({max_points} pts): {Leaderboard.objects.filter(total_score__gte=max_points).count()}")
 
 if __name__ == '__main__':
-    migrate_leaderboard()
+    migrate_leaderboard(dry_run='--dry-run' in sys.argv)